@@ -0,0 +1,156 @@
+"""
+PageGraph (CSR) analytics vs the naive approach of walking each page's
+recursive_refs with dicts and sets: building the page graph, PageRank,
+connected components and similar pages.
+
+Usage: python benchmarks/bench_analytics.py [--blocks N] [--storage nodes]
+"""
+
+import argparse
+import math
+import tempfile
+import time
+from pathlib import Path
+
+from roam_man import roam_graph as gu
+from roam_man import synthetic_utils as sy
+from roam_man import tree_utils as tu
+
+
+def timed(fn, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
+
+
+# ---------------- Naive ---------------- #
+
+
+def naive_links(graph):
+    # {title: set of linked titles}, block refs resolved to their page
+    page_of_uid = {}
+    for title, page_node in graph.roam_pages.items():
+        for node in tu.iter_subtree(page_node):
+            page_of_uid[node.uid] = title
+    links = {}
+    for title, page_node in graph.roam_pages.items():
+        targets = {page_of_uid.get(ref) for ref in page_node.recursive_refs}
+        links[title] = targets - {None, title}
+    return links
+
+
+def naive_pagerank(links, damping=0.85, tol=1e-10, max_iter=100):
+    n = len(links)
+    rank = {title: 1 / n for title in links}
+    for _ in range(max_iter):
+        dangling = sum(rank[t] for t, targets in links.items() if not targets)
+        new = {t: (1 - damping) / n + damping * dangling / n for t in links}
+        for title, targets in links.items():
+            for target in targets:
+                new[target] += damping * rank[title] / len(targets)
+        done = sum(abs(new[t] - rank[t]) for t in links) < tol
+        rank = new
+        if done:
+            break
+    return rank
+
+
+def naive_components(links):
+    neighbors = {title: set(targets) for title, targets in links.items()}
+    for title, targets in links.items():
+        for target in targets:
+            neighbors[target].add(title)
+    seen, clusters = set(), []
+    for title in links:
+        if title in seen:
+            continue
+        stack, cluster = [title], []
+        seen.add(title)
+        while stack:
+            page = stack.pop()
+            cluster.append(page)
+            for other in neighbors[page] - seen:
+                seen.add(other)
+                stack.append(other)
+        clusters.append(cluster)
+    return clusters
+
+
+def naive_similar(links, title, k=10):
+    # Shared out-links only, as PageGraph.similar_pages(mode="out")
+    mine = links[title]
+    scores = [
+        (other, len(mine & targets) / math.sqrt(len(mine) * len(targets)))
+        for other, targets in links.items()
+        if other != title and mine & targets
+    ]
+    return sorted(scores, key=lambda kv: -kv[1])[:k]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocks", type=int, default=1_000_000)
+    parser.add_argument("--storage", default="nodes", choices=gu.STORAGE_TYPES)
+    parser.add_argument("--ref-density", type=float, default=0.3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        input_path = Path(work_dir) / "export.json"
+        gen = sy.SyntheticGraph.for_num_blocks(
+            args.blocks, blocks_per_page=20, ref_density=args.ref_density
+        )
+        gen.write_export(input_path)
+        graph = gu.RoamGraph(
+            input_path,
+            stream=True,
+            keep_raw=False,
+            storage=args.storage,
+            db_path=Path(work_dir) / "graph.sqlite",
+        )
+        title = gen.page_title(0)
+
+        csr_build, pages = timed(lambda: graph.page_graph)
+        naive_build, links = timed(lambda: naive_links(graph))
+        print(
+            f"{pages.num_pages:,} pages, {pages.num_edges:,} links"
+            f" ({pages.nbytes / 2**20:.1f} MiB CSR)"
+        )
+        print(
+            f"{'build':>12}: csr {csr_build * 1e3:9.2f}ms"
+            f"  naive {naive_build * 1e3:10.1f}ms"
+        )
+        for label, csr_fn, naive_fn in [
+            ("pagerank", pages.pagerank, lambda: naive_pagerank(links)),
+            (
+                "components",
+                pages.connected_components,
+                lambda: naive_components(links),
+            ),
+            (
+                "similar",
+                lambda: graph.get_similar_pages(title, mode="out"),
+                lambda: naive_similar(links, title),
+            ),
+        ]:
+            csr_time, _ = timed(csr_fn, repeat=5)
+            naive_time, _ = timed(naive_fn)
+            print(
+                f"{label:>12}: csr {csr_time * 1e3:9.2f}ms"
+                f"  naive {naive_time * 1e3:10.1f}ms"
+                f"  ({naive_time / max(csr_time, 1e-9):,.0f}x)"
+            )
+
+        # Same answers
+        ranks = pages.pagerank()
+        naive_ranks = naive_pagerank(links)
+        error = max(abs(ranks[pages.page_idx(t)] - r) for t, r in naive_ranks.items())
+        num, _ = pages.connected_components()
+        print(
+            f"max pagerank diff {error:.2e},"
+            f" components {num} vs {len(naive_components(links))}"
+        )
+
+
+if __name__ == "__main__":
+    main()
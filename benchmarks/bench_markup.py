@@ -0,0 +1,94 @@
+"""
+Block-string markup parsing: markup_utils.parse_blocks throughput over the
+strings of a synthetic graph, then a load with parse_refs="missing" from an
+export without refs vs a load of the export with them, checking the parsed
+refs match the exported ones.
+
+Usage: python benchmarks/bench_markup.py [--blocks N] [--storage compact]
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from roam_man import markup_utils as mu
+from roam_man import roam_graph as gu
+from roam_man import synthetic_utils as sy
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def iter_blocks(raw_page):
+    stack = list(raw_page.get("children", []))
+    while stack:
+        block = stack.pop()
+        yield block
+        stack.extend(block.get("children", []))
+
+
+def write_without_refs(pages, path):
+    with open(path, "w") as f:
+        f.write("[")
+        for i, page in enumerate(pages):
+            for block in iter_blocks(page):
+                block.pop("refs", None)
+            f.write(("," if i else "") + json.dumps(page))
+        f.write("]")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocks", type=int, default=1_000_000)
+    parser.add_argument("--storage", default="compact", choices=gu.STORAGE_TYPES)
+    args = parser.parse_args()
+
+    gen = sy.SyntheticGraph.for_num_blocks(args.blocks, blocks_per_page=20)
+    strings = [b.get("string") for page in gen.iter_pages() for b in iter_blocks(page)]
+    parse_time, markups = timed(lambda: [mu.parse_block(s) for s in strings])
+    num_refs = sum(len(m.links) + len(m.block_refs) for m in markups)
+    print(
+        f"parse_block: {len(strings):,} blocks, {num_refs:,} refs in"
+        f" {parse_time:.2f}s ({len(strings) / parse_time * 60 / 1e6:.1f}M blocks/min)"
+    )
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        with_refs = Path(work_dir) / "export.json"
+        without_refs = Path(work_dir) / "no_refs.json"
+        gen.write_export(with_refs)
+        write_without_refs(gen.iter_pages(), without_refs)
+
+        def load(path, **kwargs):
+            return gu.RoamGraph(
+                path,
+                stream=True,
+                keep_raw=False,
+                storage=args.storage,
+                db_path=Path(work_dir) / "graph.sqlite",
+                **kwargs,
+            )
+
+        load_time, graph = timed(lambda: load(with_refs))
+        parsed_time, parsed = timed(lambda: load(without_refs, parse_refs="missing"))
+        print(f"load with exported refs: {load_time:.2f}s")
+        print(
+            f"load parsing refs:       {parsed_time:.2f}s"
+            f" (+{parsed_time - load_time:.2f}s)"
+        )
+
+        # Same refs either way, on a sample of the blocks
+        uids = [sy.block_uid(i) for i in range(0, len(strings), 97)]
+        same = sum(
+            sorted(graph.get_block(uid).refs) == sorted(parsed.get_block(uid).refs)
+            for uid in uids
+        )
+        print(f"parsed refs match exported refs on {same:,} of {len(uids):,} blocks")
+
+
+if __name__ == "__main__":
+    main()
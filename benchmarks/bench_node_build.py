@@ -0,0 +1,83 @@
+"""
+Throughput of RoamNode tree construction on wide and deep synthetic pages.
+
+Usage: python benchmarks/bench_node_build.py [--blocks N] [--repeats R]
+"""
+
+import argparse
+import sys
+import time
+
+from roam_man.roam_graph import RoamNode
+
+
+def make_block(i, refs=True):
+    block = {
+        "uid": f"uid{i:09d}",
+        "string": f"block {i}",
+        "create-time": 1694303705806 + i,
+        "edit-time": 1694303705806 + i,
+    }
+    if refs:
+        block["refs"] = [{"uid": f"ref{i % 97}"}]
+    return block
+
+
+def make_wide_page(n_blocks, fanout=50):
+    # Breadth-first fill so the page is n_blocks wide-ish and shallow
+    page = make_block(0)
+    page["title"] = "wide"
+    frontier = [page]
+    i = 1
+    while i < n_blocks:
+        parent = frontier.pop(0)
+        parent["children"] = []
+        for _ in range(min(fanout, n_blocks - i)):
+            child = make_block(i)
+            parent["children"].append(child)
+            frontier.append(child)
+            i += 1
+    return page
+
+
+def make_deep_page(n_blocks):
+    # A single chain, n_blocks levels deep
+    page = make_block(0)
+    page["title"] = "deep"
+    node = page
+    for i in range(1, n_blocks):
+        child = make_block(i)
+        node["children"] = [child]
+        node = child
+    return page
+
+
+def time_build(page, n_blocks, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        RoamNode(page)
+        best = min(best, time.perf_counter() - start)
+    return best, n_blocks / best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocks", type=int, default=200_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"recursion limit: {sys.getrecursionlimit()}")
+    for name, page in [
+        ("wide", make_wide_page(args.blocks)),
+        ("deep", make_deep_page(args.blocks)),
+    ]:
+        secs, blocks_per_sec = time_build(page, args.blocks, args.repeats)
+        print(
+            f"{name:>5}: {args.blocks:,} blocks in {secs:.3f}s"
+            f" ({blocks_per_sec:,.0f} blocks/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
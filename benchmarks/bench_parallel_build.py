@@ -0,0 +1,34 @@
+"""
+Scaling of parallel CompactGraph construction with the number of workers.
+
+Usage: python benchmarks/bench_parallel_build.py [--blocks N] [--workers 1 2 4 8]
+"""
+
+import argparse
+import time
+
+from bench_storage_memory import make_pages
+from roam_man.parallel_utils import build_compact_graph
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocks", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    pages = make_pages(args.blocks)
+    base = None
+    for workers in args.workers:
+        start = time.perf_counter()
+        build_compact_graph(pages, workers)
+        secs = time.perf_counter() - start
+        base = secs if base is None else base
+        print(
+            f"workers={workers:>2}: {secs:.2f}s"
+            f" ({args.blocks / secs:,.0f} blocks/s, {base / secs:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Full-text SearchIndex queries vs scanning every block string.
+
+Usage: python benchmarks/bench_search.py [--blocks N]
+"""
+
+import argparse
+import random
+import time
+
+from roam_man import search_index as si
+
+
+def make_texts(n_blocks, vocab_size=20_000, seed=0):
+    # Zipf-ish word frequencies, like real notes
+    rng = random.Random(seed)
+    vocab = [f"w{i}" for i in range(vocab_size)]
+    weights = [1 / (i + 1) for i in range(vocab_size)]
+    return [
+        " ".join(rng.choices(vocab, weights, k=rng.randint(3, 20)))
+        for _ in range(n_blocks)
+    ]
+
+
+def timed(fn, repeat=5):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocks", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    texts = make_texts(args.blocks)
+    start = time.perf_counter()
+    index = si.SearchIndex.from_texts(texts)
+    print(f"build: {time.perf_counter() - start:.2f}s for {args.blocks} blocks")
+
+    for query in ["w500", "w3 w40", '"w1 w2"', "w123*"]:
+        words = [w.strip('"*') for w in query.split()]
+        scan_time, _ = timed(
+            lambda: [
+                i
+                for i, text in enumerate(texts)
+                if all(w in text.split() for w in words)
+            ],
+            repeat=1,
+        )
+        index_time, hits = timed(lambda: index.search(query))
+        print(
+            f"{query:>10}: index {index_time * 1e3:7.2f}ms  "
+            f"scan {scan_time * 1e3:8.1f}ms  ({len(hits)} hits)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Startup cost of a one-off lookup: the interpreter, the numpy import, the
+roam_graph import, and `python -m roam_man page` against a checkpoint of a
+synthetic graph, each a fresh process (median of --repeat runs).
+
+Usage: python benchmarks/bench_startup.py [--blocks N] [--repeat 7]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from roam_man import roam_graph as gu
+from roam_man import synthetic_utils as sy
+
+
+def run_ms(args, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], check=True, capture_output=True)
+        times.append((time.perf_counter() - start) * 1e3)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocks", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        input_path = Path(work_dir) / "export.json"
+        checkpoint = str(Path(work_dir) / "graph.ckpt")
+        gen = sy.SyntheticGraph.for_num_blocks(args.blocks, blocks_per_page=20)
+        gen.write_export(input_path)
+        graph = gu.RoamGraph(input_path, stream=True, keep_raw=False, storage="compact")
+        graph.save_checkpoint(checkpoint)
+        title = gen.page_title(gen.num_pages // 2)
+        print(f"{graph.store.num_pages:,} pages, {graph.store.num_blocks:,} blocks")
+
+        steps = [
+            ("python", ["-c", "pass"]),
+            ("numpy", ["-c", "import numpy"]),
+            ("roam_graph", ["-c", "import roam_man.roam_graph"]),
+            (
+                "open",
+                [
+                    "-c",
+                    f"import roam_man.roam_graph as gu; gu.RoamGraph.from_checkpoint({checkpoint!r})",
+                ],
+            ),
+            ("page lookup", ["-m", "roam_man", "page", checkpoint, title]),
+        ]
+        base = None
+        for label, step in steps:
+            ms = run_ms(step, args.repeat)
+            base = ms if base is None else base
+            print(f"{label:>12}: {ms:7.1f}ms  (+{ms - base:6.1f}ms over python)")
+
+
+if __name__ == "__main__":
+    main()
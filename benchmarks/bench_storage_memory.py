@@ -0,0 +1,69 @@
+"""
+Memory held by RoamNode trees vs the columnar CompactGraph for the same pages.
+
+Usage: python benchmarks/bench_storage_memory.py [--blocks N]
+"""
+
+import argparse
+import gc
+import random
+import tracemalloc
+
+from roam_man.compact_graph import CompactGraph
+from roam_man.roam_graph import RoamNode
+
+
+def make_pages(n_blocks, blocks_per_page=50, seed=0):
+    rng = random.Random(seed)
+    pages = []
+    i = 0
+    while i < n_blocks:
+        page = {"title": f"Page {i}", "uid": f"page{i:08d}", "children": []}
+        i += 1
+        parents = [page]
+        for _ in range(min(blocks_per_page, n_blocks - i)):
+            block = {
+                "uid": f"blk{i:010d}",
+                "string": f"block {i} text " * rng.randint(1, 4),
+                "create-time": 1694303705806 + i,
+                "edit-time": 1694303705806 + i,
+                "refs": [{"uid": f"page{rng.randrange(i):08d}"}],
+            }
+            parent = rng.choice(parents)
+            parent.setdefault("children", []).append(block)
+            parents.append(block)
+            i += 1
+        pages.append(page)
+    return pages
+
+
+def traced_size(build):
+    gc.collect()
+    tracemalloc.start()
+    result = build()  # noqa: F841, keep alive while measuring
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocks", type=int, default=200_000)
+    args = parser.parse_args()
+
+    pages = make_pages(args.blocks)
+    nodes_size = traced_size(
+        lambda: {p["title"]: RoamNode(p, keep_raw=False) for p in pages}
+    )
+    compact_size = traced_size(lambda: CompactGraph.from_pages(pages))
+
+    mib = 1024 * 1024
+    print(f"blocks:      {args.blocks:,}")
+    print(f"RoamNode:    {nodes_size / mib:8.1f} MiB")
+    print(f"CompactGraph:{compact_size / mib:8.1f} MiB")
+    print(f"ratio:       {nodes_size / compact_size:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
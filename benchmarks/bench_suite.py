@@ -0,0 +1,254 @@
+"""
+End-to-end benchmark of RoamGraph on seeded synthetic exports, from 1K to
+10M blocks: time, throughput and peak RSS of each phase (load, title sets,
+rendering, lookups) per storage type.  Results are saved as JSON and can be
+compared against an earlier run to spot regressions.
+
+Usage:
+    python benchmarks/bench_suite.py [--sizes 1000 100000 ...]
+        [--storage nodes compact sqlite] [--out results.json]
+        [--compare baseline.json] [--threshold 0.2]
+        [--blocks-per-page 50 --max-depth 5 --fanout 10 --ref-density 0.3]
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from roam_man import process_utils as pu
+from roam_man import roam_graph as gu
+from roam_man import synthetic_utils as sy
+
+RESULTS_FORMAT = "roam_man.bench_suite"
+RESULTS_VERSION = 1
+NUM_LOOKUPS = 10_000
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def timed_phase(results, phase, items, fn):
+    start = time.perf_counter()
+    value = fn()
+    secs = time.perf_counter() - start
+    results.append(
+        {
+            "phase": phase,
+            "seconds": secs,
+            "items": items,
+            "items_per_sec": items / secs if secs > 0 else None,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+    )
+    return value
+
+
+def lookup_all(lookup, keys):
+    # Results are dropped so peak RSS reflects the graph, not the results
+    for key in keys:
+        lookup(key)
+
+
+def run_config(config):
+    # One storage on one export, in its own process so peak RSS is its own
+    gen = sy.SyntheticGraph(**config["generator"])
+    num_blocks, storage = config["num_blocks"], config["storage"]
+    results = []
+    graph = timed_phase(
+        results,
+        "load",
+        num_blocks,
+        lambda: gu.RoamGraph(
+            config["input_path"],
+            stream=True,
+            keep_raw=False,
+            storage=storage,
+            db_path=Path(config["work_dir"]) / f"{storage}.sqlite",
+        ),
+    )
+    timed_phase(
+        results,
+        "title_sets",
+        gen.num_pages,
+        lambda: pu.page_node_list_to_title_sets(
+            graph.roam_pages, graph.uid_to_title, get_page_of=graph.get_page_of
+        ),
+    )
+    with open(os.devnull, "w") as devnull:
+        timed_phase(results, "render", num_blocks, lambda: graph.write_pages(devnull))
+
+    rng = random.Random(0)
+    titles = [gen.page_title(rng.randrange(gen.num_pages)) for _ in range(NUM_LOOKUPS)]
+    num_nested = num_blocks - gen.num_pages
+    uids = [sy.block_uid(rng.randrange(max(num_nested, 1))) for _ in range(NUM_LOOKUPS)]
+    if num_nested == 0:
+        uids = [gen.page_uid(rng.randrange(gen.num_pages)) for _ in uids]
+    page_uids = [gen.page_uid(i % gen.num_pages) for i in range(NUM_LOOKUPS)]
+    for phase, lookup, keys in [
+        ("page_lookup", graph.get_page_node, titles),
+        ("block_lookup", graph.get_block, uids),
+        ("backlinks", graph.get_backlinks, page_uids),
+    ]:
+        timed_phase(results, phase, NUM_LOOKUPS, lambda: lookup_all(lookup, keys))
+    return [
+        {"num_blocks": num_blocks, "storage": storage, "size": config["size"], **r}
+        for r in results
+    ]
+
+
+def run_isolated(config):
+    if "fork" not in mp.get_all_start_methods():
+        return run_config(config)
+    with ProcessPoolExecutor(1, mp_context=mp.get_context("fork")) as ex:
+        return ex.submit(run_config, config).result()
+
+
+def run_metadata(args):
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "args": {k: v for k, v in vars(args).items() if k not in ["out", "compare"]},
+    }
+
+
+# ---------------- Comparison ---------------- #
+
+
+def result_key(row):
+    return (row["size"], row["storage"], row["phase"])
+
+
+def compare_results(baseline, results, threshold):
+    # Rows at least threshold slower (time ratio) than the baseline
+    previous = {result_key(row): row for row in baseline["results"]}
+    regressions = []
+    print(f"\n{'size':>10} {'storage':>8} {'phase':>12} {'before':>9} {'after':>9}")
+    for row in results:
+        old = previous.get(result_key(row))
+        if old is None or not old["seconds"]:
+            continue
+        ratio = row["seconds"] / old["seconds"]
+        flag = "  REGRESSION" if ratio > 1 + threshold else ""
+        print(
+            f"{row['size']:>10,} {row['storage']:>8} {row['phase']:>12}"
+            f" {old['seconds']:8.3f}s {row['seconds']:8.3f}s {ratio:5.2f}x{flag}"
+        )
+        if flag:
+            regressions.append(row)
+    return regressions
+
+
+def print_row(row):
+    rate = row["items_per_sec"]
+    rate = f"{rate:14,.0f}/s" if rate is not None else f"{'-':>16}"
+    print(
+        f"{row['size']:>10,} {row['storage']:>8} {row['phase']:>12}"
+        f" {row['seconds']:9.3f}s {rate} {row['peak_rss_mb']:9.1f} MiB"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument(
+        "--storage", nargs="+", default=gu.STORAGE_TYPES, choices=gu.STORAGE_TYPES
+    )
+    parser.add_argument("--blocks-per-page", type=int, default=50)
+    parser.add_argument("--max-depth", type=int, default=5)
+    parser.add_argument("--fanout", type=int, default=10)
+    parser.add_argument("--ref-density", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--compare", default=None)
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = []
+    print(
+        f"{'size':>10} {'storage':>8} {'phase':>12} {'time':>10}"
+        f" {'throughput':>16} {'peak RSS':>13}"
+    )
+    with tempfile.TemporaryDirectory() as work_dir:
+        for size in args.sizes:
+            gen = sy.SyntheticGraph.for_num_blocks(
+                size,
+                blocks_per_page=args.blocks_per_page,
+                max_depth=args.max_depth,
+                fanout=args.fanout,
+                ref_density=args.ref_density,
+                seed=args.seed,
+            )
+            input_path = Path(work_dir) / f"export_{size}.json"
+            num_blocks = gen.write_export(input_path)
+            for storage in args.storage:
+                config = {
+                    "size": size,
+                    "num_blocks": num_blocks,
+                    "storage": storage,
+                    "input_path": str(input_path),
+                    "work_dir": work_dir,
+                    "generator": {
+                        "num_pages": gen.num_pages,
+                        "blocks_per_page": args.blocks_per_page,
+                        "max_depth": args.max_depth,
+                        "fanout": args.fanout,
+                        "ref_density": args.ref_density,
+                        "seed": args.seed,
+                    },
+                }
+                for row in run_isolated(config):
+                    print_row(row)
+                    results.append(row)
+            input_path.unlink()
+
+    output = {
+        "format": RESULTS_FORMAT,
+        "version": RESULTS_VERSION,
+        "meta": run_metadata(args),
+        "results": results,
+    }
+    Path(args.out).write_text(json.dumps(output, indent=2))
+    print(f"\nsaved {len(results)} results to {args.out}")
+
+    if args.compare is not None:
+        baseline = json.loads(Path(args.compare).read_text())
+        if baseline.get("format") != RESULTS_FORMAT:
+            sys.exit(f"{args.compare} is not a bench_suite results file")
+        regressions = compare_results(baseline, results, args.threshold)
+        if regressions:
+            sys.exit(f"{len(regressions)} phases regressed by > {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
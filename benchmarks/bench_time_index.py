@@ -0,0 +1,99 @@
+"""
+TimeIndex range queries, histograms and recent pages vs traversing every
+block of a synthetic graph.
+
+Usage: python benchmarks/bench_time_index.py [--blocks N] [--storage nodes]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from roam_man import roam_graph as gu
+from roam_man import synthetic_utils as sy
+from roam_man import tree_utils as tu
+
+WEEK_MS = 7 * 24 * 3600 * 1000
+
+
+def timed(fn, repeat=5):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def iter_blocks(graph):
+    for page_node in graph.roam_pages.values():
+        yield from tu.iter_subtree(page_node)
+
+
+def scan_between(graph, start, end):
+    return sum(
+        1
+        for node in iter_blocks(graph)
+        if node.edit_time is not None and start <= node.edit_time <= end
+    )
+
+
+def scan_recent_pages(graph, limit):
+    latest = {}
+    for page_node in graph.roam_pages.values():
+        times = [n.edit_time for n in tu.iter_subtree(page_node) if n.edit_time]
+        if times:
+            latest[page_node.title] = max(times)
+    return sorted(latest.items(), key=lambda kv: -kv[1])[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocks", type=int, default=1_000_000)
+    parser.add_argument("--storage", default="nodes", choices=gu.STORAGE_TYPES)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        input_path = Path(work_dir) / "export.json"
+        sy.SyntheticGraph.for_num_blocks(args.blocks).write_export(input_path)
+        graph = gu.RoamGraph(
+            input_path,
+            stream=True,
+            keep_raw=False,
+            storage=args.storage,
+            db_path=Path(work_dir) / "graph.sqlite",
+        )
+        build_time, index = timed(lambda: graph.time_index, repeat=1)
+        print(
+            f"build: {build_time:.2f}s for {index.num_docs} blocks"
+            f" ({index.nbytes / 2**20:.1f} MiB)"
+        )
+
+        times = index.times["edit_time"]
+        mid = int(times[len(times) // 2])
+        for label, index_fn, scan_fn in [
+            (
+                "count week",
+                lambda: graph.count_blocks_between(mid, mid + WEEK_MS),
+                lambda: scan_between(graph, mid, mid + WEEK_MS),
+            ),
+            (
+                "weekly hist",
+                lambda: graph.get_time_histogram("week")[1].sum(),
+                lambda: scan_between(graph, 0, int(times[-1])),
+            ),
+            (
+                "recent 10",
+                lambda: graph.get_recent_pages(10),
+                lambda: scan_recent_pages(graph, 10),
+            ),
+        ]:
+            scan_time, expected = timed(scan_fn, repeat=1)
+            index_time, result = timed(index_fn, repeat=20)
+            print(
+                f"{label:>12}: index {index_time * 1e3:8.3f}ms"
+                f"  scan {scan_time * 1e3:9.1f}ms  (same: {result == expected})"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Command line lookups against a prebuilt checkpoint.  Only roam_graph is
+imported up front and a checkpoint opens in O(1), so a lookup costs little
+more than the interpreter and numpy imports.
+
+Usage:
+    python -m roam_man checkpoint export.json graph.ckpt [--search]
+    python -m roam_man page graph.ckpt "Reading List" [--max-depth N]
+    python -m roam_man block graph.ckpt <uid>
+"""
+
+import argparse
+import sys
+
+from roam_man import roam_graph as gu
+
+
+def build_checkpoint(args):
+    graph = gu.RoamGraph(args.export, stream=True, keep_raw=False, storage="compact")
+    if args.search:
+        graph.search_index
+    graph.save_checkpoint(args.checkpoint)
+    print(
+        f"{graph.store.num_pages:,} pages, {graph.store.num_blocks:,} blocks"
+        f" -> {args.checkpoint}"
+    )
+
+
+def show_page(args):
+    graph = gu.RoamGraph.from_checkpoint(args.checkpoint)
+    if args.title not in graph.roam_pages:
+        print(f"No page titled {args.title!r}", file=sys.stderr)
+        return 1
+    graph.write_pages(sys.stdout, titles=[args.title], max_depth=args.max_depth)
+    print()
+    return 0
+
+
+def show_block(args):
+    graph = gu.RoamGraph.from_checkpoint(args.checkpoint)
+    try:
+        node = graph.get_block(args.uid)
+    except KeyError:
+        print(f"No block with uid {args.uid!r}", file=sys.stderr)
+        return 1
+    page = graph.get_page_of(args.uid)
+    print(f"[[{page.title}]]")
+    gu.write_roam_str(node, sys.stdout, args.max_depth)
+    print()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m roam_man")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("checkpoint", help="parse an export once")
+    build.add_argument("export")
+    build.add_argument("checkpoint")
+    build.add_argument("--search", action="store_true", help="include search index")
+    build.set_defaults(run=build_checkpoint)
+
+    page = commands.add_parser("page", help="print a page by title")
+    page.add_argument("checkpoint")
+    page.add_argument("title")
+    page.add_argument("--max-depth", type=int, default=None)
+    page.set_defaults(run=show_page)
+
+    block = commands.add_parser("block", help="print a block (and its page) by uid")
+    block.add_argument("checkpoint")
+    block.add_argument("uid")
+    block.add_argument("--max-depth", type=int, default=None)
+    block.set_defaults(run=show_block)
+
+    args = parser.parse_args(argv)
+    return args.run(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
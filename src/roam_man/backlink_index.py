@@ -0,0 +1,136 @@
+import numpy as np
+
+from roam_man import tree_utils as tu
+
+MISSING = -1
+
+# ---------------- Reverse Reference Index ---------------- #
+
+
+class BacklinkIndex:
+    """
+    Reverse ref index ("what links here"): referenced uid -> uids of the
+    blocks that reference it.  Sources are grouped by the page they live on,
+    so a single page can be removed or replaced without rebuilding the rest.
+
+    Layout:
+        by_target: {target uid: {page uid: tuple of source block uids}}
+        page_targets: {page uid: tuple of target uids referenced from it}
+    """
+
+    def __init__(self):
+        self.by_target = {}
+        self.page_targets = {}
+
+    @classmethod
+    def from_page_nodes(cls, page_nodes):
+        index = cls()
+        for page_node in page_nodes:
+            index.add_page(page_node)
+        return index
+
+    @classmethod
+    def from_compact_graph(cls, store):
+        index = cls()
+        for root in store.page_roots:
+            index.add_page_refs(store.get_uid(root), store.get_subtree_ref_pairs(root))
+        return index
+
+    def add_page(self, page_node):
+        ref_pairs = (
+            (node.uid, ref) for node in tu.iter_subtree(page_node) for ref in node.refs
+        )
+        self.add_page_refs(page_node.uid, ref_pairs)
+
+    def add_page_refs(self, page_uid, ref_pairs):
+        # ref_pairs: iterable of (source block uid, target uid)
+        if page_uid in self.page_targets:
+            self.remove_page(page_uid)
+
+        sources_by_target = {}
+        for source, target in ref_pairs:
+            sources_by_target.setdefault(target, []).append(source)
+        for target, sources in sources_by_target.items():
+            self.by_target.setdefault(target, {})[page_uid] = tuple(sources)
+        self.page_targets[page_uid] = tuple(sources_by_target)
+
+    def remove_page(self, page_uid):
+        for target in self.page_targets.pop(page_uid, ()):
+            pages = self.by_target[target]
+            del pages[page_uid]
+            if not pages:
+                del self.by_target[target]
+
+    def replace_page(self, page_node, old_page_uid=None):
+        self.remove_page(page_node.uid if old_page_uid is None else old_page_uid)
+        self.add_page(page_node)
+
+    def get_backlinks(self, uid):
+        return [
+            source
+            for sources in self.by_target.get(uid, {}).values()
+            for source in sources
+        ]
+
+    def get_linking_pages(self, uid):
+        return list(self.by_target.get(uid, {}))
+
+    def __contains__(self, uid):
+        return uid in self.by_target
+
+    def __len__(self):
+        return len(self.by_target)
+
+
+class CsrBacklinkIndex:
+    """
+    Read-only BacklinkIndex over a CompactGraph's refs, as arrays: the
+    source blocks of each target symbol in block order, CSR by target.
+    Nothing in it is mutable or per-object, so it suits graph snapshots
+    shared between threads or processes.
+
+    Layout:
+        target_offsets  int64 (num symbols + 1), the sources of symbol t are
+                          sources[target_offsets[t]:target_offsets[t + 1]]
+        sources         int32 source block idxs
+    """
+
+    def __init__(self, store, target_offsets, sources):
+        self.store = store
+        self.target_offsets = target_offsets
+        self.sources = sources
+
+    @classmethod
+    def from_compact_graph(cls, store):
+        targets = store.ref_targets
+        sources = np.repeat(
+            np.arange(store.num_blocks, dtype=np.int32), np.diff(store.ref_offsets)
+        )
+        target_offsets = np.zeros(len(store.uids) + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(targets, minlength=len(store.uids)), out=target_offsets[1:]
+        )
+        order = np.argsort(targets, kind="stable")
+        return cls(store, target_offsets, sources[order])
+
+    def source_blocks(self, uid):
+        sid = self.store.uid_index.get(uid, MISSING)
+        if sid == MISSING:
+            return self.sources[:0]
+        return self.sources[self.target_offsets[sid] : self.target_offsets[sid + 1]]
+
+    def get_backlinks(self, uid):
+        return [self.store.get_uid(b) for b in self.source_blocks(uid).tolist()]
+
+    def get_linking_pages(self, uid):
+        roots = self.store.page_roots
+        pages = np.unique(
+            np.searchsorted(roots, self.source_blocks(uid), side="right") - 1
+        )
+        return [self.store.get_uid(int(roots[p])) for p in pages]
+
+    def __contains__(self, uid):
+        return len(self.source_blocks(uid)) > 0
+
+    def __len__(self):
+        return int(np.count_nonzero(np.diff(self.target_offsets)))
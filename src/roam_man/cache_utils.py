@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+from pathlib import Path
+
+import numpy as np
+
+from roam_man import checkpoint_utils as ck
+from roam_man import roam_graph as gu
+from roam_man import stream_utils as su
+
+INDEX_FILE = "index.json"
+# Byte offsets and lengths of the export's pages, saved next to each entry
+RAW_INDEX_FILE = "raw_pages.npy"
+CACHE_VERSION = 2
+# Entries live in this subdirectory of the cache dir, nothing outside it is
+#   touched, so a shared dir like ~/.cache is safe to pass
+CACHE_SUBDIR = "roam_man"
+# <content hash>-v<schema>, the only directory names the cache removes
+KEY_RE = re.compile(r"[0-9a-f]{40}-v[\w.]+")
+
+# Entries written under any other schema are dropped on open
+SCHEMA_VERSION = f"{gu.NODE_SCHEMA_VERSION}.{ck.CHECKPOINT_VERSION}.{CACHE_VERSION}"
+
+# ---------------- Fingerprinting ---------------- #
+
+
+def stat_signature(input_path):
+    # Cheap identity for the fast path: same file, size and mtime
+    st = os.stat(input_path)
+    return [str(Path(input_path).resolve()), st.st_size, st.st_mtime_ns]
+
+
+def content_hash(input_path, chunk_size=1 << 20):
+    h = hashlib.blake2b(digest_size=20)
+    with open(input_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# ---------------- Parsed Graph Cache ---------------- #
+
+
+class GraphCache:
+    """
+    Directory of parsed-graph checkpoints keyed on the content hash of the
+    export they were parsed from, with LRU eviction past max_entries.
+
+    An export is first matched by (path, size, mtime), and only hashed when
+    that misses, so a touched or copied export still hits its cached entry.
+
+    Layout:
+        <cache_dir>/roam_man/index.json   {key: {"schema", "last_used", "signatures"}}
+        <cache_dir>/roam_man/<key>/       checkpoint_utils checkpoint directory
+    """
+
+    def __init__(self, cache_dir, max_entries=8):
+        self.cache_dir = Path(cache_dir).expanduser() / CACHE_SUBDIR
+        self.max_entries = max_entries
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.entries = self.read_index()
+        self.evict()
+
+    def read_index(self):
+        index_path = self.cache_dir / INDEX_FILE
+        if not index_path.exists():
+            return {}
+        try:
+            return json.loads(index_path.read_text())
+        except json.JSONDecodeError:
+            return {}  # a corrupt index only costs a re-parse
+
+    def write_index(self):
+        tmp_path = self.cache_dir / (INDEX_FILE + ".tmp")
+        tmp_path.write_text(json.dumps(self.entries, indent=2))
+        os.replace(tmp_path, self.cache_dir / INDEX_FILE)
+
+    def entry_path(self, key):
+        return self.cache_dir / key
+
+    def find_key(self, input_path):
+        # Returns (key, is_cached), hashing the file only if the stat misses
+        signature = stat_signature(input_path)
+        for key, entry in self.entries.items():
+            if signature in entry["signatures"]:
+                return key, True
+        key = f"{content_hash(input_path)}-v{SCHEMA_VERSION}"
+        if key in self.entries:
+            self.entries[key]["signatures"].append(signature)
+            return key, True
+        return key, False
+
+    def get(self, input_path):
+        """Return the checkpoint path for the export at input_path, or None."""
+        key, is_cached = self.find_key(input_path)
+        if not is_cached or not self.entry_path(key).exists():
+            return None
+        self.entries[key]["last_used"] = time.time()
+        self.write_index()
+        return self.entry_path(key)
+
+    def put(self, input_path, store, raw_index):
+        """
+        Save a CompactGraph parsed from input_path, and the JsonArrayIndex of
+        its pages, returns its path.
+        """
+        key, _ = self.find_key(input_path)
+        ck.save_checkpoint(store, self.entry_path(key))
+        np.save(
+            self.entry_path(key) / RAW_INDEX_FILE,
+            np.array([raw_index.offsets, raw_index.lengths], dtype=np.int64),
+        )
+        self.entries[key] = {
+            "schema": SCHEMA_VERSION,
+            "last_used": time.time(),
+            "signatures": [stat_signature(input_path)],
+        }
+        self.evict()
+        return self.entry_path(key)
+
+    def load_raw_index(self, checkpoint_path, input_path):
+        # JsonArrayIndex over input_path, whose content matches the entry's
+        offsets, lengths = np.load(Path(checkpoint_path) / RAW_INDEX_FILE)
+        return su.JsonArrayIndex(input_path, offsets.tolist(), lengths.tolist())
+
+    def evict(self):
+        # Drop stale-schema and missing entries, then least recently used
+        for key in list(self.entries):
+            entry = self.entries[key]
+            if (
+                entry.get("schema") != SCHEMA_VERSION
+                or not self.entry_path(key).exists()
+            ):
+                self.remove(key)
+        by_age = sorted(self.entries, key=lambda k: self.entries[k]["last_used"])
+        for key in by_age[: max(0, len(by_age) - self.max_entries)]:
+            self.remove(key)
+
+        # Clean up checkpoints the index no longer knows about, anything else
+        #   in the dir isn't the cache's to delete
+        for path in self.cache_dir.iterdir():
+            if (
+                path.name not in self.entries
+                and KEY_RE.fullmatch(path.name)
+                and ck.is_checkpoint(path)
+            ):
+                shutil.rmtree(path, ignore_errors=True)
+        self.write_index()
+
+    def remove(self, key):
+        self.entries.pop(key, None)
+        if KEY_RE.fullmatch(key) and ck.is_checkpoint(self.entry_path(key)):
+            shutil.rmtree(self.entry_path(key), ignore_errors=True)
+
+    def clear(self):
+        for key in list(self.entries):
+            self.remove(key)
+        self.write_index()
@@ -0,0 +1,184 @@
+import json
+import mmap
+import os
+import shutil
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+from roam_man import compact_graph as cg
+from roam_man import search_index as si
+
+# Bump when the on-disk layout changes, old checkpoints then fail to load
+CHECKPOINT_VERSION = 1
+CHECKPOINT_FORMAT = "roam_man.compact_graph"
+HEADER_FILE = "header.json"
+STRING_TABLES = ["uids", "strings"]
+LOOKUP_INDEXES = ["uid_order", "symbol_blocks", "page_order"]
+SEARCH_DIR = "search"
+
+# ---------------- Binary Checkpoints ---------------- #
+
+# A checkpoint is a directory holding:
+#   header.json                  format, version, sizes and extra metadata
+#   <column>.npy                 one file per CompactGraph column
+#   <table>.blob, <table>.npy    utf-8 blob + offsets for each StringTable
+#   <lookup>.npy                 uids and pages sorted by string and the
+#                                  block of each uid, so uid and title lookups
+#                                  are binary searches straight off the mapped
+#                                  files (optional, rebuilt when missing)
+#   search/                      optional SearchIndex over the blocks
+# Everything is loaded with mmap, so opening is O(1) in the graph size and
+#   pages are only read from disk as blocks are accessed.
+
+
+def save_checkpoint(store, path, metadata=None, search_index=None):
+    """
+    Write a CompactGraph to a checkpoint directory at path, replacing any
+    existing checkpoint there (anything else at path raises ValueError).
+
+    Args:
+        store (CompactGraph): The graph to save.
+        path (str): Checkpoint directory.
+        metadata (dict): Extra json-serializable info to keep in the header.
+        search_index (SearchIndex): Saved alongside when given, its docs
+            must be the store's block idxs.
+    """
+    path = Path(path)
+    if path.exists() and not is_checkpoint(path):
+        raise ValueError(
+            f"{path} exists and isn't a roam_man checkpoint, not replacing it"
+        )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # A fresh sibling dir, so nothing already there is ever cleared
+    tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    tmp_path.mkdir()
+    try:
+        write_checkpoint(store, tmp_path, metadata, search_index)
+        # Only replace the old checkpoint once the new one is complete
+        if path.exists():
+            shutil.rmtree(path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+
+
+def write_checkpoint(store, tmp_path, metadata, search_index):
+    for name in cg.CompactGraph.COLUMNS:
+        np.save(tmp_path / f"{name}.npy", np.ascontiguousarray(getattr(store, name)))
+    for name in STRING_TABLES:
+        table = getattr(store, name)
+        (tmp_path / f"{name}.blob").write_bytes(bytes(table.blob))
+        np.save(tmp_path / f"{name}.npy", np.asarray(table.offsets))
+    uid_order = getattr(store.uid_index, "order", None)
+    if uid_order is None:
+        uid_order = cg.sort_strings(store.uids)
+    np.save(tmp_path / "uid_order.npy", np.asarray(uid_order))
+    np.save(tmp_path / "symbol_blocks.npy", np.asarray(store.symbol_blocks))
+    np.save(tmp_path / "page_order.npy", np.asarray(store.page_order))
+
+    header = {
+        "format": CHECKPOINT_FORMAT,
+        "version": CHECKPOINT_VERSION,
+        "num_blocks": store.num_blocks,
+        "num_pages": store.num_pages,
+        "metadata": metadata or {},
+    }
+    (tmp_path / HEADER_FILE).write_text(json.dumps(header, indent=2))
+    if search_index is not None:
+        search_index.save(tmp_path / SEARCH_DIR)
+
+
+def is_checkpoint(path):
+    # A directory written by save_checkpoint, of any version, the only thing
+    #   save_checkpoint will replace
+    header_path = Path(path) / HEADER_FILE
+    if not Path(path).is_dir() or not header_path.is_file():
+        return False
+    try:
+        header = json.loads(header_path.read_text())
+    except (OSError, ValueError):
+        return False
+    return isinstance(header, dict) and header.get("format") == CHECKPOINT_FORMAT
+
+
+def read_header(path):
+    header_path = Path(path) / HEADER_FILE
+    if not header_path.exists():
+        raise FileNotFoundError(f"No checkpoint found at {path}")
+    header = json.loads(header_path.read_text())
+    if header.get("format") != CHECKPOINT_FORMAT:
+        raise ValueError(f"Not a roam_man checkpoint: {path}")
+    if header.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(
+            f"Checkpoint version {header.get('version')} != {CHECKPOINT_VERSION}"
+        )
+    return header
+
+
+def load_checkpoint(path, mmap_mode="r"):
+    """
+    Open a checkpoint written by save_checkpoint.
+
+    Args:
+        path (str): Checkpoint directory.
+        mmap_mode (str): Passed to np.load, None reads everything into memory.
+
+    Returns:
+        tuple: (CompactGraph, header dict)
+    """
+    path = Path(path)
+    header = read_header(path)
+    columns = {
+        name: _load_array(path / f"{name}.npy", mmap_mode)
+        for name in cg.CompactGraph.COLUMNS
+    }
+    tables = {
+        name: cg.StringTable(
+            _load_blob(path / f"{name}.blob", mmap_mode),
+            _load_array(path / f"{name}.npy", mmap_mode),
+        )
+        for name in STRING_TABLES
+    }
+    lookups = {
+        name: _load_array(path / f"{name}.npy", mmap_mode)
+        for name in LOOKUP_INDEXES
+        if (path / f"{name}.npy").exists()
+    }
+    uid_index = None
+    if "uid_order" in lookups:
+        uid_index = cg.StringIndex(tables["uids"], lookups["uid_order"])
+    store = cg.CompactGraph(
+        **tables,
+        **columns,
+        uid_index=uid_index,
+        symbol_blocks=lookups.get("symbol_blocks"),
+        page_order=lookups.get("page_order"),
+    )
+    return store, header
+
+
+def _load_array(npy_path, mmap_mode):
+    # np.memmap indexes through a python __getitem__, a plain ndarray view of
+    #   the same mapping is several times faster per element
+    array = np.load(npy_path, mmap_mode=mmap_mode)
+    return array.view(np.ndarray) if isinstance(array, np.memmap) else array
+
+
+def _load_blob(blob_path, mmap_mode):
+    if mmap_mode is None or blob_path.stat().st_size == 0:
+        return blob_path.read_bytes()
+    with open(blob_path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def load_search_index(path, mmap_mode="r"):
+    # The SearchIndex saved with a checkpoint, or None if there isn't a
+    #   current one
+    header = read_header(path)
+    index = si.SearchIndex.load(Path(path) / SEARCH_DIR, mmap_mode=mmap_mode)
+    if index is None or index.num_docs != header["num_blocks"]:
+        return None
+    return index
@@ -0,0 +1,290 @@
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from roam_man import validation_utils as vu
+
+# Classifier and batch visible to forked workers without pickling, set only
+#   while a fork-based pool is running
+_FORK_STATE = None
+
+# ---------------- Shared Page Features ---------------- #
+
+
+class PageFeatures:
+    """
+    Per-batch features shared by every rule, each computed at most once and
+    only if some rule asks for it.
+
+    Columns (one entry per page, in page_nodes order):
+        titles, nodes, uids
+        is_daily, dates       vu.classify_dates over the page uids
+    and per page, memoized: first_ref_title(i), the title of the page its
+    first ref points at.
+    """
+
+    def __init__(self, titles, nodes, uid_to_title, get_page_of=None):
+        self.titles = titles
+        self.nodes = nodes
+        self.uid_to_title = uid_to_title
+        self.get_page_of = get_page_of
+        self._uids = None
+        self._dates = None
+        self._first_ref_titles = {}
+
+    def __len__(self):
+        return len(self.titles)
+
+    @property
+    def uids(self):
+        if self._uids is None:
+            self._uids = [node.uid for node in self.nodes]
+        return self._uids
+
+    @property
+    def is_daily(self):
+        return self._classified_dates[0]
+
+    @property
+    def dates(self):
+        return self._classified_dates[1]
+
+    @property
+    def _classified_dates(self):
+        if self._dates is None:
+            self._dates = vu.classify_dates(self.uids)
+        return self._dates
+
+    def first_ref_title(self, i):
+        # Resolved per page on demand, only pages that reach a rule using it
+        #   pay for the lookup
+        if i not in self._first_ref_titles:
+            refs = self.nodes[i].refs
+            self._first_ref_titles[i] = (
+                self.ref_title(refs[0]) if len(refs) > 0 else None
+            )
+        return self._first_ref_titles[i]
+
+    def ref_title(self, uid):
+        # Refs to nested blocks resolve to the title of their page
+        if uid not in self.uid_to_title and self.get_page_of is not None:
+            return self.get_page_of(uid).title
+        return self.uid_to_title[uid]
+
+
+class PageView:
+    """Row i of a PageFeatures batch, what row-wise predicates receive."""
+
+    __slots__ = ["features", "i"]
+
+    def __init__(self, features, i):
+        self.features = features
+        self.i = i
+
+    @property
+    def title(self):
+        return self.features.titles[self.i]
+
+    @property
+    def node(self):
+        return self.features.nodes[self.i]
+
+    @property
+    def uid(self):
+        return self.node.uid
+
+    @property
+    def refs(self):
+        return self.node.refs
+
+    @property
+    def num_children(self):
+        return len(self.node.children)
+
+    @property
+    def is_daily(self):
+        return bool(self.features.is_daily[self.i])
+
+    @property
+    def date(self):
+        return self.features.dates[self.i]
+
+    @property
+    def first_ref_title(self):
+        return self.features.first_ref_title(self.i)
+
+
+# ---------------- Rule Engine ---------------- #
+
+
+class Rule:
+    def __init__(self, name, predicate, mask, key, group, requires):
+        self.name = name
+        self.predicate = predicate
+        self.mask = mask
+        self.key = key
+        self.group = group
+        self.requires = requires
+
+    def empty_result(self):
+        return set() if self.key is None else {}
+
+
+class TitleClassifier:
+    """
+    Registry of named title rules evaluated together in one pass over the
+    pages, so adding a classification doesn't add another pass.
+
+    Each rule produces a bucket in the result: a set of titles, or with key
+    set a {key: set of titles} dict.  Rules can be:
+        predicate(page) -> bool   row-wise, page is a PageView
+        mask(features) -> array   vectorized over a PageFeatures batch
+        neither                   matches every page (e.g. a fallback)
+    Rules sharing a group are first-match in registration order (like an
+    if/elif chain), requires names a rule that must have matched first.
+    """
+
+    def __init__(self):
+        self.rules = []
+
+    def add_rule(
+        self, name, predicate=None, mask=None, key=None, group=None, requires=None
+    ):
+        if any(rule.name == name for rule in self.rules):
+            raise ValueError(f"Rule {name} already registered")
+        if predicate is not None and mask is not None:
+            raise ValueError("Give a rule a predicate or a mask, not both")
+        if requires is not None and not any(r.name == requires for r in self.rules):
+            raise ValueError(f"Rule {name} requires unknown rule {requires}")
+        self.rules.append(Rule(name, predicate, mask, key, group, requires))
+        return self
+
+    def rule(self, name, **kwargs):
+        # Decorator form of add_rule for row-wise predicates
+        def register(predicate):
+            self.add_rule(name, predicate=predicate, **kwargs)
+            return predicate
+
+        return register
+
+    def classify_features(self, features):
+        results = {rule.name: rule.empty_result() for rule in self.rules}
+        masks = [
+            None if rule.mask is None else np.asarray(rule.mask(features), dtype=bool)
+            for rule in self.rules
+        ]
+        for i, title in enumerate(features.titles):
+            page = PageView(features, i)
+            matched = set()
+            taken_groups = set()
+            for rule, mask in zip(self.rules, masks):
+                if rule.group is not None and rule.group in taken_groups:
+                    continue
+                if rule.requires is not None and rule.requires not in matched:
+                    continue
+                if mask is not None:
+                    if not mask[i]:
+                        continue
+                elif rule.predicate is not None and not rule.predicate(page):
+                    continue
+
+                if rule.key is None:
+                    results[rule.name].add(title)
+                else:
+                    key = rule.key(page)
+                    if key is None:
+                        continue
+                    results[rule.name].setdefault(key, set()).add(title)
+                matched.add(rule.name)
+                if rule.group is not None:
+                    taken_groups.add(rule.group)
+        return results
+
+    def classify(
+        self,
+        page_nodes,
+        uid_to_title=None,
+        get_page_of=None,
+        batch_size=None,
+        workers=1,
+    ):
+        """
+        Classify pages by title with every registered rule in one pass.
+
+        Args:
+            page_nodes (dict): {title: page node}, e.g. RoamGraph.roam_pages.
+            uid_to_title (dict): Page uid -> title, for ref-title features.
+            get_page_of (callable): Resolves refs to nested blocks to pages.
+            batch_size (int): Pages per feature batch, None for one batch.
+            workers (int): Batches are spread over a fork-based process pool
+                when > 1 (serial where fork isn't available).
+
+        Returns:
+            dict: {rule name: set of titles or {key: set of titles}}
+        """
+        global _FORK_STATE
+
+        titles = list(page_nodes)
+        nodes = list(page_nodes.values())
+        uid_to_title = {} if uid_to_title is None else uid_to_title
+        batch_size = max(1, batch_size or len(titles))
+        bounds = [
+            (start, min(start + batch_size, len(titles)))
+            for start in range(0, len(titles), batch_size)
+        ]
+
+        if workers > 1 and len(bounds) > 1 and "fork" in mp.get_all_start_methods():
+            _FORK_STATE = (self, titles, nodes, uid_to_title, get_page_of)
+            try:
+                with ProcessPoolExecutor(
+                    workers, mp_context=mp.get_context("fork")
+                ) as ex:
+                    batch_results = list(ex.map(_classify_forked_batch, bounds))
+            finally:
+                _FORK_STATE = None
+        else:
+            batch_results = [
+                self.classify_features(
+                    PageFeatures(
+                        titles[start:end], nodes[start:end], uid_to_title, get_page_of
+                    )
+                )
+                for start, end in bounds
+            ]
+        return self.merge_results(batch_results)
+
+    def merge_results(self, batch_results):
+        results = {rule.name: rule.empty_result() for rule in self.rules}
+        for batch in batch_results:
+            for rule in self.rules:
+                if rule.key is None:
+                    results[rule.name] |= batch[rule.name]
+                else:
+                    for key, titles in batch[rule.name].items():
+                        results[rule.name].setdefault(key, set()).update(titles)
+        return results
+
+
+def _classify_forked_batch(bounds):
+    start, end = bounds
+    classifier, titles, nodes, uid_to_title, get_page_of = _FORK_STATE
+    features = PageFeatures(
+        titles[start:end], nodes[start:end], uid_to_title, get_page_of
+    )
+    return classifier.classify_features(features)
+
+
+# ---------------- Default Title Sets ---------------- #
+
+
+def default_title_classifier():
+    # The original daily / bars / backslashes / other buckets, with_ref
+    #   groups bar titles by the title their first ref points at
+    classifier = TitleClassifier()
+    classifier.add_rule("daily_pages", mask=lambda f: f.is_daily, group="kind")
+    classifier.add_rule("bars", predicate=lambda p: "|" in p.title, group="kind")
+    classifier.add_rule("with_ref", key=lambda p: p.first_ref_title, requires="bars")
+    classifier.add_rule("backslashes", predicate=lambda p: "/" in p.title, group="kind")
+    classifier.add_rule("other", group="kind")
+    return classifier
@@ -0,0 +1,761 @@
+import sys
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+
+from roam_man import intern_utils as inu
+from roam_man import markup_utils as mu
+from roam_man import roam_graph as gu
+
+# Sentinel for missing ids / times in the int columns
+MISSING = -1
+_SUBTREE_EXIT = object()
+
+COLUMN_DTYPES = {
+    "uid_id": np.int32,
+    "title_id": np.int32,
+    "string_id": np.int32,
+    "parent": np.int32,
+    "depth": np.int32,
+    "subtree_end": np.int32,
+    "create_time": np.int64,
+    "edit_time": np.int64,
+    "ref_offsets": np.int64,
+    "ref_targets": np.int32,
+    "page_roots": np.int32,
+}
+
+
+def _shift_ids(ids, shift):
+    ids = np.asarray(ids)
+    return np.where(ids == MISSING, MISSING, ids + shift)
+
+
+# ---------------- Interned String Storage ---------------- #
+
+
+class StringTable:
+    """
+    Immutable table of strings packed into a single utf-8 blob, with an
+    int64 offsets array (len n + 1) marking where each string starts.
+    Strings are decoded on access, so per-string overhead is 8 bytes.
+    """
+
+    def __init__(self, blob=b"", offsets=None):
+        self.blob = blob
+        self.offsets = (
+            np.zeros(1, dtype=np.int64)
+            if offsets is None
+            else np.asarray(offsets, dtype=np.int64)
+        )
+
+    @classmethod
+    def from_strings(cls, strings):
+        return cls.from_encoded([s.encode("utf-8") for s in strings])
+
+    @classmethod
+    def from_encoded(cls, encoded):
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], dtype=np.int64, out=offsets[1:])
+        return cls(b"".join(encoded), offsets)
+
+    def iter_encoded(self):
+        blob = bytes(self.blob)
+        offsets = self.offsets.tolist()
+        return (blob[start:end] for start, end in zip(offsets, offsets[1:]))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, idx):
+        return self.encoded(idx).decode("utf-8")
+
+    def encoded(self, idx):
+        start, end = self.offsets[idx], self.offsets[idx + 1]
+        return bytes(self.blob[start:end])
+
+    def __iter__(self):
+        # One pass over plain python offsets, much faster than self[i]
+        return (encoded.decode("utf-8") for encoded in self.iter_encoded())
+
+    def take(self, ids):
+        # [self[i] for i in ids], None for MISSING, without copying the blob
+        ids = np.asarray(ids, dtype=np.int64)
+        safe = np.where(ids == MISSING, 0, ids)
+        starts = self.offsets[safe].tolist()
+        ends = self.offsets[safe + 1].tolist()
+        blob = self.blob
+        return [
+            None if i == MISSING else bytes(blob[start:end]).decode("utf-8")
+            for i, start, end in zip(ids.tolist(), starts, ends)
+        ]
+
+    @property
+    def nbytes(self):
+        return len(self.blob) + self.offsets.nbytes
+
+
+def sort_strings(table, ids=None):
+    # Positions of ids (table ids, default all of them) sorted by the utf-8
+    #   bytes of their strings, ties by position
+    encoded = list(table.iter_encoded())
+    ids = range(len(encoded)) if ids is None else np.asarray(ids).tolist()
+    order = sorted(range(len(ids)), key=lambda i: encoded[ids[i]])
+    return np.array(order, dtype=np.int32)
+
+
+def bisect_strings(table, order, key, ids=None, right=False):
+    # Insertion point of key (utf-8 bytes) in order, from sort_strings(table,
+    #   ids).  Plain memoryview reads, numpy scalars are slow one at a time
+    order, offsets, blob = memoryview(order), memoryview(table.offsets), table.blob
+    ids = None if ids is None else memoryview(ids)
+    lo, hi = 0, len(order)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        i = order[mid] if ids is None else ids[order[mid]]
+        encoded = bytes(blob[offsets[i] : offsets[i + 1]])
+        if encoded < key or (right and encoded == key):
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+class StringIndex:
+    """
+    Read-only str -> id lookup over a StringTable by binary search on the
+    ids sorted by their utf-8 bytes: 4 bytes a string and no per-process
+    dict, e.g. for a graph in shared memory.  Quacks like the uid_index dict.
+    """
+
+    def __init__(self, table, order):
+        self.table = table
+        self.order = order
+
+    @classmethod
+    def from_table(cls, table):
+        return cls(table, sort_strings(table))
+
+    def __len__(self):
+        return len(self.order)
+
+    def get(self, s, default=None):
+        pos = bisect_strings(self.table, self.order, s.encode("utf-8"))
+        if pos < len(self.order):
+            i = int(self.order[pos])
+            if self.table.encoded(i) == s.encode("utf-8"):
+                return i
+        return default
+
+    def __getitem__(self, s):
+        sid = self.get(s)
+        if sid is None:
+            raise KeyError(s)
+        return sid
+
+    def __contains__(self, s):
+        return self.get(s) is not None
+
+
+class _Interner(inu.SymbolTable):
+    # Build-time str -> id mapping, turned into a StringTable when done
+    def to_table(self):
+        return StringTable.from_strings(self.strings)
+
+
+# ---------------- Columnar Graph ---------------- #
+
+
+class CompactGraphBuilder:
+    """
+    Accumulates pages into parallel python lists, laid out in pre-order so
+    that every subtree occupies a contiguous range of block indexes.
+    Call build() to freeze them into a CompactGraph.
+    """
+
+    def __init__(self):
+        self.symbols = _Interner()  # block uids and ref uids share one id space
+        self.strings = _Interner()
+        self.uid_id = []
+        self.title_id = []
+        self.string_id = []
+        self.parent = []
+        self.depth = []
+        self.subtree_end = []
+        self.create_time = []
+        self.edit_time = []
+        self.ref_offsets = [0]
+        self.ref_targets = []
+        self.page_roots = []
+
+    def add_page(self, json):
+        # Raw export dict, refs are filtered like RoamNode does
+        def fields(js):
+            if not isinstance(js, dict):
+                raise Exception("RoamNode expects a non-null dict as input")
+            refs = [
+                r["uid"] for r in js.get("refs", []) if r["uid"] not in gu.UID_BLACKLIST
+            ]
+            return (
+                js.get("uid"),
+                js.get("title"),
+                js.get("string"),
+                js.get("create-time"),
+                js.get("edit-time"),
+                refs,
+            )
+
+        self._add_tree(json, fields, lambda js: js.get("children", []))
+
+    def add_page_node(self, node):
+        # Anything RoamNode-like (already parsed)
+        def fields(n):
+            return n.uid, n.title, n.string, n.create_time, n.edit_time, n.refs
+
+        self._add_tree(node, fields, lambda n: n.children)
+
+    def _add_tree(self, root, get_fields, get_children):
+        self.page_roots.append(len(self.uid_id))
+        # Pre-order walk, exit markers (_SUBTREE_EXIT, idx) close each subtree
+        stack = [(root, MISSING, 0)]
+        while stack:
+            elem, parent, depth = stack.pop()
+            if elem is _SUBTREE_EXIT:
+                self.subtree_end[parent] = len(self.uid_id)
+                continue
+
+            uid, title, string, create_time, edit_time, refs = get_fields(elem)
+            idx = len(self.uid_id)
+            self.uid_id.append(self.symbols.add(uid))
+            self.title_id.append(self.strings.add(title))
+            self.string_id.append(self.strings.add(string))
+            self.parent.append(parent)
+            self.depth.append(depth)
+            self.subtree_end.append(idx + 1)
+            self.create_time.append(MISSING if create_time is None else create_time)
+            self.edit_time.append(MISSING if edit_time is None else edit_time)
+            self.ref_targets.extend(self.symbols.add(r) for r in refs)
+            self.ref_offsets.append(len(self.ref_targets))
+
+            stack.append((_SUBTREE_EXIT, idx, depth))
+            stack.extend((ch, idx, depth + 1) for ch in reversed(get_children(elem)))
+
+    def build(self, keep_uid_index=True):
+        # keep_uid_index=False drops the uid -> id dict (rebuilt lazily on
+        #   lookup), e.g. for shards that are about to be pickled and merged
+        return CompactGraph(
+            uids=self.symbols.to_table(),
+            uid_index=self.symbols.ids if keep_uid_index else None,
+            strings=self.strings.to_table(),
+            **{
+                name: np.array(getattr(self, name), dtype=dtype)
+                for name, dtype in COLUMN_DTYPES.items()
+            },
+        )
+
+
+class CompactGraph:
+    """
+    Column store for a Roam graph: one row per block (pages included) in
+    pre-order, so the subtree of block i is range(i, subtree_end[i]).
+
+    Ref adjacency is CSR style: the refs of block i are the symbol ids
+    ref_targets[ref_offsets[i]:ref_offsets[i + 1]].  Block uids, ref uids
+    and title/string text are interned into StringTables.
+    """
+
+    COLUMNS = list(COLUMN_DTYPES)
+
+    def __init__(
+        self,
+        uids,
+        strings,
+        uid_index=None,
+        symbol_blocks=None,
+        page_order=None,
+        **columns,
+    ):
+        self.uids = uids
+        self.strings = strings
+        for name in self.COLUMNS:
+            setattr(self, name, columns[name])
+
+        # uid -> symbol id, symbol id -> block idx and pages sorted by title,
+        #   built lazily if needed
+        self._uid_index = uid_index
+        self._symbol_blocks = symbol_blocks
+        self._page_order = page_order
+        self._page_title_ids = None
+
+    @classmethod
+    def from_pages(cls, pages):
+        builder = CompactGraphBuilder()
+        for page in pages:
+            builder.add_page(page)
+        return builder.build()
+
+    @classmethod
+    def from_page_nodes(cls, page_nodes):
+        builder = CompactGraphBuilder()
+        for node in page_nodes:
+            builder.add_page_node(node)
+        return builder.build()
+
+    @classmethod
+    def concat(cls, graphs):
+        """
+        Merge graphs (e.g. shards of one export) into one, in order.  Uid
+        symbols are re-interned into a single id space so refs and lookups
+        are consistent across shards, text tables are just appended.
+        """
+        # Interned as utf-8 bytes, skipping a decode/encode round trip
+        symbol_ids = {}
+        columns = {name: [] for name in cls.COLUMNS}
+        blobs, string_offsets = [], []
+        n_blocks = n_refs = n_strings = n_string_bytes = 0
+        for graph in graphs:
+            # Trailing MISSING so that uid_remap[MISSING] stays MISSING
+            uid_remap = [
+                symbol_ids.setdefault(uid, len(symbol_ids))
+                for uid in graph.uids.iter_encoded()
+            ]
+            uid_remap = np.array(uid_remap + [MISSING], dtype=np.int32)
+            columns["uid_id"].append(uid_remap[graph.uid_id])
+            columns["title_id"].append(_shift_ids(graph.title_id, n_strings))
+            columns["string_id"].append(_shift_ids(graph.string_id, n_strings))
+            columns["parent"].append(_shift_ids(graph.parent, n_blocks))
+            columns["depth"].append(graph.depth)
+            columns["subtree_end"].append(graph.subtree_end + n_blocks)
+            columns["create_time"].append(graph.create_time)
+            columns["edit_time"].append(graph.edit_time)
+            columns["ref_offsets"].append(graph.ref_offsets[:-1] + n_refs)
+            columns["ref_targets"].append(uid_remap[graph.ref_targets])
+            columns["page_roots"].append(graph.page_roots + n_blocks)
+
+            blobs.append(bytes(graph.strings.blob))
+            string_offsets.append(graph.strings.offsets[:-1] + n_string_bytes)
+            n_blocks += graph.num_blocks
+            n_refs += len(graph.ref_targets)
+            n_strings += len(graph.strings)
+            n_string_bytes += len(graph.strings.blob)
+        columns["ref_offsets"].append(np.array([n_refs]))
+        string_offsets.append(np.array([n_string_bytes]))
+
+        return cls(
+            uids=StringTable.from_encoded(list(symbol_ids)),
+            strings=StringTable(b"".join(blobs), np.concatenate(string_offsets)),
+            **{
+                name: (
+                    np.concatenate(parts).astype(COLUMN_DTYPES[name], copy=False)
+                    if parts
+                    else np.zeros(0, dtype=COLUMN_DTYPES[name])
+                )
+                for name, parts in columns.items()
+            },
+        )
+
+    @property
+    def num_blocks(self):
+        return len(self.uid_id)
+
+    @property
+    def num_pages(self):
+        return len(self.page_roots)
+
+    @property
+    def nbytes(self):
+        columns = sum(getattr(self, name).nbytes for name in self.COLUMNS)
+        return columns + self.uids.nbytes + self.strings.nbytes
+
+    # ---- Column accessors ---- #
+
+    def get_uid(self, idx):
+        uid_id = self.uid_id[idx]
+        return None if uid_id == MISSING else self.uids[uid_id]
+
+    def get_text(self, text_id):
+        return None if text_id == MISSING else self.strings[text_id]
+
+    def get_time(self, times, idx):
+        t = int(times[idx])
+        return None if t == MISSING else t
+
+    def get_refs(self, idx):
+        targets = self.ref_targets[self.ref_offsets[idx] : self.ref_offsets[idx + 1]]
+        return [self.uids[t] for t in targets]
+
+    def get_ref_ids(self, idx):
+        # Ids into self.uids, the same id space as uid_id
+        return self.ref_targets[self.ref_offsets[idx] : self.ref_offsets[idx + 1]]
+
+    def get_recursive_ref_ids(self, idx):
+        # Pre-order layout makes a subtree's refs one contiguous CSR slice
+        start = self.ref_offsets[idx]
+        end = self.ref_offsets[self.subtree_end[idx]]
+        return inu.IdSet.from_ids(self.ref_targets[start:end])
+
+    def get_recursive_refs(self, idx):
+        return {self.uids[t] for t in self.get_recursive_ref_ids(idx)}
+
+    def has_recursive_ref(self, idx, uid):
+        return self.uid_index.get(uid, MISSING) in self.get_recursive_ref_ids(idx)
+
+    def get_subtree_ref_pairs(self, idx):
+        # (source block uid, target uid) for every ref in the subtree
+        end = self.subtree_end[idx]
+        counts = np.diff(self.ref_offsets[idx : end + 1])
+        sources = np.repeat(np.arange(idx, end), counts)
+        targets = self.ref_targets[self.ref_offsets[idx] : self.ref_offsets[end]]
+        return [
+            (self.get_uid(source), self.uids[target])
+            for source, target in zip(sources, targets)
+        ]
+
+    def get_children(self, idx):
+        children = []
+        child = idx + 1
+        end = self.subtree_end[idx]
+        while child < end:
+            children.append(child)
+            child = self.subtree_end[child]
+        return children
+
+    # ---- Block lookup ---- #
+
+    @property
+    def uid_index(self):
+        if self._uid_index is None:
+            self._uid_index = {uid: i for i, uid in enumerate(self.uids)}
+        return self._uid_index
+
+    @property
+    def symbol_blocks(self):
+        if self._symbol_blocks is None:
+            blocks = np.full(len(self.uids), MISSING, dtype=np.int32)
+            has_uid = np.flatnonzero(self.uid_id != MISSING).astype(np.int32)
+            # Duplicate uids resolve to the last block, as with a dict
+            blocks[self.uid_id[has_uid]] = has_uid
+            self._symbol_blocks = blocks
+        return self._symbol_blocks
+
+    def get_block_idx(self, uid):
+        idx = self.symbol_blocks[self.uid_index[uid]]
+        if idx == MISSING:
+            raise KeyError(uid)  # only seen as a ref target
+        return int(idx)
+
+    def get_page_root(self, idx):
+        page_idx = np.searchsorted(self.page_roots, idx, side="right") - 1
+        return int(self.page_roots[page_idx])
+
+    # ---- Export-style dicts ---- #
+
+    def get_raw_block(self, idx):
+        # Rebuild an export-style dict for the subtree at idx from the columns
+        end = int(self.subtree_end[idx])
+        blocks = []
+        for i in range(idx, end):
+            block = {"uid": self.get_uid(i)}
+            for key, value in [
+                ("title", self.get_text(self.title_id[i])),
+                ("string", self.get_text(self.string_id[i])),
+                ("create-time", self.get_time(self.create_time, i)),
+                ("edit-time", self.get_time(self.edit_time, i)),
+            ]:
+                if value is not None:
+                    block[key] = value
+            refs = self.get_refs(i)
+            if refs:
+                block["refs"] = [{"uid": r} for r in refs]
+            if i > idx:
+                parent = blocks[self.parent[i] - idx]
+                parent.setdefault("children", []).append(block)
+            blocks.append(block)
+        return blocks[0]
+
+    def iter_raw_pages(self):
+        # get_raw_block of every page, with the columns and string tables
+        #   decoded once up front rather than element by element
+        uids, strings = list(self.uids), list(self.strings)
+        uid_id, title_id, string_id = (
+            self.uid_id.tolist(),
+            self.title_id.tolist(),
+            self.string_id.tolist(),
+        )
+        create_time, edit_time = self.create_time.tolist(), self.edit_time.tolist()
+        ref_offsets, ref_targets = self.ref_offsets.tolist(), self.ref_targets.tolist()
+        parent, subtree_end = self.parent.tolist(), self.subtree_end.tolist()
+        for root in self.page_roots.tolist():
+            blocks = []
+            for i in range(root, subtree_end[root]):
+                block = {"uid": None if uid_id[i] == MISSING else uids[uid_id[i]]}
+                if title_id[i] != MISSING:
+                    block["title"] = strings[title_id[i]]
+                if string_id[i] != MISSING:
+                    block["string"] = strings[string_id[i]]
+                if create_time[i] != MISSING:
+                    block["create-time"] = create_time[i]
+                if edit_time[i] != MISSING:
+                    block["edit-time"] = edit_time[i]
+                targets = ref_targets[ref_offsets[i] : ref_offsets[i + 1]]
+                if targets:
+                    block["refs"] = [{"uid": uids[t]} for t in targets]
+                if i > root:
+                    parent_block = blocks[parent[i] - root]
+                    parent_block.setdefault("children", []).append(block)
+                blocks.append(block)
+            yield blocks[0]
+
+    # ---- Node views ---- #
+
+    def node(self, idx):
+        return CompactNode(self, int(idx))
+
+    def page_node(self, page_idx):
+        return self.node(self.page_roots[page_idx])
+
+    def page_titles(self):
+        return self.strings.take(self.page_title_ids)
+
+    def page_uids(self):
+        return self.uids.take(self.uid_id[self.page_roots])
+
+    # ---- Page lookup ---- #
+
+    @property
+    def page_title_ids(self):
+        if self._page_title_ids is None:
+            self._page_title_ids = np.ascontiguousarray(self.title_id[self.page_roots])
+        return self._page_title_ids
+
+    @property
+    def page_order(self):
+        # Page idxs sorted by title, saved with checkpoints
+        if self._page_order is None:
+            self._page_order = sort_strings(self.strings, self.page_title_ids)
+        return self._page_order
+
+    def page_idx_of_title(self, title):
+        # Last page with this title (as in a dict built in page order), by
+        #   binary search so no per-page dict is needed
+        key = title.encode("utf-8")
+        pos = bisect_strings(
+            self.strings, self.page_order, key, ids=self.page_title_ids, right=True
+        )
+        if pos > 0:
+            page_idx = int(self.page_order[pos - 1])
+            if self.strings.encoded(int(self.page_title_ids[page_idx])) == key:
+                return page_idx
+        raise KeyError(title)
+
+
+class CompactPages(Mapping):
+    # title -> page node, single lookups by binary search over page_order,
+    #   anything else builds the {title: node} dict on first use
+    def __init__(self, store):
+        self.store = store
+        self._pages = None
+
+    @property
+    def pages(self):
+        if self._pages is None:
+            roots = self.store.page_roots.tolist()
+            self._pages = {
+                title: CompactNode(self.store, root)
+                for title, root in zip(self.store.page_titles(), roots)
+            }
+        return self._pages
+
+    def __getitem__(self, title):
+        if self._pages is not None:
+            return self._pages[title]
+        return self.store.page_node(self.store.page_idx_of_title(title))
+
+    def __iter__(self):
+        return iter(self.pages)
+
+    def __len__(self):
+        return len(self.pages)
+
+
+class CompactPageTitles(Sequence):
+    # Page titles in page order, decoded on first use
+    def __init__(self, store):
+        self.store = store
+        self._titles = None
+
+    @property
+    def titles(self):
+        if self._titles is None:
+            self._titles = self.store.page_titles()
+        return self._titles
+
+    def __getitem__(self, idx):
+        return self.titles[idx]
+
+    def __len__(self):
+        return self.store.num_pages
+
+    def __eq__(self, other):
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return list(self) == list(other)
+
+
+class CompactUidToTitle(Mapping):
+    # page uid -> title, built on first use
+    def __init__(self, store):
+        self.store = store
+        self._titles = None
+
+    @property
+    def titles(self):
+        if self._titles is None:
+            store = self.store
+            self._titles = dict(zip(store.page_uids(), store.page_titles()))
+        return self._titles
+
+    def __getitem__(self, uid):
+        return self.titles[uid]
+
+    def __iter__(self):
+        return iter(self.titles)
+
+    def __len__(self):
+        return len(self.titles)
+
+
+class RawPageView:
+    """
+    Sequence of export-style page dicts, rebuilt from a CompactGraph on
+    access (keys that aren't stored, like users, are lost).
+
+    Pages that are set or appended afterwards (e.g. a re-parsed page) are
+    kept in memory as overrides, like stream_utils.JsonArrayIndex.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.overrides = {}
+        self.num_appended = 0
+
+    def __len__(self):
+        return self.store.num_pages + self.num_appended
+
+    def __setitem__(self, idx, raw_page):
+        self.overrides[range(len(self))[idx]] = raw_page
+
+    def append_elem(self, raw_page):
+        self.num_appended += 1
+        self.overrides[len(self) - 1] = raw_page
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        idx = range(len(self))[idx]
+        if idx in self.overrides:
+            return self.overrides[idx]
+        return self.store.get_raw_block(int(self.store.page_roots[idx]))
+
+    def __iter__(self):
+        for i, raw_page in enumerate(self.store.iter_raw_pages()):
+            yield self.overrides.get(i, raw_page)
+        for i in range(self.store.num_pages, len(self)):
+            yield self.overrides[i]
+
+
+class CompactNode:
+    """
+    Thin RoamNode-compatible view of one row of a CompactGraph.  Attributes
+    are read from the columns on access, nothing is copied.
+    """
+
+    __slots__ = ("graph", "idx")
+
+    raw_data = None
+
+    def __init__(self, graph, idx):
+        self.graph = graph
+        self.idx = idx
+
+    @property
+    def uid(self):
+        return self.graph.get_uid(self.idx)
+
+    @property
+    def title(self):
+        return self.graph.get_text(self.graph.title_id[self.idx])
+
+    @property
+    def string(self):
+        return self.graph.get_text(self.graph.string_id[self.idx])
+
+    @property
+    def create_time(self):
+        return self.graph.get_time(self.graph.create_time, self.idx)
+
+    @property
+    def edit_time(self):
+        return self.graph.get_time(self.graph.edit_time, self.idx)
+
+    @property
+    def depth(self):
+        return int(self.graph.depth[self.idx])
+
+    @property
+    def parent(self):
+        parent = self.graph.parent[self.idx]
+        return None if parent == MISSING else self.graph.node(parent)
+
+    @property
+    def children(self):
+        return [self.graph.node(ch) for ch in self.graph.get_children(self.idx)]
+
+    @property
+    def refs(self):
+        return self.graph.get_refs(self.idx)
+
+    @property
+    def ref_ids(self):
+        return self.graph.get_ref_ids(self.idx)
+
+    @property
+    def markup(self):
+        return mu.parse_block(self.string)
+
+    @property
+    def recursive_ref_ids(self):
+        return self.graph.get_recursive_ref_ids(self.idx)
+
+    @property
+    def recursive_refs(self):
+        return self.graph.get_recursive_refs(self.idx)
+
+    def has_recursive_ref(self, uid):
+        return self.graph.has_recursive_ref(self.idx, uid)
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, CompactNode)
+            and self.graph is other.graph
+            and self.idx == other.idx
+        )
+
+    def __hash__(self):
+        return hash((id(self.graph), self.idx))
+
+    def __repr__(self):
+        buffer = gu.add_roam_elem_str_to_buffer(
+            uid=self.uid,
+            refs=self.refs,
+            title=self.title,
+            string=self.string,
+            depth=self.depth,
+        )
+        rep = buffer.getvalue()
+        buffer.close()
+        return rep
+
+    def print_full(self, max_depth=None, max_blocks=None):
+        gu.write_roam_str(self, sys.stdout, max_depth, max_blocks)
+        sys.stdout.write("\n")
@@ -0,0 +1,118 @@
+from dataclasses import dataclass, field
+
+from roam_man import tree_utils as tu
+
+# ---------------- Page Fingerprints ---------------- #
+
+# A page's fingerprint covers the uid, create/edit times and child count of
+#   every block in pre-order, so edits, additions, deletions and moves all
+#   change it without having to compare block strings.
+
+
+def iter_raw_blocks(raw_page):
+    # Pre-order (block dict, parent uid) over an export-style page dict
+    stack = [(raw_page, None)]
+    while stack:
+        block, parent_uid = stack.pop()
+        yield block, parent_uid
+        children = block.get("children", [])
+        stack.extend((ch, block.get("uid")) for ch in reversed(children))
+
+
+def raw_page_fingerprint(raw_page):
+    return hash(
+        tuple(
+            (
+                block.get("uid"),
+                block.get("create-time"),
+                block.get("edit-time"),
+                len(block.get("children", [])),
+            )
+            for block, _ in iter_raw_blocks(raw_page)
+        )
+    )
+
+
+def page_node_fingerprint(page_node):
+    return hash(
+        tuple(
+            (node.uid, node.create_time, node.edit_time, len(node.children))
+            for node in tu.iter_subtree(page_node)
+        )
+    )
+
+
+# ---------------- Changesets ---------------- #
+
+
+@dataclass
+class GraphChangeset:
+    """
+    Pages (by title) and blocks (by uid) touched by a re-import.
+
+    Pages are recorded one at a time, the block lists are filled in by
+    diff_blocks() once every page has been, so a block moved between pages
+    counts as changed rather than as removed from one and added to another.
+    """
+
+    added_pages: list = field(default_factory=list)
+    removed_pages: list = field(default_factory=list)
+    changed_pages: list = field(default_factory=list)
+    added_blocks: list = field(default_factory=list)
+    removed_blocks: list = field(default_factory=list)
+    changed_blocks: list = field(default_factory=list)
+    # Blocks of the recorded pages, uid -> (edit time, parent uid)
+    old_blocks: dict = field(default_factory=dict, repr=False, compare=False)
+    new_blocks: dict = field(default_factory=dict, repr=False, compare=False)
+
+    def __bool__(self):
+        return any(
+            [
+                self.added_pages,
+                self.removed_pages,
+                self.changed_pages,
+                self.added_blocks,
+                self.removed_blocks,
+                self.changed_blocks,
+            ]
+        )
+
+    def record_old_blocks(self, page_node):
+        self.old_blocks.update(
+            (
+                node.uid,
+                (node.edit_time, None if node.parent is None else node.parent.uid),
+            )
+            for node in tu.iter_subtree(page_node)
+        )
+
+    def record_new_blocks(self, raw_page):
+        self.new_blocks.update(
+            (block.get("uid"), (block.get("edit-time"), parent_uid))
+            for block, parent_uid in iter_raw_blocks(raw_page)
+        )
+
+    def record_added_page(self, raw_page):
+        self.added_pages.append(raw_page["title"])
+        self.record_new_blocks(raw_page)
+
+    def record_removed_page(self, page_node):
+        self.removed_pages.append(page_node.title)
+        self.record_old_blocks(page_node)
+
+    def record_changed_page(self, old_page_node, new_raw_page):
+        self.changed_pages.append(new_raw_page["title"])
+        self.record_old_blocks(old_page_node)
+        self.record_new_blocks(new_raw_page)
+
+    def diff_blocks(self):
+        # Edited and moved blocks count as changed
+        old_blocks, new_blocks = self.old_blocks, self.new_blocks
+        self.added_blocks = [uid for uid in new_blocks if uid not in old_blocks]
+        self.removed_blocks = [uid for uid in old_blocks if uid not in new_blocks]
+        self.changed_blocks = [
+            uid
+            for uid, state in new_blocks.items()
+            if uid in old_blocks and old_blocks[uid] != state
+        ]
+        return self
@@ -0,0 +1,283 @@
+import json
+from pathlib import Path
+
+import numpy as np
+
+from roam_man import compact_graph as cg
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional, only needed for parquet output
+    pa = pq = None
+
+EXPORT_FORMATS = ["auto", "parquet", "npy"]
+SCHEMA_FILE = "schema.json"
+
+# ---------------- Table Schemas ---------------- #
+
+# Column -> type.  "uid" / "text" columns are looked up in the store's uids /
+#   strings tables, everything else is an int column where MISSING (-1)
+#   means null.
+TABLES = {
+    "blocks": {
+        "uid": "uid",
+        "parent_uid": "uid",
+        "page_uid": "uid",
+        "depth": "int32",
+        "title": "text",
+        "string": "text",
+        "create_time": "int64",
+        "edit_time": "int64",
+    },
+    "pages": {
+        "uid": "uid",
+        "title": "text",
+        "block_idx": "int32",
+        "num_blocks": "int32",
+        "create_time": "int64",
+        "edit_time": "int64",
+    },
+    "refs": {
+        "source_uid": "uid",
+        "target_uid": "uid",
+        "source_idx": "int32",
+    },
+}
+
+
+def num_rows(store, table):
+    return {
+        "blocks": store.num_blocks,
+        "pages": store.num_pages,
+        "refs": len(store.ref_targets),
+    }[table]
+
+
+def table_chunk(store, table, start, end):
+    # Columns for rows [start, end) of table, string columns as ids into
+    #   store.uids / store.strings, all computed with vectorized gathers
+    if table == "blocks":
+        idx = np.arange(start, end)
+        parent = np.asarray(store.parent[start:end])
+        page_root = store.page_roots[
+            np.searchsorted(store.page_roots, idx, side="right") - 1
+        ]
+        return {
+            "uid": store.uid_id[start:end],
+            "parent_uid": _gather(store.uid_id, parent),
+            "page_uid": store.uid_id[page_root],
+            "depth": store.depth[start:end],
+            "title": store.title_id[start:end],
+            "string": store.string_id[start:end],
+            "create_time": store.create_time[start:end],
+            "edit_time": store.edit_time[start:end],
+        }
+    if table == "pages":
+        roots = np.asarray(store.page_roots[start:end])
+        return {
+            "uid": store.uid_id[roots],
+            "title": store.title_id[roots],
+            "block_idx": roots,
+            "num_blocks": np.asarray(store.subtree_end[roots]) - roots,
+            "create_time": store.create_time[roots],
+            "edit_time": store.edit_time[roots],
+        }
+    # refs: rows are CSR entries, find the source block of each
+    sources = np.searchsorted(store.ref_offsets, np.arange(start, end), "right") - 1
+    return {
+        "source_uid": store.uid_id[sources],
+        "target_uid": store.ref_targets[start:end],
+        "source_idx": sources,
+    }
+
+
+def _gather(values, ids):
+    # values[ids] with MISSING ids passed through
+    out = np.full(len(ids), cg.MISSING, dtype=values.dtype)
+    present = ids != cg.MISSING
+    out[present] = values[ids[present]]
+    return out
+
+
+def string_table_for(store, kind):
+    return store.uids if kind == "uid" else store.strings
+
+
+# ---------------- Writers ---------------- #
+
+
+def export_graph(store, out_dir, format="auto", chunk_size=1 << 20):
+    """
+    Write the blocks, pages and refs (edge list) of a CompactGraph as
+    columnar tables, chunk_size rows at a time.
+
+    Args:
+        store (CompactGraph): The graph, e.g. RoamGraph.to_compact_graph().
+        out_dir (str): Output directory.
+        format (str): "parquet" (needs pyarrow), "npy" (Arrow-style columns
+            as .npy files, see write_npy_table), or "auto" for parquet when
+            pyarrow is installed.
+        chunk_size (int): Rows per chunk / parquet row group.
+
+    Returns:
+        dict: {table name: path written}
+    """
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of {EXPORT_FORMATS}")
+    if format == "auto":
+        format = "npy" if pa is None else "parquet"
+    if format == "parquet" and pa is None:
+        raise ImportError("Parquet export requires pyarrow (pip install pyarrow)")
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    write_table = write_parquet_table if format == "parquet" else write_npy_table
+    return {table: write_table(store, table, out_dir, chunk_size) for table in TABLES}
+
+
+def iter_chunk_bounds(total, chunk_size):
+    for start in range(0, total, chunk_size):
+        yield start, min(start + chunk_size, total)
+
+
+def write_parquet_table(store, table, out_dir, chunk_size):
+    path = out_dir / f"{table}.parquet"
+    columns = TABLES[table]
+    dictionaries = {
+        kind: _arrow_strings(string_table_for(store, kind)) for kind in ["uid", "text"]
+    }
+    schema = pa.schema(
+        [
+            (name, pa.large_string() if kind in dictionaries else getattr(pa, kind)())
+            for name, kind in columns.items()
+        ]
+    )
+    with pq.ParquetWriter(path, schema) as writer:
+        for start, end in iter_chunk_bounds(num_rows(store, table), chunk_size):
+            chunk = table_chunk(store, table, start, end)
+            arrays = []
+            for name, kind in columns.items():
+                values = np.asarray(chunk[name])
+                array = pa.array(values, mask=values == cg.MISSING)
+                if kind in dictionaries:
+                    array = dictionaries[kind].take(array)
+                arrays.append(array.cast(schema.field(name).type))
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+    return path
+
+
+def _arrow_strings(table):
+    # Zero-copy large_string view of a StringTable's blob and offsets
+    offsets = np.ascontiguousarray(table.offsets, dtype=np.int64)
+    return pa.LargeStringArray.from_buffers(
+        len(table), pa.py_buffer(offsets), pa.py_buffer(table.blob)
+    )
+
+
+def write_npy_table(store, table, out_dir, chunk_size):
+    """
+    Arrow-style layout without pyarrow, every file a plain .npy that can be
+    memory-mapped back with np.load(mmap_mode="r"):
+        <table>/<col>.npy                        int columns, -1 is null
+        <col>.offsets.npy, <col>.data.npy        string columns: int64 row
+                                                   offsets + utf-8 bytes
+        <col>.null.npy                           string column null mask
+    Files are preallocated and filled chunk by chunk.
+    """
+    table_dir = out_dir / table
+    table_dir.mkdir(parents=True, exist_ok=True)
+    columns = TABLES[table]
+    total = num_rows(store, table)
+    open_npy = np.lib.format.open_memmap
+
+    # A first pass sizes each string column's data file
+    string_columns = {n: k for n, k in columns.items() if k in ["uid", "text"]}
+    data_sizes = dict.fromkeys(string_columns, 0)
+    for start, end in iter_chunk_bounds(total, chunk_size):
+        chunk = table_chunk(store, table, start, end)
+        for name, kind in string_columns.items():
+            strings = string_table_for(store, kind)
+            data_sizes[name] += int(_string_lengths(strings, chunk[name]).sum())
+
+    outputs = {}
+    for name, kind in columns.items():
+        if name in string_columns:
+            outputs[name] = {
+                "offsets": open_npy(
+                    table_dir / f"{name}.offsets.npy", "w+", np.int64, (total + 1,)
+                ),
+                "data": open_npy(
+                    table_dir / f"{name}.data.npy", "w+", np.uint8, (data_sizes[name],)
+                ),
+                "null": open_npy(table_dir / f"{name}.null.npy", "w+", bool, (total,)),
+            }
+            outputs[name]["offsets"][0] = 0
+        else:
+            outputs[name] = open_npy(table_dir / f"{name}.npy", "w+", kind, (total,))
+
+    for start, end in iter_chunk_bounds(total, chunk_size):
+        chunk = table_chunk(store, table, start, end)
+        for name, kind in columns.items():
+            values = np.asarray(chunk[name])
+            if name not in string_columns:
+                outputs[name][start:end] = values
+                continue
+            out = outputs[name]
+            strings = string_table_for(store, kind)
+            lengths = _string_lengths(strings, values)
+            base = out["offsets"][start]
+            out["offsets"][start + 1 : end + 1] = base + np.cumsum(lengths)
+            out["data"][base : base + lengths.sum()] = _gather_bytes(
+                strings, values, lengths
+            )
+            out["null"][start:end] = values == cg.MISSING
+
+    for output in outputs.values():
+        for array in output.values() if isinstance(output, dict) else [output]:
+            array.flush()
+    schema = {"table": table, "num_rows": total, "columns": columns}
+    (table_dir / SCHEMA_FILE).write_text(json.dumps(schema, indent=2))
+    return table_dir
+
+
+def _string_lengths(strings, ids):
+    ids = np.asarray(ids)
+    lengths = np.zeros(len(ids), dtype=np.int64)
+    present = ids != cg.MISSING
+    lengths[present] = strings.offsets[ids[present] + 1] - strings.offsets[ids[present]]
+    return lengths
+
+
+def _gather_bytes(strings, ids, lengths):
+    # Concatenated utf-8 bytes of strings[ids] via one fancy index
+    blob = np.frombuffer(strings.blob, dtype=np.uint8)
+    starts = np.zeros(len(ids), dtype=np.int64)
+    present = ids != cg.MISSING
+    starts[present] = strings.offsets[ids[present]]
+    out_starts = np.cumsum(lengths) - lengths
+    positions = np.repeat(starts - out_starts, lengths) + np.arange(lengths.sum())
+    return blob[positions]
+
+
+# ---------------- Readers ---------------- #
+
+
+def load_npy_table(table_dir, mmap_mode="r"):
+    # {column: int array or StringTable}, memory-mapped, plus the null masks
+    #   of string columns under "<col>.null"
+    table_dir = Path(table_dir)
+    schema = json.loads((table_dir / SCHEMA_FILE).read_text())
+    columns = {}
+    for name, kind in schema["columns"].items():
+        if kind in ["uid", "text"]:
+            columns[name] = cg.StringTable(
+                np.load(table_dir / f"{name}.data.npy", mmap_mode=mmap_mode),
+                np.load(table_dir / f"{name}.offsets.npy", mmap_mode=mmap_mode),
+            )
+            columns[f"{name}.null"] = np.load(
+                table_dir / f"{name}.null.npy", mmap_mode=mmap_mode
+            )
+        else:
+            columns[name] = np.load(table_dir / f"{name}.npy", mmap_mode=mmap_mode)
+    return columns
@@ -0,0 +1,247 @@
+import numpy as np
+
+MISSING = -1
+SIMILARITY_MODES = ["out", "in", "both"]
+
+
+def gather_rows(indptr, indices, rows):
+    # Concatenation of the CSR rows, without a Python loop
+    starts = indptr[rows]
+    lengths = indptr[np.asarray(rows) + 1] - starts
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return indices[offsets + np.arange(lengths.sum())]
+
+
+def top_k(scores, k):
+    # Indices of the k largest scores, largest first, ties by index
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    if k < len(scores):
+        idx = np.argpartition(-scores, k - 1)[:k]
+    else:
+        idx = np.arange(len(scores))
+    return idx[np.lexsort((idx, -scores[idx]))]
+
+
+# ---------------- Page Graph ---------------- #
+
+
+class PageGraph:
+    """
+    Page-level reference graph as a CSR adjacency matrix: an edge p -> q
+    when any block on page p references page q or a block on it.  Edges are
+    unweighted and self links are dropped.  Pages are numbered 0..n-1 in the
+    graph's page order.
+
+    Layout:
+        indptr      int64 (num_pages + 1), page p links to
+                      indices[indptr[p]:indptr[p + 1]]
+        indices     int32 target pages, sorted within a row
+    The transpose (in-links) is built on first use.
+    """
+
+    def __init__(self, titles, indptr, indices):
+        self.titles = titles
+        self.indptr = indptr
+        self.indices = indices
+        self._transpose = None
+        self._page_index = None
+
+    @classmethod
+    def from_edges(cls, titles, sources, targets):
+        n = len(titles)
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        keep = (sources != targets) & (sources != MISSING) & (targets != MISSING)
+        # Sorted unique (source, target) pairs are the CSR rows in order
+        edges = np.unique(sources[keep] * n + targets[keep])
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(edges // n, minlength=n), out=indptr[1:])
+        return cls(titles, indptr, (edges % n).astype(np.int32))
+
+    @classmethod
+    def from_compact_graph(cls, store):
+        num_blocks = len(store.uid_id)
+        sources = np.repeat(
+            np.arange(num_blocks, dtype=np.int64), np.diff(store.ref_offsets)
+        )
+        targets = store.symbol_blocks[store.ref_targets]
+        keep = targets != MISSING
+        page_roots = store.page_roots
+        return cls.from_edges(
+            store.page_titles(),
+            np.searchsorted(page_roots, sources[keep], side="right") - 1,
+            np.searchsorted(page_roots, targets[keep], side="right") - 1,
+        )
+
+    @property
+    def num_pages(self):
+        return len(self.indptr) - 1
+
+    @property
+    def num_edges(self):
+        return len(self.indices)
+
+    @property
+    def nbytes(self):
+        return self.indptr.nbytes + self.indices.nbytes
+
+    def page_idx(self, title):
+        if self._page_index is None:
+            self._page_index = {title: i for i, title in enumerate(self.titles)}
+        return self._page_index[title]
+
+    @property
+    def sources(self):
+        # Source page of each edge, aligned with indices
+        return np.repeat(
+            np.arange(self.num_pages, dtype=np.int32), np.diff(self.indptr)
+        )
+
+    @property
+    def transpose(self):
+        # (indptr, indices) of the in-links
+        if self._transpose is None:
+            order = np.argsort(self.indices, kind="stable")
+            indptr = np.zeros(self.num_pages + 1, dtype=np.int64)
+            np.cumsum(
+                np.bincount(self.indices, minlength=self.num_pages), out=indptr[1:]
+            )
+            self._transpose = (indptr, self.sources[order])
+        return self._transpose
+
+    def links(self, page):
+        return self.indices[self.indptr[page] : self.indptr[page + 1]]
+
+    def backlinks(self, page):
+        indptr, indices = self.transpose
+        return indices[indptr[page] : indptr[page + 1]]
+
+    # ---- Degrees ---- #
+
+    def out_degree(self):
+        return np.diff(self.indptr)
+
+    def in_degree(self):
+        return np.diff(self.transpose[0])
+
+    def degree_stats(self):
+        out_degree, in_degree = self.out_degree(), self.in_degree()
+        stats = {"pages": self.num_pages, "edges": self.num_edges}
+        for name, degree in [("out", out_degree), ("in", in_degree)]:
+            if not len(degree):
+                degree = np.zeros(1, dtype=np.int64)
+            stats[name] = {
+                "mean": float(degree.mean()),
+                "median": float(np.median(degree)),
+                "p99": float(np.percentile(degree, 99)),
+                "max": int(degree.max()),
+                "zero": int((degree == 0).sum()),
+            }
+        stats["isolated"] = int(((out_degree == 0) & (in_degree == 0)).sum())
+        return stats
+
+    # ---- Importance ---- #
+
+    def pagerank(self, damping=0.85, tol=1e-10, max_iter=100):
+        """
+        PageRank by power iteration, one sparse mat-vec (a bincount over the
+        edges) per step.  Pages without links spread their rank evenly.
+
+        Returns:
+            np.ndarray: float64 rank of each page, summing to 1.
+        """
+        n = self.num_pages
+        if n == 0:
+            return np.zeros(0)
+        out_degree = self.out_degree()
+        dangling = out_degree == 0
+        sources = self.sources
+        rank = np.full(n, 1.0 / n)
+        for _ in range(max_iter):
+            share = rank / np.maximum(out_degree, 1)
+            new = np.bincount(self.indices, weights=share[sources], minlength=n)
+            new = damping * (new + rank[dangling].sum() / n) + (1 - damping) / n
+            done = np.abs(new - rank).sum() < tol
+            rank = new
+            if done:
+                break
+        return rank
+
+    # ---- Clusters ---- #
+
+    def connected_components(self):
+        """
+        Weakly connected components (links in either direction), by hooking
+        roots along the edges then pointer jumping until nothing changes.
+
+        Returns:
+            (int, np.ndarray): The number of components and each page's
+                component, numbered largest first.
+        """
+        n = self.num_pages
+        labels = np.arange(n, dtype=np.int64)
+        sources, targets = self.sources, self.indices
+        while True:
+            a, b = labels[sources], labels[targets]
+            differ = a != b
+            if not differ.any():
+                break
+            # Every label is a root here, hook the larger onto the smaller
+            np.minimum.at(
+                labels,
+                np.maximum(a[differ], b[differ]),
+                np.minimum(a[differ], b[differ]),
+            )
+            while True:
+                jumped = labels[labels]
+                if np.array_equal(jumped, labels):
+                    break
+                labels = jumped
+
+        roots, labels, sizes = np.unique(
+            labels, return_inverse=True, return_counts=True
+        )
+        order = np.argsort(-sizes, kind="stable")
+        rank = np.empty(len(roots), dtype=np.int64)
+        rank[order] = np.arange(len(roots))
+        return len(roots), rank[labels.reshape(-1)]
+
+    # ---- Similarity ---- #
+
+    def similar_pages(self, page, k=10, mode="both"):
+        """
+        Pages most similar to page by co-reference: cosine similarity of
+        their link sets ("out": pages linking to the same pages, "in": pages
+        linked from the same pages, "both": either).
+
+        Returns:
+            list: [(page, score)] best first, at most k with score > 0.
+        """
+        if mode not in SIMILARITY_MODES:
+            raise ValueError(f"mode must be one of {SIMILARITY_MODES}: {mode}")
+        n = self.num_pages
+        t_indptr, t_indices = self.transpose
+        shared = np.zeros(n)
+        norms = np.zeros(n)
+        if mode in ["out", "both"]:
+            # Pages with a link to any of page's targets
+            targets = self.links(page)
+            shared += np.bincount(
+                gather_rows(t_indptr, t_indices, targets), minlength=n
+            )
+            norms += self.out_degree()
+        if mode in ["in", "both"]:
+            # Pages linked from any of the pages linking to page
+            sources = self.backlinks(page)
+            shared += np.bincount(
+                gather_rows(self.indptr, self.indices, sources), minlength=n
+            )
+            norms += self.in_degree()
+
+        shared[page] = 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = np.where(shared > 0, shared / np.sqrt(norms * norms[page]), 0)
+        best = top_k(scores, k)
+        return [(int(p), float(scores[p])) for p in best if scores[p] > 0]
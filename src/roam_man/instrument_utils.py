@@ -0,0 +1,289 @@
+import contextlib
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+MIB = 1024 * 1024
+_DONE = object()
+
+# ---------------- Load Stats ---------------- #
+
+
+class LoadStats:
+    """
+    What a RoamGraph load spent its time and memory on.
+
+    phases: {phase: seconds}, exclusive of nested phases so they add up to
+        the total, e.g. "decode" (JSON decoding, also while streaming),
+        "build" (nodes / columns / database), "uid_to_title", "backlinks",
+        "cache_load", "cache_save", "checkpoint".
+    memory: {phase: snapshot} taken as each phase ends, peak RSS and, with
+        track_memory, traced Python allocations (current and phase peak).
+    Counters: pages, blocks (pages included), refs (kept), blacklisted_refs
+        (dropped), max_depth (of any block below its page).
+    """
+
+    def __init__(self):
+        self.phases = {}
+        self.memory = {}
+        self.pages = 0
+        self.blocks = 0
+        self.refs = 0
+        self.blacklisted_refs = 0
+        self.max_depth = 0
+        self.total_pages = None  # when known up front (non-streamed loads)
+        self.bytes_read = 0
+        self.total_bytes = None  # export size, streamed loads
+        self.start_time = time.perf_counter()
+        self.total_seconds = None
+
+    @property
+    def elapsed(self):
+        if self.total_seconds is not None:
+            return self.total_seconds
+        return time.perf_counter() - self.start_time
+
+    @property
+    def fraction_done(self):
+        # Share of the export processed so far, None if unknown
+        if self.total_bytes:
+            return self.bytes_read / self.total_bytes
+        if self.total_pages:
+            return self.pages / self.total_pages
+        return None
+
+    def as_dict(self):
+        return {
+            "phases": dict(self.phases),
+            "memory": {k: dict(v) for k, v in self.memory.items()},
+            "pages": self.pages,
+            "blocks": self.blocks,
+            "refs": self.refs,
+            "blacklisted_refs": self.blacklisted_refs,
+            "max_depth": self.max_depth,
+            "total_seconds": self.elapsed,
+        }
+
+    def __str__(self):
+        lines = [
+            f"{self.pages:,} pages, {self.blocks:,} blocks, {self.refs:,} refs"
+            f" ({self.blacklisted_refs:,} blacklisted dropped),"
+            f" max depth {self.max_depth}, {self.elapsed:.3f}s"
+        ]
+        for name, secs in sorted(self.phases.items(), key=lambda kv: -kv[1]):
+            memory = self.memory.get(name, {})
+            peak = memory.get("peak_rss_mb")
+            peak = "" if peak is None else f"  peak RSS {peak:,.1f} MiB"
+            lines.append(f"  {name:>14}: {secs:9.3f}s{peak}")
+        return "\n".join(lines)
+
+
+def memory_snapshot(track_memory):
+    snapshot = {}
+    if resource is not None:
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        snapshot["peak_rss_mb"] = peak / (MIB if sys.platform == "darwin" else 1024)
+    if track_memory and tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot["traced_mb"] = current / MIB
+        snapshot["traced_peak_mb"] = peak / MIB
+    return snapshot
+
+
+# ---------------- Hooks ---------------- #
+
+
+class LoadHooks:
+    # Override any of these to observe a load, they're called synchronously
+    def on_phase_start(self, name, stats):
+        pass
+
+    def on_phase_end(self, name, seconds, stats):
+        pass
+
+    def on_page(self, page, stats):
+        pass
+
+    def on_finish(self, stats):
+        pass
+
+
+class ProgressReporter(LoadHooks):
+    # Writes a progress line to file at most every `every` seconds
+    def __init__(self, file=None, every=1.0):
+        self.file = sys.stderr if file is None else file
+        self.every = every
+        self.last_report = time.perf_counter()
+
+    def on_page(self, page, stats):
+        now = time.perf_counter()
+        if now - self.last_report >= self.every:
+            self.last_report = now
+            self.report(stats)
+
+    def on_finish(self, stats):
+        self.report(stats, done=True)
+
+    def report(self, stats, done=False):
+        fraction = stats.fraction_done
+        percent = "" if fraction is None or done else f" ({fraction:.0%})"
+        rate = stats.blocks / stats.elapsed if stats.elapsed > 0 else 0
+        status = "loaded" if done else "loading"
+        self.file.write(
+            f"{status} {stats.pages:,} pages, {stats.blocks:,} blocks{percent}"
+            f" in {stats.elapsed:.1f}s ({rate:,.0f} blocks/s)\n"
+        )
+        self.file.flush()
+
+
+# ---------------- Instrument ---------------- #
+
+
+class LoadInstrument:
+    """
+    Opt-in instrumentation of a RoamGraph load, pass one as
+    RoamGraph(..., instrument=LoadInstrument(...)) then read graph.load_stats.
+
+    Args:
+        hooks (list): LoadHooks called on phase start/end, per page and at
+            the end of the load.
+        progress (bool): Add a ProgressReporter writing to stderr.
+        track_memory (bool): Also trace Python allocations with tracemalloc
+            during the load (precise but slows it down noticeably).
+    """
+
+    def __init__(self, hooks=None, progress=False, track_memory=False):
+        self.hooks = list(hooks or [])
+        if progress:
+            self.hooks.append(ProgressReporter())
+        self.track_memory = track_memory
+        self.stats = LoadStats()
+        self._open = []  # [name, start, nested seconds] of the open phases
+        self._started_tracing = False
+
+    def start(self):
+        self.stats = LoadStats()
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def finish(self):
+        self.stats.total_seconds = time.perf_counter() - self.stats.start_time
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        for hook in self.hooks:
+            hook.on_finish(self.stats)
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        for hook in self.hooks:
+            hook.on_phase_start(name, self.stats)
+        # Per-phase traced peaks need tracemalloc.reset_peak (3.9+)
+        if self.track_memory and tracemalloc.is_tracing():
+            getattr(tracemalloc, "reset_peak", lambda: None)()
+        frame = [name, time.perf_counter(), 0.0]
+        self._open.append(frame)
+        try:
+            yield
+        finally:
+            self._open.pop()
+            elapsed = time.perf_counter() - frame[1]
+            self.add_time(name, elapsed - frame[2], nested=elapsed)
+            self.stats.memory[name] = memory_snapshot(self.track_memory)
+            for hook in self.hooks:
+                hook.on_phase_end(name, elapsed - frame[2], self.stats)
+
+    def add_time(self, name, seconds, nested=None):
+        # Credit seconds to name and take them out of the enclosing phase
+        self.stats.phases[name] = self.stats.phases.get(name, 0.0) + seconds
+        if self._open:
+            self._open[-1][2] += seconds if nested is None else nested
+
+    def set_position(self, bytes_read=None, total_bytes=None, total_pages=None):
+        # How far into the export the load is, for progress reporting
+        if bytes_read is not None:
+            self.stats.bytes_read = bytes_read
+        if total_bytes is not None:
+            self.stats.total_bytes = total_bytes
+        if total_pages is not None:
+            self.stats.total_pages = total_pages
+
+    def iter_pages(self, raw_pages):
+        # Passes raw_pages through, timing the wait for each page as
+        #   "decode" and counting its blocks and refs
+        from roam_man import roam_graph as gu
+
+        pages = iter(raw_pages)
+        while True:
+            start = time.perf_counter()
+            page = next(pages, _DONE)
+            self.add_time("decode", time.perf_counter() - start)
+            if page is _DONE:
+                return
+            self.count_page(page, gu.UID_BLACKLIST)
+            for hook in self.hooks:
+                hook.on_page(page, self.stats)
+            yield page
+
+    def count_page(self, page, blacklist):
+        stats = self.stats
+        stats.pages += 1
+        stack = [(page, 0)] if isinstance(page, dict) else []
+        while stack:
+            block, depth = stack.pop()
+            stats.blocks += 1
+            stats.max_depth = max(stats.max_depth, depth)
+            for ref in block.get("refs", []):
+                if ref["uid"] in blacklist:
+                    stats.blacklisted_refs += 1
+                else:
+                    stats.refs += 1
+            stack.extend(
+                (ch, depth + 1)
+                for ch in block.get("children", [])
+                if isinstance(ch, dict)
+            )
+
+
+class NullInstrument(LoadInstrument):
+    # The default, every call is a no-op so uninstrumented loads pay nothing
+    def __init__(self):
+        super().__init__()
+        self.stats = None
+
+    def start(self):
+        pass
+
+    def finish(self):
+        pass
+
+    def phase(self, name):
+        return contextlib.nullcontext()
+
+    def add_time(self, name, seconds, nested=None):
+        pass
+
+    def set_position(self, bytes_read=None, total_bytes=None, total_pages=None):
+        pass
+
+    def iter_pages(self, raw_pages):
+        return raw_pages
+
+
+NULL_INSTRUMENT = NullInstrument()
+
+
+def as_instrument(instrument):
+    # None / False -> no instrumentation, True -> a default LoadInstrument
+    if instrument is None or instrument is False:
+        return NULL_INSTRUMENT
+    if instrument is True:
+        return LoadInstrument()
+    return instrument
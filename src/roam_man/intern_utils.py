@@ -0,0 +1,133 @@
+from array import array
+
+import numpy as np
+
+MISSING = -1  # id of None, and of uids a table doesn't know
+
+# Ref ids are stored packed as bytes of int32s: one allocation of 33 bytes
+#   + 4 per ref, against 64 + 4 per ref for an array("i")
+NO_IDS = b""
+
+# ---------------- Symbol Table ---------------- #
+
+
+class SymbolTable:
+    """
+    Bidirectional uid <-> int id mapping.  Ids are dense (0..n-1) in order of
+    first appearance and never reused, and every occurrence of a uid goes
+    through the one str object kept here, so a uid referenced a thousand
+    times is stored once.
+    """
+
+    def __init__(self):
+        self.ids = {}
+        self.strings = []
+
+    def __len__(self):
+        return len(self.strings)
+
+    def __contains__(self, s):
+        return s in self.ids
+
+    def __getitem__(self, sid):
+        return self.strings[sid]
+
+    def add(self, s):
+        if s is None:
+            return MISSING
+        sid = self.ids.get(s)
+        if sid is None:
+            sid = len(self.strings)
+            self.ids[s] = sid
+            self.strings.append(s)
+        return sid
+
+    def add_many(self, strs):
+        # Packed int32 ids (see NO_IDS), read back with unpack_ids
+        ids = [self.add(s) for s in strs]
+        return array("i", ids).tobytes() if ids else NO_IDS
+
+    def get_id(self, s):
+        # Like add but never inserts, MISSING for unknown strings
+        return self.ids.get(s, MISSING)
+
+    def known(self, s):
+        # The table's copy of s if it has one, else s itself (not added)
+        sid = self.ids.get(s)
+        return s if sid is None else self.strings[sid]
+
+    def decode(self, ids):
+        strings = self.strings
+        return [strings[i] for i in unpack_ids(ids)]
+
+
+def unpack_ids(ids):
+    # Packed ids as a sequence of ints, other id sequences as they are
+    if isinstance(ids, (bytes, bytearray)):
+        return memoryview(ids).cast("i")
+    return ids
+
+
+# ---------------- Id Sets ---------------- #
+
+
+class IdSet:
+    """
+    Immutable set of symbol ids as a sorted int32 array: 4 bytes an element
+    and vectorized set algebra (&, |, -) instead of a set of str.  Convert
+    with to_bitset / from_bitset for dense sets over a whole id space.
+    """
+
+    __slots__ = ["ids"]
+
+    def __init__(self, ids=None):
+        # ids must already be sorted and unique, see from_ids
+        self.ids = np.zeros(0, dtype=np.int32) if ids is None else ids
+
+    @classmethod
+    def from_ids(cls, ids):
+        if isinstance(ids, (bytes, bytearray, array)):
+            ids = np.frombuffer(ids, dtype=np.int32)
+        return cls(np.unique(np.asarray(ids, dtype=np.int32)))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        return iter(self.ids.tolist())
+
+    def __contains__(self, sid):
+        i = np.searchsorted(self.ids, sid)
+        return bool(i < len(self.ids) and self.ids[i] == sid)
+
+    def __and__(self, other):
+        return IdSet(np.intersect1d(self.ids, other.ids, assume_unique=True))
+
+    def __or__(self, other):
+        return IdSet(np.union1d(self.ids, other.ids).astype(np.int32))
+
+    def __sub__(self, other):
+        return IdSet(np.setdiff1d(self.ids, other.ids, assume_unique=True))
+
+    def __eq__(self, other):
+        return isinstance(other, IdSet) and np.array_equal(self.ids, other.ids)
+
+    def __hash__(self):
+        return hash(self.ids.tobytes())
+
+    def __repr__(self):
+        return f"IdSet({self.ids.tolist()})"
+
+    @property
+    def nbytes(self):
+        return self.ids.nbytes
+
+    def to_bitset(self, size):
+        # Packed bits over ids 0..size-1, size / 8 bytes however many are set
+        bits = np.zeros(size, dtype=bool)
+        bits[self.ids] = True
+        return np.packbits(bits)
+
+    @classmethod
+    def from_bitset(cls, bitset):
+        return cls(np.flatnonzero(np.unpackbits(bitset)).astype(np.int32))
@@ -0,0 +1,173 @@
+import re
+
+PARSE_REFS_MODES = ["missing", "merge"]
+
+# ---------------- Block Markup ---------------- #
+
+# One compiled alternation, scanned left to right once per string.  Inline
+#   code is matched (and skipped) first so nothing inside it counts, page
+#   links nest ("[[[[A]] B]]" links both "A" and "[[A]] B") so their
+#   brackets are paired with a stack rather than in the regex.
+MARKUP_RE = re.compile(
+    r"(?P<code>```.*?```|`[^`\n]*`)"
+    r"|(?P<tag_open>#\[\[)"
+    r"|(?P<open>\[\[)"
+    r"|(?P<close>\]\])"
+    r"|\(\((?P<block_ref>[\w-]+)\)\)"
+    # A tag starts a word (not a url fragment or a#b), trailing . and : are
+    #   punctuation
+    r"|(?<![^\s(\[])#(?P<tag>[\w\-/.:]*[\w\-/])",
+    re.DOTALL,
+)
+ATTRIBUTE_RE = re.compile(r"([^:`\n\[\]]+)::(.*)", re.DOTALL)
+
+# Cheap check before running the regex, most blocks have no markup at all
+_MARKUP_CHARS = ("[[", "#", "((", "::")
+
+
+class BlockMarkup:
+    """
+    Structured markup of one block string, everything in order of appearance
+    and without duplicates.
+
+        links       [[page]] titles
+        tags        #tag and #[[tag]] titles
+        block_refs  ((uid)) block uids, embeds included
+        attribute   (name, value) for a block starting "name:: value"
+    """
+
+    __slots__ = ["links", "tags", "block_refs", "attribute"]
+
+    def __init__(self, links=(), tags=(), block_refs=(), attribute=None):
+        self.links = list(links)
+        self.tags = list(tags)
+        self.block_refs = list(block_refs)
+        self.attribute = attribute
+
+    @property
+    def page_titles(self):
+        # Every page the block references, the attribute's own page included
+        titles = dict.fromkeys(self.links + self.tags)
+        if self.attribute is not None:
+            titles[self.attribute[0]] = None
+        return list(titles)
+
+    def __bool__(self):
+        return bool(self.links or self.tags or self.block_refs or self.attribute)
+
+    def __eq__(self, other):
+        return isinstance(other, BlockMarkup) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__
+        )
+
+    def __repr__(self):
+        fields = ", ".join(
+            f"{name}={getattr(self, name)!r}"
+            for name in self.__slots__
+            if getattr(self, name)
+        )
+        return f"BlockMarkup({fields})"
+
+
+EMPTY_MARKUP = BlockMarkup()
+
+
+def parse_block(string):
+    """
+    Parse a block string's [[links]], #tags, ((block refs)) and attr:: value.
+
+    Args:
+        string (str): The block string, None for none.
+
+    Returns:
+        BlockMarkup: EMPTY_MARKUP (shared, don't modify) if there's none.
+    """
+    if not string or not any(chars in string for chars in _MARKUP_CHARS):
+        return EMPTY_MARKUP
+
+    links, tags, block_refs = {}, {}, {}
+    opened = []  # (end of the "[[", is a #[[tag]]) of the unclosed links
+    for match in MARKUP_RE.finditer(string):
+        kind = match.lastgroup
+        if kind == "open" or kind == "tag_open":
+            opened.append((match.end(), kind == "tag_open"))
+        elif kind == "close" and opened:
+            start, is_tag = opened.pop()
+            title = string[start : match.start()].strip()
+            if title:
+                (tags if is_tag else links)[title] = None
+        elif kind == "block_ref":
+            block_refs[match.group(kind)] = None
+        elif kind == "tag":
+            tags[match.group(kind)] = None
+
+    attribute = None
+    if "::" in string:
+        match = ATTRIBUTE_RE.match(string)
+        if match is not None and match.group(1).strip():
+            attribute = (match.group(1).strip(), match.group(2).strip())
+    if not (links or tags or block_refs or attribute):
+        return EMPTY_MARKUP
+    return BlockMarkup(links, tags, block_refs, attribute)
+
+
+def parse_blocks(strings):
+    # parse_block over a batch, repeated strings are parsed once
+    parsed = {}
+    markups = []
+    for string in strings:
+        markup = parsed.get(string)
+        if markup is None:
+            markup = parsed[string] = parse_block(string)
+        markups.append(markup)
+    return markups
+
+
+# ---------------- Refs From Strings ---------------- #
+
+# Exports normally list each block's refs (as uids) next to its string.
+#   For exports that don't, or only partly do, the refs can be rebuilt from
+#   the strings: page titles resolve to uids through the export's pages,
+#   links to pages that aren't in it are dropped.
+
+
+def page_title_uids(raw_pages):
+    # {title: uid} of export-style page dicts
+    return {rd["title"]: rd["uid"] for rd in raw_pages}
+
+
+def add_parsed_refs(raw_pages, title_uids, mode="missing"):
+    """
+    Fill in each block's refs from its string, in place, as the pages are
+    iterated.
+
+    Args:
+        raw_pages (iterable): Export-style page dicts.
+        title_uids (dict): Page title -> uid, e.g. page_title_uids(pages).
+        mode (str): "missing" only parses blocks without a refs key,
+            "merge" adds parsed refs to the exported ones.
+
+    Yields:
+        dict: Each page, its blocks' refs updated.
+    """
+    if mode not in PARSE_REFS_MODES:
+        raise ValueError(f"mode must be one of {PARSE_REFS_MODES}: {mode}")
+    for raw_page in raw_pages:
+        stack = [raw_page]
+        while stack:
+            block = stack.pop()
+            stack.extend(block.get("children", []))
+            if mode == "missing" and "refs" in block:
+                continue
+            markup = parse_block(block.get("string"))
+            if not markup:
+                continue
+            uids = dict.fromkeys(r["uid"] for r in block.get("refs", []))
+            for title in markup.page_titles:
+                uid = title_uids.get(title)
+                if uid is not None:
+                    uids[uid] = None
+            uids.update(dict.fromkeys(markup.block_refs))
+            if uids:
+                block["refs"] = [{"uid": uid} for uid in uids]
+        yield raw_page
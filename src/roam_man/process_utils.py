@@ -1,31 +1,18 @@
-from roam_man import validation_utils as vu
+from roam_man import classify_utils as clu
 
 # Note: Fxns used effectively but not covered by tests.
 
 
-def page_node_list_to_title_sets(page_nodes, uid_to_title):
-    title_sets = {
-        "daily_pages": set(),
-        "bars": set(),
-        "backslashes": set(),
-        "with_ref": {},
-        "other": set(),
-    }
-    for title, node in page_nodes.items():
-        if vu.is_valid_date(node.uid):
-            title_sets["daily_pages"].add(title)
-        elif "|" in title:
-            title_sets["bars"].add(title)
-            if len(node.refs) > 0:
-                first_ref_title = uid_to_title[node.refs[0]]
-                if first_ref_title not in title_sets["with_ref"]:
-                    title_sets["with_ref"][first_ref_title] = set()
-                title_sets["with_ref"][first_ref_title].add(title)
-        elif "/" in title:
-            title_sets["backslashes"].add(title)
-        else:
-            title_sets["other"].add(title)
-    return title_sets
+# get_page_of: optional RoamGraph.get_page_of, used to resolve refs to
+#   nested blocks (not in uid_to_title) to the title of their page
+def page_node_list_to_title_sets(
+    page_nodes, uid_to_title, get_page_of=None, classifier=None, **kwargs
+):
+    # classifier: a classify_utils.TitleClassifier with extra or different
+    #   rules, kwargs (batch_size, workers) are passed to its classify
+    if classifier is None:
+        classifier = clu.default_title_classifier()
+    return classifier.classify(page_nodes, uid_to_title, get_page_of, **kwargs)
 
 
 def map_items_with_input(input_dict):
@@ -0,0 +1,308 @@
+from abc import ABC, abstractmethod
+
+from roam_man import time_index as ti
+from roam_man import tree_utils as tu
+
+# ---------------- Query Filters ---------------- #
+
+# Each filter can always test a single block (matches), and may also be able
+#   to produce its matching blocks straight from an index (candidates).  The
+#   planner drives the query from the indexed filter with the smallest
+#   estimate and checks every other filter per candidate, falling back to a
+#   full scan when no filter has an index.
+
+
+def num_blocks(graph):
+    if graph.store is not None:
+        return graph.store.num_blocks
+    return len(graph.block_index)
+
+
+def subtree_size(graph, node):
+    # Exact for compact storage and pages, nested blocks in nodes storage
+    #   are bounded by the size of their page
+    if graph.store is not None:
+        return int(graph.store.subtree_end[node.idx]) - node.idx
+    return graph.page_sizes[page_root(node).uid]
+
+
+def page_root(node):
+    while node.parent is not None:
+        node = node.parent
+    return node
+
+
+def resolve_uid(graph, uid_or_title):
+    # Page titles are accepted anywhere a uid is
+    page_node = graph.roam_pages.get(uid_or_title)
+    return uid_or_title if page_node is None else page_node.uid
+
+
+class QueryFilter(ABC):
+    label = "filter"
+
+    def prepare(self, graph):
+        # Per-run setup before matches is called
+        pass
+
+    def estimate(self, graph):
+        # Estimated number of candidates from an index, None if scan only
+        return None
+
+    def candidates(self, graph):
+        # Matching blocks from an index, None to scan every block
+        return None
+
+    @abstractmethod
+    def matches(self, node):
+        pass
+
+    def __repr__(self):
+        return self.label
+
+
+class References(QueryFilter):
+    def __init__(self, uid, recursive=False):
+        self.uid = uid
+        self.recursive = recursive
+        kind = "recursive_refs" if recursive else "refs"
+        self.label = f"{kind} contain {uid!r}"
+
+    def estimate(self, graph):
+        # Recursive matches also include the sources' ancestors
+        sources = len(graph.backlinks.get_backlinks(self.uid))
+        return sources * 4 if self.recursive else sources
+
+    def candidates(self, graph):
+        for source in graph.backlinks.get_backlinks(self.uid):
+            node = graph.get_block(source)
+            yield node
+            if self.recursive:
+                yield from tu.iter_ancestors(node)
+
+    def matches(self, node):
+        if self.recursive:
+            return node.has_recursive_ref(self.uid)
+        return self.uid in node.refs
+
+
+class Under(QueryFilter):
+    # Strict descendants of a block or page
+    def __init__(self, uid):
+        self.uid = uid
+        self.label = f"under {uid!r}"
+
+    def estimate(self, graph):
+        return subtree_size(graph, graph.get_block(self.uid)) - 1
+
+    def candidates(self, graph):
+        subtree = tu.iter_subtree(graph.get_block(self.uid))
+        next(subtree)
+        return subtree
+
+    def matches(self, node):
+        return any(a.uid == self.uid for a in tu.iter_ancestors(node))
+
+
+class AncestorOf(QueryFilter):
+    def __init__(self, uid):
+        self.uid = uid
+        self.label = f"ancestor of {self.uid!r}"
+
+    def prepare(self, graph):
+        self.chain = {node.uid for node in graph.get_parent_chain(self.uid)}
+
+    def estimate(self, graph):
+        return graph.get_block(self.uid).depth
+
+    def candidates(self, graph):
+        return graph.get_parent_chain(self.uid)
+
+    def matches(self, node):
+        return node.uid in self.chain
+
+
+class OnPagesReferencing(QueryFilter):
+    # Blocks on pages with a ref to uid anywhere, e.g. "Tags:: [[X]]"
+    def __init__(self, uid):
+        self.uid = uid
+        self.label = f"on pages referencing {uid!r}"
+
+    def prepare(self, graph):
+        self.page_uids = set(graph.backlinks.get_linking_pages(self.uid))
+
+    def estimate(self, graph):
+        return sum(
+            subtree_size(graph, graph.get_block(page_uid))
+            for page_uid in graph.backlinks.get_linking_pages(self.uid)
+        )
+
+    def candidates(self, graph):
+        for page_uid in graph.backlinks.get_linking_pages(self.uid):
+            yield from tu.iter_subtree(graph.get_block(page_uid))
+
+    def matches(self, node):
+        return page_root(node).uid in self.page_uids
+
+
+class TimeRange(QueryFilter):
+    # field: "edit_time" or "create_time", bounds inclusive, see TimeIndex
+    def __init__(self, field, start=None, end=None):
+        self.field = field
+        self.start = ti.to_epoch_ms(start)
+        self.end = ti.to_epoch_ms(end, end=True)
+        self.label = f"{start} <= {field} <= {end}"
+
+    def estimate(self, graph):
+        # Exact, from the sorted times
+        return graph.time_index.count(self.field, self.start, self.end)
+
+    def candidates(self, graph):
+        docs = graph.time_index.docs_between(self.field, self.start, self.end)
+        return (graph.get_doc_block(doc) for doc in docs.tolist())
+
+    def matches(self, node):
+        t = getattr(node, self.field)
+        if t is None:
+            return False
+        return (self.start is None or t >= self.start) and (
+            self.end is None or t <= self.end
+        )
+
+
+class TextMatch(QueryFilter):
+    # Uses the full-text search index, see SearchIndex.search for syntax
+    def __init__(self, query):
+        self.query = query
+        self.label = f"text matches {query!r}"
+
+    def prepare(self, graph):
+        # By uid, storages like sqlite rebuild a node once it leaves their LRU
+        self.hit_uids = {node.uid for node in self.candidates(graph)}
+
+    def estimate(self, graph):
+        return len(graph.search_index.search(self.query, limit=None))
+
+    def candidates(self, graph):
+        return [node for node, _ in graph.search(self.query, limit=None)]
+
+    def matches(self, node):
+        return node.uid in self.hit_uids
+
+
+class Where(QueryFilter):
+    def __init__(self, predicate, label=None):
+        self.predicate = predicate
+        self.label = label or f"where {getattr(predicate, '__name__', 'fn')}"
+
+    def matches(self, node):
+        return self.predicate(node)
+
+
+# ---------------- Planner ---------------- #
+
+
+class QueryPlan:
+    def __init__(self, source, estimate, filters, total_blocks):
+        self.source = source  # indexed filter, None for a full scan
+        self.estimate = estimate
+        self.filters = filters
+        self.total_blocks = total_blocks
+
+    def __str__(self):
+        if self.source is None:
+            lines = [f"full scan: {self.total_blocks} blocks"]
+        else:
+            lines = [f"index: {self.source!r} (est. {self.estimate} blocks)"]
+        lines += [f"  filter: {f!r}" for f in self.filters]
+        lines.append(
+            f"est. cost: {self.estimate} blocks x {len(self.filters)} filters"
+            f" (of {self.total_blocks} blocks)"
+        )
+        return "\n".join(lines)
+
+
+class GraphQuery:
+    """
+    Declarative block query over a RoamGraph, built by chaining filters:
+
+        rg.query().on_pages_referencing("X").references("Y")
+            .edited_between(start="2024-01-01").run()
+
+    All filters must hold.  Uids can be given as page titles.  run() returns
+    matching blocks (RoamNode or CompactNode), explain() the chosen plan.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.filters = []
+
+    def filter(self, query_filter):
+        self.filters.append(query_filter)
+        return self
+
+    def references(self, uid, recursive=False):
+        return self.filter(References(resolve_uid(self.graph, uid), recursive))
+
+    def under(self, uid):
+        return self.filter(Under(resolve_uid(self.graph, uid)))
+
+    def ancestors_of(self, uid):
+        return self.filter(AncestorOf(resolve_uid(self.graph, uid)))
+
+    def on_pages_referencing(self, uid):
+        return self.filter(OnPagesReferencing(resolve_uid(self.graph, uid)))
+
+    def edited_between(self, start=None, end=None):
+        return self.filter(TimeRange("edit_time", start, end))
+
+    def created_between(self, start=None, end=None):
+        return self.filter(TimeRange("create_time", start, end))
+
+    def text(self, query):
+        return self.filter(TextMatch(query))
+
+    def where(self, predicate, label=None):
+        return self.filter(Where(predicate, label))
+
+    def plan(self):
+        total = num_blocks(self.graph)
+        best, best_estimate = None, total
+        for query_filter in self.filters:
+            estimate = query_filter.estimate(self.graph)
+            if estimate is not None and estimate < best_estimate:
+                best, best_estimate = query_filter, estimate
+        rest = [f for f in self.filters if f is not best]
+        return QueryPlan(best, best_estimate, rest, total)
+
+    def explain(self):
+        return str(self.plan())
+
+    def iter_scan(self):
+        for page_node in self.graph.roam_pages.values():
+            yield from tu.iter_subtree(page_node)
+
+    def run(self):
+        plan = self.plan()
+        for query_filter in plan.filters:
+            query_filter.prepare(self.graph)
+        filters, nodes = plan.filters, None
+        if plan.source is not None:
+            plan.source.prepare(self.graph)
+            nodes = plan.source.candidates(self.graph)
+            if nodes is None:
+                filters = filters + [plan.source]  # estimated but not indexed
+        if nodes is None:
+            nodes = self.iter_scan()
+
+        results, seen = [], set()  # uids, the same block may be a new node
+        for node in nodes:
+            if node.uid in seen:
+                continue
+            seen.add(node.uid)
+            if all(f.matches(node) for f in filters):
+                results.append(node)
+        return results
+
+    def uids(self):
+        return [node.uid for node in self.run()]
@@ -1,6 +1,23 @@
 import io
+import os
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+from pathlib import Path
 
-from dr_util import file_utils as fu
+import numpy as np
+
+from roam_man import backlink_index as bi
+from roam_man import instrument_utils as iu
+from roam_man import intern_utils as inu
+from roam_man import stream_utils as su
+from roam_man import tree_utils as tu
+
+# Only what every load needs is imported here.  Backends, indexes and
+#   dr_util are imported where they're first used, so importing this module
+#   (e.g. for a quick lookup from a checkpoint) stays cheap, see
+#   tests/test_startup.py
 
 # ---------------- Representation & Printing Utils ---------------- #
 
@@ -24,74 +41,363 @@ def add_roam_elem_str_to_buffer(
     return buffer
 
 
-# Works for anything where the __dict__ method returns a dict
-#   with the expected keys
-def roam_data_to_full_str(roam_data_elem):
-    buffer = io.StringIO()
-    nodes = [roam_data_elem]
-    i = 0
+_END_OF_CHILDREN = object()
+
 
-    while i < len(nodes):
-        if i > 0:
-            buffer.write("\n")
+# Works for raw dicts and for nodes (RoamNode, CompactNode) with uid, title,
+#   string, refs and children attributes.  Depth-first, one chunk per block, keeping only
+#   an iterator per level of the current path so memory is O(depth).
+#   max_depth: deepest level rendered (root is 0), max_blocks: stop after.
+def iter_roam_str_chunks(roam_data_elem, max_depth=None, max_blocks=None):
+    stack = [iter([roam_data_elem])]
+    num_blocks = 0
+    while stack:
+        node = next(stack[-1], _END_OF_CHILDREN)
+        if node is _END_OF_CHILDREN:
+            stack.pop()
+            continue
+        if max_blocks is not None and num_blocks >= max_blocks:
+            return
 
-        node = nodes[i]
+        depth = len(stack) - 1
         if not isinstance(node, dict):
-            node = node.__dict__
+            node = node_fields(node)
+
+        # Only the root renders as a page, a nested title is its text
+        title = node.get("title", None) if depth == 0 else None
+        string = node.get("string", None)
+        if depth > 0 and string is None:
+            string = node.get("title", None)
 
         refs = [r if isinstance(r, str) else r["uid"] for r in node.get("refs", [])]
-        add_roam_elem_str_to_buffer(
-            uid=node["uid"],
-            refs=refs,
-            title=node.get("title", None),
-            string=node.get("string", None),
-            buffer=buffer,
+        buffer = add_roam_elem_str_to_buffer(
+            uid=node["uid"], refs=refs, title=title, string=string, depth=depth
         )
+        yield ("\n" if num_blocks > 0 else "") + buffer.getvalue()
+        buffer.close()
+        num_blocks += 1
 
-        # Safely add children to the end of the list
-        nodes.extend(node.get("children", []))
+        if max_depth is None or depth < max_depth:
+            stack.append(iter(node.get("children", [])))
 
-        # Move to the next node
-        i += 1
 
-    result = buffer.getvalue()
-    buffer.close()
-    return result
+def node_fields(node):
+    return {
+        "uid": node.uid,
+        "title": node.title,
+        "string": node.string,
+        "refs": node.refs,
+        "children": node.children,
+    }
+
+
+def write_roam_str(roam_data_elem, file, max_depth=None, max_blocks=None):
+    # Streams the rendering to any file-like object with a write method
+    for chunk in iter_roam_str_chunks(roam_data_elem, max_depth, max_blocks):
+        file.write(chunk)
+
+
+def roam_data_to_full_str(roam_data_elem, max_depth=None, max_blocks=None):
+    return "".join(iter_roam_str_chunks(roam_data_elem, max_depth, max_blocks))
 
 
 # ---------------- Roam Node & Graph ---------------- #
 
+STORAGE_TYPES = ["nodes", "compact", "sqlite"]
+
+# Bump when RoamNode parsing changes (fields, ref filtering, ...) so that
+#   cached parsed graphs are invalidated
+NODE_SCHEMA_VERSION = 1
+
+# [[DONE]] and [[TODO]]
+UID_BLACKLIST = {"KVGudD7AP", "e2rS3SVH7"}
+BASIC_KEYS = [
+    (k, k.replace("-", "_"))
+    for k in ["title", "string", "uid", "create-time", "edit-time"]
+]
+
+
+class SubtreeRefsCache:
+    """
+    LRU of RoamNode.recursive_ref_ids results, bounded by the total number of
+    refs held rather than by entry count, so a few huge subtrees can't blow
+    up memory.  Results live on the nodes themselves and are tracked by
+    weakref, so dropping a graph also drops its cached sets.
+
+    Every read reorders the LRU, so get and put hold a lock (reentrant, a
+    weakref callback can fire from a collection inside a locked section).
+    """
+
+    def __init__(self, max_refs=1_000_000):
+        self.max_refs = max_refs
+        self.num_refs = 0
+        self.entries = OrderedDict()  # id(node) -> (weakref, num refs)
+        self.lock = threading.RLock()
+
+    def get(self, node):
+        with self.lock:
+            refs = node._recursive_refs
+            if refs is not None:
+                self.entries.move_to_end(id(node))
+            return refs
+
+    def put(self, node, refs):
+        if len(refs) > self.max_refs:
+            return
+        key = id(node)
+        with self.lock:
+            # Another thread may have computed the same node meanwhile
+            self.forget(key)
+            self.entries[key] = (
+                weakref.ref(node, lambda _: self.forget(key)),
+                len(refs),
+            )
+            self.num_refs += len(refs)
+            node._recursive_refs = refs
+            while self.num_refs > self.max_refs:
+                self.evict(next(iter(self.entries)))
+
+    def evict(self, key):
+        node_ref, _ = self.entries[key]
+        node = node_ref()
+        if node is not None:
+            node._recursive_refs = None
+        self.forget(key)
+
+    def forget(self, key):
+        with self.lock:
+            _, num_refs = self.entries.pop(key, (None, 0))
+            self.num_refs -= num_refs
+
+    def clear(self):
+        with self.lock:
+            for key in list(self.entries):
+                self.evict(key)
+
+
+RECURSIVE_REFS_CACHE = SubtreeRefsCache()
+
+
+class _LazyRaw:
+    # RoamNode._raw_data of the blocks built from a CompactGraph (see
+    #   RoamNode.iter_from_store) before their raw dict has been asked for,
+    #   pickled by name so it's still LAZY_RAW once unpickled
+    def __reduce__(self):
+        return "LAZY_RAW"
+
+
+LAZY_RAW = _LazyRaw()
+
+
+class LazyRawPage:
+    # A page node's raw dict, read from a sequence of raw pages on first use
+    __slots__ = ["raw_pages", "page_idx"]
+
+    def __init__(self, raw_pages, page_idx):
+        self.raw_pages = raw_pages
+        self.page_idx = page_idx
+
+    def load(self):
+        return self.raw_pages[self.page_idx]
+
 
 class RoamNode:
-    def __init__(self, json, parent=None, start_depth=0):
+    # block_index: optional dict, filled with uid -> node for the whole subtree
+    # symbols: intern_utils.SymbolTable the uids and refs are interned in,
+    #   share one across pages (as RoamGraph does) so each uid is stored once
+    def __init__(
+        self,
+        json,
+        parent=None,
+        start_depth=0,
+        keep_raw=True,
+        block_index=None,
+        symbols=None,
+    ):
+        symbols = inu.SymbolTable() if symbols is None else symbols
+        self._init_fields(json, parent, start_depth, keep_raw, symbols)
+
+        # Build tree of children with an explicit stack (pre-order) so that
+        #   deeply nested outlines don't hit the recursion limit
+        subtree = [self]
+        stack = [(ch, self) for ch in reversed(json.get("children", []))]
+        while stack:
+            ch, parent = stack.pop()
+            node = type(self).__new__(type(self))
+            node._init_fields(ch, parent, parent.depth + 1, keep_raw, symbols)
+            parent.children.append(node)
+            subtree.append(node)
+            stack.extend((gch, node) for gch in reversed(ch.get("children", [])))
+
+        # Each node's subtree is the contiguous range subtree[_pre:_end], in
+        #   reverse pre-order so every child's end is known before its parent
+        for pre, node in enumerate(subtree):
+            node._subtree = subtree
+            node._pre = pre
+        for node in reversed(subtree):
+            node._end = node.children[-1]._end if node.children else node._pre + 1
+
+        if block_index is not None:
+            block_index.update((node.uid, node) for node in subtree)
+
+    @classmethod
+    def iter_from_store(cls, store, raw_pages=None, block_index=None, symbols=None):
+        """
+        Build the page nodes of a CompactGraph straight from its columns,
+        without going through export-style dicts.
+
+        Args:
+            store (CompactGraph): The graph, e.g. a cached checkpoint.
+            raw_pages (sequence): The export's raw pages in page order, read
+                on first access of a node's raw_data.  None keeps no raw data.
+            block_index (dict): Filled with uid -> node, as in __init__.
+            symbols (SymbolTable): Shared table, as in __init__.
+
+        Yields:
+            RoamNode: Each page node, in page order.
+        """
+        from roam_man import compact_graph as cg
+
+        symbols = inu.SymbolTable() if symbols is None else symbols
+        missing = cg.MISSING
+        uids, strings = list(store.uids), list(store.strings)
+        uid_id, title_id, string_id = (
+            store.uid_id.tolist(),
+            store.title_id.tolist(),
+            store.string_id.tolist(),
+        )
+        create_time, edit_time = store.create_time.tolist(), store.edit_time.tolist()
+        parents, depths = store.parent.tolist(), store.depth.tolist()
+        subtree_end = store.subtree_end.tolist()
+
+        # Ref targets are interned in order of first appearance, as building
+        #   block by block does, then each block's packed ids are a slice
+        targets = np.asarray(store.ref_targets)
+        unique, first = np.unique(targets, return_index=True)
+        symbol_ids = np.full(len(uids), missing, dtype=np.int32)
+        for t in unique[np.argsort(first, kind="stable")].tolist():
+            symbol_ids[t] = symbols.add(uids[t])
+        packed_refs = symbol_ids[targets].tobytes()
+        ref_offsets = (np.asarray(store.ref_offsets) * 4).tolist()
+
+        for page_idx, root in enumerate(store.page_roots.tolist()):
+            subtree = []
+            for i in range(root, subtree_end[root]):
+                node = cls.__new__(cls)
+                node.depth = depths[i]
+                node.parent = subtree[parents[i] - root] if i > root else None
+                if raw_pages is None:
+                    node._raw_data = None
+                elif i > root:
+                    node._raw_data = LAZY_RAW
+                else:
+                    node._raw_data = LazyRawPage(raw_pages, page_idx)
+                node.title = None if title_id[i] == missing else strings[title_id[i]]
+                node.string = None if string_id[i] == missing else strings[string_id[i]]
+                node.uid = symbols.known(
+                    None if uid_id[i] == missing else uids[uid_id[i]]
+                )
+                node.create_time = None if create_time[i] == missing else create_time[i]
+                node.edit_time = None if edit_time[i] == missing else edit_time[i]
+                node._symbols = symbols
+                node._ref_ids = packed_refs[ref_offsets[i] : ref_offsets[i + 1]]
+                node.children = []
+                node._subtree = subtree
+                node._pre = i - root
+                node._end = subtree_end[i] - root
+                node._recursive_refs = None
+                if i > root:
+                    node.parent.children.append(node)
+                subtree.append(node)
+
+            if block_index is not None:
+                block_index.update((node.uid, node) for node in subtree)
+            yield subtree[0]
+
+    def _init_fields(self, json, parent, depth, keep_raw, symbols):
         if not isinstance(json, dict) or json is None:
             raise Exception("RoamNode expects a non-null dict as input")
 
-        # [[DONE]] and [[TODO]]
-        uid_blacklist = {"KVGudD7AP", "e2rS3SVH7"}
-        basic_keys = ["title", "string", "uid", "create-time", "edit-time"]
-
-        self.depth = start_depth
+        self.depth = depth
         self.parent = parent
-        self.raw_data = json
-        for k in basic_keys:
-            setattr(self, k.replace("-", "_"), json.get(k, None))
+        self._raw_data = json if keep_raw else None
+        for k, attr in BASIC_KEYS:
+            setattr(self, attr, json.get(k, None))
 
-        # Initialize refs
-        self.refs = [
-            r["uid"] for r in json.get("refs", []) if r["uid"] not in uid_blacklist
-        ]
-        self.recursive_refs = set(self.refs)
+        # Refs are kept as packed interned ids, see the refs property.  Only
+        #   referenced uids get ids, a block's own uid shares the table's str
+        #   when it has been referenced before.
+        self.uid = symbols.known(self.uid)
+        self._symbols = symbols
+        self._ref_ids = symbols.add_many(
+            r["uid"] for r in json.get("refs", []) if r["uid"] not in UID_BLACKLIST
+        )
+        self.children = []
 
-        # Recursively build tree of children
-        self.children = [
-            RoamNode(ch, parent=self, start_depth=self.depth + 1)
-            for ch in self.raw_data.get("children", [])
-        ]
+        # Filled in once the whole tree is built, assigned here so every node
+        #   has the same attribute layout from creation (keeps them compact)
+        self._subtree = None
+        self._pre = 0
+        self._end = 0
+        self._recursive_refs = None  # set by RECURSIVE_REFS_CACHE
+
+    @property
+    def raw_data(self):
+        # The export-style dict the node was built from, None without keep_raw
+        raw = self._raw_data
+        if isinstance(raw, LazyRawPage):
+            raw = self._raw_data = raw.load()
+        elif raw is LAZY_RAW:
+            # Fill in every sibling at once from the parent's dict
+            parent = self.parent
+            for child, raw_child in zip(parent.children, parent.raw_data["children"]):
+                child._raw_data = raw_child
+            raw = self._raw_data
+        return raw
+
+    @property
+    def refs(self):
+        return self._symbols.decode(self._ref_ids)
+
+    @property
+    def ref_ids(self):
+        # Read-only int32 array of the refs' ids in self.symbols
+        return np.frombuffer(self._ref_ids, dtype=np.int32)
+
+    @property
+    def markup(self):
+        # Links, tags, block refs and attribute parsed from the string
+        from roam_man import markup_utils as mu
+
+        return mu.parse_block(self.string)
+
+    @property
+    def symbols(self):
+        return self._symbols
 
-        # Update recursive refs for the node and propagate to parent
-        if self.parent:
-            self.parent.recursive_refs.update(self.recursive_refs)
+    @property
+    def recursive_ref_ids(self):
+        # IdSet of the refs anywhere in the subtree, computed on demand from
+        #   the pre-order range instead of a set stored at every level
+        if not self.children:
+            return inu.IdSet.from_ids(self._ref_ids)
+        refs = RECURSIVE_REFS_CACHE.get(self)
+        if refs is None:
+            blocks = self._subtree[self._pre : self._end]
+            ids = bytearray()
+            for node in blocks:
+                ids += node._ref_ids
+            refs = inu.IdSet.from_ids(ids)
+            RECURSIVE_REFS_CACHE.put(self, refs)
+        return refs
+
+    @property
+    def recursive_refs(self):
+        return frozenset(self._symbols.decode(self.recursive_ref_ids))
+
+    def has_recursive_ref(self, uid):
+        # uid in recursive_refs without decoding the set
+        return self._symbols.get_id(uid) in self.recursive_ref_ids
 
     def __repr__(self):
         buffer = add_roam_elem_str_to_buffer(
@@ -105,32 +411,338 @@ class RoamNode:
         buffer.close()
         return rep
 
-    def print_full(self):
-        print(roam_data_to_full_str(self))
+    def print_full(self, max_depth=None, max_blocks=None):
+        write_roam_str(self, sys.stdout, max_depth, max_blocks)
+        sys.stdout.write("\n")
 
 
 # Uses validation_utils
 # Uses viz_utils
 class RoamGraph:
-    def __init__(self, input_path, checkpoint_path=None):
+    # stream: decode the export one page at a time instead of all at once
+    # keep_raw: when False, nodes drop their raw dicts and (if streaming) raw
+    #   pages are re-read from disk by byte offset on request
+    # storage: "nodes" builds RoamNode trees, "compact" builds a columnar
+    #   CompactGraph (self.store) and serves RoamNode-compatible views of it,
+    #   "sqlite" ingests into a SQLite database (self.db) and serves pages
+    #   from it through a bounded LRU of nodes
+    # cache_dir: reuse a parsed graph cached there for the same export content,
+    #   raw pages (and nodes' raw_data) are then read from the export as
+    #   they're asked for
+    # workers: build compact storage with a pool of this many processes
+    # db_path: database for sqlite storage, defaults to the export's path
+    #   with a .sqlite suffix, replaced if it's an existing roam_man database
+    #   (any other file there raises ValueError)
+    # instrument: True or an instrument_utils.LoadInstrument to time the
+    #   load phases, count blocks and refs and report progress, the results
+    #   are in self.load_stats
+    # parse_refs: "missing" parses [[links]], #tags, ((refs)) and attr:: out
+    #   of the strings of blocks the export has no refs for, "merge" adds
+    #   them to every block's refs, see markup_utils (raw pages re-read
+    #   from disk keep the export's refs)
+    def __init__(
+        self,
+        input_path,
+        checkpoint_path=None,
+        stream=False,
+        keep_raw=True,
+        storage="nodes",
+        cache_dir=None,
+        workers=1,
+        db_path=None,
+        instrument=None,
+        parse_refs=None,
+    ):
+        if workers > 1 and storage != "compact":
+            raise ValueError("workers > 1 requires storage='compact'")
+        if parse_refs is not None and cache_dir is not None:
+            # Cache entries are keyed on the export alone
+            raise ValueError("parse_refs can't be combined with cache_dir")
+
+        self.init_state(input_path, checkpoint_path, stream, keep_raw, storage)
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self.parse_refs = parse_refs
+        self.instrument = iu.as_instrument(instrument)
+        if storage == "sqlite":
+            self.db_path = db_path or Path(input_path).with_suffix(".sqlite")
+
+        # Initialize
+        self.parse_raw_data()
+
+    def init_state(self, input_path, checkpoint_path, stream, keep_raw, storage):
+        if storage not in STORAGE_TYPES:
+            raise ValueError(f"storage must be one of {STORAGE_TYPES}: {storage}")
+
         self.input_path = input_path
         self.checkpoint_path = checkpoint_path
+        self.stream = stream
+        self.keep_raw = keep_raw
+        self.storage = storage
 
         self.raw_data = None
+        self.store = None
+        self.db = None
+        self.db_path = None
         self.roam_pages = None
+        self.page_titles = None
         self.uid_to_title = None
+        self.block_index = None
+        self.symbols = None
+        self._backlinks = None
+        self._page_fingerprints = None
+        self._page_sizes = None
+        self._daily_pages = None
+        self._search_index = None
+        self._time_index = None
+        self._block_docs = None
+        self._page_graph = None
+        self.cache_dir = None
+        self.workers = 1
+        self.parse_refs = None
+        self.instrument = iu.NULL_INSTRUMENT
         self.extra_data = {}
+        self.frozen = False
+        self.shared = None  # snapshot_utils.SharedGraph backing the arrays
 
-        # Initialize
-        self.parse_raw_data()
+    @classmethod
+    def from_checkpoint(cls, checkpoint_path, mmap_mode="r"):
+        # Opens a checkpoint written by save_checkpoint with compact storage.
+        #   Columns are memory-mapped and nodes are views materialized on
+        #   access, raw pages are rebuilt from the columns when requested.
+        from roam_man import checkpoint_utils as ck
+        from roam_man import compact_graph as cg
+
+        store, header = ck.load_checkpoint(checkpoint_path, mmap_mode=mmap_mode)
+        graph = cls.__new__(cls)
+        graph.init_state(
+            input_path=header["metadata"].get("input_path"),
+            checkpoint_path=checkpoint_path,
+            stream=False,
+            keep_raw=False,
+            storage="compact",
+        )
+        graph.load_store(store)
+        graph.raw_data = cg.RawPageView(store)
+        graph._search_index = ck.load_search_index(checkpoint_path, mmap_mode)
+        return graph
+
+    @classmethod
+    def from_sqlite(cls, db_path, max_pages=256):
+        # Reopens a database written with storage="sqlite" without re-reading
+        #   the export, at most max_pages page trees are kept in memory
+        from roam_man import sqlite_store as sq
+
+        db = sq.SqliteStore.open(db_path, max_pages=max_pages)
+        graph = cls.__new__(cls)
+        graph.init_state(
+            input_path=db.get_meta("input_path"),
+            checkpoint_path=None,
+            stream=False,
+            keep_raw=False,
+            storage="sqlite",
+        )
+        graph.db_path = db_path
+        graph.load_db(db)
+        return graph
 
     def parse_raw_data(self):
-        self.raw_data = fu.load_file(self.input_path)
-        self.roam_pages = {rd["title"]: RoamNode(rd) for rd in self.raw_data}
-        self.uid_to_title = {v.uid: k for k, v in self.roam_pages.items()}
+        from roam_man import cache_utils as cu
+        from roam_man import checkpoint_utils as ck
+        from roam_man import compact_graph as cg
+
+        instrument = self.instrument
+        instrument.start()
+        cache = None if self.cache_dir is None else cu.GraphCache(self.cache_dir)
+        cached_path = None if cache is None else cache.get(self.input_path)
+        if cached_path is not None:
+            with instrument.phase("cache_load"):
+                store, _ = ck.load_checkpoint(cached_path)
+            if self.storage != "sqlite":
+                # Read from the export only as pages are asked for
+                self.raw_data = cache.load_raw_index(cached_path, self.input_path)
+            with instrument.phase("build"):
+                if self.storage == "compact":
+                    self.load_store(store)
+                elif self.storage == "sqlite":
+                    raw_pages = instrument.iter_pages(cg.RawPageView(store))
+                    self.load_db(self.ingest_db(raw_pages))
+                else:
+                    self.load_nodes_from_store(store)
+        else:
+            raw_pages = instrument.iter_pages(self.iter_raw_pages())
+            with instrument.phase("build"):
+                if self.storage == "compact" and self.workers > 1:
+                    from roam_man import parallel_utils as par
+
+                    # A list lets forked workers share the loaded pages
+                    pages = raw_pages if self.stream else list(raw_pages)
+                    self.load_store(par.build_compact_graph(pages, self.workers))
+                elif self.storage == "compact":
+                    self.load_store(cg.CompactGraph.from_pages(raw_pages))
+                elif self.storage == "sqlite":
+                    self.load_db(self.ingest_db(raw_pages))
+                else:
+                    self.load_nodes(raw_pages)
+            if cache is not None:
+                with instrument.phase("cache_save"):
+                    # Built from the raw pages, roam_pages drops repeated titles
+                    store = self.store
+                    if store is None:
+                        store = cg.CompactGraph.from_pages(self.raw_data)
+                    raw_index = self.raw_data
+                    if not isinstance(raw_index, su.JsonArrayIndex):
+                        raw_index = su.JsonArrayIndex.from_file(self.input_path)
+                    cache.put(self.input_path, store, raw_index)
 
         if self.checkpoint_path is not None:
-            fu.dump_file(self, self.checkpoint_path, force_suffix=True)
+            with instrument.phase("checkpoint"):
+                self.save_checkpoint(self.checkpoint_path)
+        instrument.finish()
+
+    @property
+    def load_stats(self):
+        # instrument_utils.LoadStats of the load, None if not instrumented
+        return self.instrument.stats
+
+    def load_nodes(self, raw_pages):
+        self.block_index = {}
+        self.symbols = inu.SymbolTable()
+        self.index_page_nodes(
+            RoamNode(
+                rd,
+                keep_raw=self.keep_raw,
+                block_index=self.block_index,
+                symbols=self.symbols,
+            )
+            for rd in raw_pages
+        )
+
+    def load_nodes_from_store(self, store):
+        # Nodes from a cached CompactGraph, raw data read from self.raw_data
+        self.block_index = {}
+        self.symbols = inu.SymbolTable()
+        self.index_page_nodes(
+            RoamNode.iter_from_store(
+                store,
+                raw_pages=self.raw_data if self.keep_raw else None,
+                block_index=self.block_index,
+                symbols=self.symbols,
+            )
+        )
+
+    def index_page_nodes(self, page_nodes):
+        self.roam_pages = {}
+        self.page_titles = []
+        for node in page_nodes:
+            self.roam_pages[node.title] = node
+            self.page_titles.append(node.title)
+        with self.instrument.phase("uid_to_title"):
+            self.uid_to_title = {v.uid: k for k, v in self.roam_pages.items()}
+        with self.instrument.phase("backlinks"):
+            self._backlinks = bi.BacklinkIndex.from_page_nodes(self.roam_pages.values())
+
+    def load_store(self, store):
+        # Views built on first use, so opening a checkpoint to look up a page
+        #   doesn't touch every page
+        from roam_man import compact_graph as cg
+
+        self.store = store
+        self.page_titles = cg.CompactPageTitles(store)
+        self.roam_pages = cg.CompactPages(store)
+        self.uid_to_title = cg.CompactUidToTitle(store)
+        self._backlinks = None  # built from the CSR refs on first use
+
+    def ingest_db(self, raw_pages):
+        from roam_man import sqlite_store as sq
+
+        input_path = None if self.input_path is None else str(self.input_path)
+        return sq.SqliteStore.create(
+            self.db_path, raw_pages, metadata={"input_path": input_path}
+        )
+
+    def load_db(self, db):
+        # Every lookup structure is a view answered by indexed queries
+        from roam_man import sqlite_store as sq
+
+        self.db = db
+        self.roam_pages = sq.SqlitePages(db)
+        self.page_titles = sq.SqlitePageList(db, db.page_title)
+        self.uid_to_title = sq.SqliteUidToTitle(db)
+        self.block_index = sq.SqliteBlockIndex(db)
+        self.raw_data = sq.SqlitePageList(db, db.get_raw_page)
+        self._backlinks = sq.SqliteBacklinks(db)
+        self._page_sizes = sq.SqlitePageSizes(db)
+
+    def to_compact_graph(self):
+        # Imported here because compact_graph builds on this module
+        from roam_man import compact_graph as cg
+
+        if self.store is not None:
+            return self.store
+        return cg.CompactGraph.from_page_nodes(self.roam_pages.values())
+
+    def save_checkpoint(self, checkpoint_path):
+        from roam_man import checkpoint_utils as ck
+
+        input_path = None if self.input_path is None else str(self.input_path)
+        ck.save_checkpoint(
+            self.to_compact_graph(),
+            checkpoint_path,
+            metadata={"input_path": input_path},
+            # Nodes pre-order matches the compact block order, so a built
+            #   index is valid for the checkpoint either way
+            search_index=self._search_index,
+        )
+
+    def export_tables(self, out_dir, format="auto", chunk_size=1 << 20):
+        # Blocks, pages and ref edges as columnar files, see export_graph
+        from roam_man import export_utils as eu
+
+        return eu.export_graph(self.to_compact_graph(), out_dir, format, chunk_size)
+
+    def iter_raw_pages(self, input_path=None):
+        # Yields raw page dicts, filling self.raw_data as it goes.  With
+        #   parse_refs, block refs are (also) parsed from the strings
+        input_path = self.input_path if input_path is None else input_path
+        if self.stream:
+            pages = self.iter_streamed_pages(input_path)
+        else:
+            from dr_util import file_utils as fu
+
+            self.raw_data = pages = fu.load_file(input_path)
+            self.instrument.set_position(total_pages=len(self.raw_data))
+
+        if self.parse_refs is not None:
+            from roam_man import markup_utils as mu
+
+            # Links resolve through every page's title, when streaming that
+            #   takes an extra decoding pass
+            titled = pages
+            if self.stream:
+                titled = (rd for _, _, rd in su.iter_json_array(input_path))
+            title_uids = mu.page_title_uids(titled)
+            pages = mu.add_parsed_refs(pages, title_uids, self.parse_refs)
+        yield from pages
+
+    def iter_streamed_pages(self, input_path):
+        # Only needed for progress reporting
+        total_bytes = None if self.load_stats is None else os.path.getsize(input_path)
+        if self.storage == "sqlite":
+            # The database serves raw pages afterwards, keep nothing
+            for offset, length, rd in su.iter_json_array(input_path):
+                self.instrument.set_position(offset + length, total_bytes)
+                yield rd
+            return
+
+        self.raw_data = [] if self.keep_raw else su.JsonArrayIndex(input_path)
+        for offset, length, rd in su.iter_json_array(input_path):
+            self.instrument.set_position(offset + length, total_bytes)
+            if self.keep_raw:
+                self.raw_data.append(rd)
+            else:
+                self.raw_data.append(offset, length)
+            yield rd
 
     def get_raw_elem(self, idx):
         return self.raw_data[idx]
@@ -139,5 +751,466 @@ class RoamGraph:
         return self.roam_pages[title]
 
     def get_page_node_by_index(self, idx):
-        title = self.get_raw_elem(idx)["title"]
-        return self.get_page_node(title)
+        return self.get_page_node(self.page_titles[idx])
+
+    def write_pages(self, file, titles=None, max_depth=None, max_blocks=None):
+        # Streams the rendering of each page (all by default, in page order)
+        #   to file, a blank line between pages, limits apply per page
+        titles = self.page_titles if titles is None else titles
+        for i, title in enumerate(titles):
+            if i > 0:
+                file.write("\n\n")
+            write_roam_str(self.roam_pages[title], file, max_depth, max_blocks)
+
+    # ---- Daily pages ---- #
+
+    @property
+    def daily_pages(self):
+        # (titles, dates) arrays of the daily pages sorted by date, built on
+        #   first use with one vectorized pass over the page uids
+        if self._daily_pages is None:
+            from roam_man import validation_utils as vu
+
+            if self.db is not None:
+                rows = list(self.db.iter_page_uids_and_titles())
+                uids, titles = [r[0] for r in rows], [r[1] for r in rows]
+            else:
+                titles = list(self.roam_pages)
+                uids = [node.uid for node in self.roam_pages.values()]
+            titles = np.array(titles, dtype=object)
+            is_daily, dates = vu.classify_dates(uids)
+            order = np.argsort(dates[is_daily], kind="stable")
+            self._daily_pages = (titles[is_daily][order], dates[is_daily][order])
+        return self._daily_pages
+
+    def get_daily_pages(self, start=None, end=None):
+        # Titles of daily pages dated within [start, end], both optional and
+        #   anything np.datetime64 accepts (e.g. "2024-01-31")
+        titles, dates = self.daily_pages
+        lo, hi = 0, len(dates)
+        if start is not None:
+            lo = np.searchsorted(dates, np.datetime64(start, "D"), side="left")
+        if end is not None:
+            hi = np.searchsorted(dates, np.datetime64(end, "D"), side="right")
+        return titles[lo:hi].tolist()
+
+    # ---- Block lookup (any depth) ---- #
+
+    def get_block(self, uid):
+        if self.store is not None:
+            return self.store.node(self.store.get_block_idx(uid))
+        return self.block_index[uid]
+
+    def get_parent_chain(self, uid):
+        # Ancestors of the block, from its page down to its direct parent
+        return list(tu.iter_ancestors(self.get_block(uid)))[::-1]
+
+    def get_page_of(self, uid):
+        if self.store is not None:
+            return self.store.node(
+                self.store.get_page_root(self.store.get_block_idx(uid))
+            )
+        node = self.get_block(uid)
+        while node.parent is not None:
+            node = node.parent
+        return node
+
+    # ---- Backlinks ---- #
+
+    @property
+    def backlinks(self):
+        if self._backlinks is None:
+            self._backlinks = bi.BacklinkIndex.from_compact_graph(self.store)
+        return self._backlinks
+
+    def get_backlinks(self, uid):
+        # uids of the blocks that reference uid
+        return self.backlinks.get_backlinks(uid)
+
+    def get_linking_pages(self, uid):
+        # titles of the pages with a block that references uid
+        return [self.uid_to_title[p] for p in self.backlinks.get_linking_pages(uid)]
+
+    # ---- Full-text search ---- #
+
+    @property
+    def search_index(self):
+        # Built on first use (or loaded with a checkpoint).  Docs are block
+        #   idxs for compact storage, block ids for sqlite storage and
+        #   pre-order positions for nodes storage.
+        from roam_man import search_index as si
+
+        if self._search_index is None and self.store is not None:
+            self._search_index = si.SearchIndex.from_compact_graph(self.store)
+        elif self._search_index is None and self.db is not None:
+            self._search_index = si.SearchIndex.from_texts(self.db.iter_block_texts())
+        elif self._search_index is None:
+            self._search_index = si.SearchIndex.from_texts(
+                node.title if node.string is None else node.string
+                for node in self.block_docs
+            )
+        return self._search_index
+
+    def search(self, query, limit=10):
+        # [(block node, score)] best first, query syntax as SearchIndex.search
+        hits = self.search_index.search(query, limit=limit)
+        return [(self.get_doc_block(doc), score) for doc, score in hits]
+
+    # ---- Block docs ---- #
+
+    @property
+    def block_docs(self):
+        # Nodes storage: every block, page by page in pre-order, the doc
+        #   numbering shared by the search and time indexes
+        if self._block_docs is None:
+            self._block_docs = [
+                node
+                for page_node in self.roam_pages.values()
+                for node in tu.iter_subtree(page_node)
+            ]
+        return self._block_docs
+
+    def get_doc_block(self, doc):
+        # The block numbered doc in the search and time indexes
+        if self.store is not None:
+            return self.store.node(doc)
+        if self.db is not None:
+            return self.db.block_node(doc)
+        return self.block_docs[doc]
+
+    # ---- Time queries ---- #
+
+    @property
+    def time_index(self):
+        # Sorted create / edit times, built on first use, see TimeIndex
+        from roam_man import time_index as ti
+
+        if self._time_index is None and self.store is not None:
+            self._time_index = ti.TimeIndex.from_compact_graph(self.store)
+        elif self._time_index is None and self.db is not None:
+            self._time_index = ti.TimeIndex.from_columns(*self.db.block_time_columns())
+        elif self._time_index is None:
+            self._time_index = ti.TimeIndex.from_page_nodes(self.roam_pages.values())
+        return self._time_index
+
+    def get_blocks_between(self, start=None, end=None, field="edit_time"):
+        # Blocks with field within [start, end] (inclusive, both optional and
+        #   epoch ms or anything np.datetime64 accepts, a date-only end
+        #   includes the whole day as in get_daily_pages), oldest first
+        docs = self.time_index.docs_between(field, start, end)
+        return [self.get_doc_block(doc) for doc in docs.tolist()]
+
+    def count_blocks_between(self, start=None, end=None, field="edit_time"):
+        return self.time_index.count(field, start, end)
+
+    def get_time_histogram(self, freq="day", start=None, end=None, field="edit_time"):
+        # (bin start dates, block counts) per "day" or "week", see
+        #   TimeIndex.histogram
+        return self.time_index.histogram(field, freq, start, end)
+
+    def get_recent_pages(self, limit=10, start=None, end=None, field="edit_time"):
+        # [(title, latest time)] of the pages with the most recently edited
+        #   (or created) blocks, most recent first
+        index = self.time_index
+        return [
+            (self.get_doc_block(int(index.page_starts[page])).title, t)
+            for page, t in index.recent_pages(field, start, end, limit)
+        ]
+
+    # ---- Page analytics ---- #
+
+    @property
+    def page_graph(self):
+        # Page-to-page links as a CSR matrix, built on first use, see
+        #   graph_analytics.PageGraph
+        from roam_man import graph_analytics as ga
+
+        if self._page_graph is None and self.store is not None:
+            self._page_graph = ga.PageGraph.from_compact_graph(self.store)
+        elif self._page_graph is None and self.db is not None:
+            self._page_graph = ga.PageGraph.from_edges(
+                list(self.page_titles), *self.db.page_ref_edges()
+            )
+        elif self._page_graph is None:
+            self._page_graph = ga.PageGraph.from_edges(
+                list(self.roam_pages), *self.page_ref_edges()
+            )
+        return self._page_graph
+
+    def page_ref_edges(self):
+        # Nodes storage: (source, target) page positions of every ref, a ref
+        #   to a block counting for its page, unknown targets as -1
+        symbol_pages = np.full(len(self.symbols), -1, dtype=np.int64)
+        known = self.symbols.ids
+        ids, num_refs = bytearray(), []
+        for page, page_node in enumerate(self.roam_pages.values()):
+            start = len(ids)
+            for node in tu.iter_subtree(page_node):
+                sid = known.get(node.uid)
+                if sid is not None:
+                    symbol_pages[sid] = page
+                ids += node._ref_ids
+            num_refs.append((len(ids) - start) // 4)
+        sources = np.repeat(np.arange(len(num_refs), dtype=np.int64), num_refs)
+        return sources, symbol_pages[np.frombuffer(bytes(ids), dtype=np.int32)]
+
+    def get_top_pages(self, k=10, damping=0.85):
+        # [(title, PageRank)] of the k most important pages
+        from roam_man import graph_analytics as ga
+
+        pages = self.page_graph
+        ranks = pages.pagerank(damping=damping)
+        return [(pages.titles[p], float(ranks[p])) for p in ga.top_k(ranks, k)]
+
+    def get_page_clusters(self, min_size=2):
+        # Titles of each connected group of pages, largest first
+        pages = self.page_graph
+        num, labels = pages.connected_components()
+        order = np.argsort(labels, kind="stable")
+        bounds = np.searchsorted(labels[order], np.arange(num + 1))
+        clusters = [order[bounds[i] : bounds[i + 1]] for i in range(num)]
+        return [
+            [pages.titles[p] for p in cluster.tolist()]
+            for cluster in clusters
+            if len(cluster) >= min_size
+        ]
+
+    def get_similar_pages(self, title, k=10, mode="both"):
+        # [(title, score)] of the pages referenced alongside / referencing
+        #   the same pages as title, see PageGraph.similar_pages
+        pages = self.page_graph
+        return [
+            (pages.titles[p], score)
+            for p, score in pages.similar_pages(pages.page_idx(title), k, mode)
+        ]
+
+    # ---- Markup ---- #
+
+    def iter_markup(self):
+        # (block node, BlockMarkup) of every block with any markup in its
+        #   string, in page order.  Compact storage parses each distinct
+        #   string once
+        from roam_man import markup_utils as mu
+
+        if self.store is not None:
+            store = self.store
+            markups = mu.parse_blocks(store.strings)
+            # Trailing False for string_id MISSING (-1)
+            has_markup = np.array([bool(m) for m in markups] + [False])
+            for idx in np.flatnonzero(has_markup[store.string_id]).tolist():
+                yield store.node(idx), markups[store.string_id[idx]]
+            return
+        for page_node in self.roam_pages.values():
+            for node in tu.iter_subtree(page_node):
+                markup = mu.parse_block(node.string)
+                if markup:
+                    yield node, markup
+
+    def get_attributes(self, name):
+        # {block uid: value} of the blocks setting attribute name ("name::")
+        return {
+            node.uid: markup.attribute[1]
+            for node, markup in self.iter_markup()
+            if markup.attribute is not None and markup.attribute[0] == name
+        }
+
+    # ---- Structural queries ---- #
+
+    def query(self):
+        # Chainable block query with an index-picking planner, see GraphQuery
+        from roam_man import query_utils as qu
+
+        return qu.GraphQuery(self)
+
+    # ---- Snapshots ---- #
+
+    def snapshot(self, search=False):
+        """
+        Frozen copy of the graph that any number of threads can read at once
+        without locking: compact storage with read-only columns, read-only
+        roam_pages / uid_to_title / extra_data and every lookup index built
+        up front.  Updates go to this graph, take a new snapshot to see them.
+
+        Args:
+            search (bool): Also build the full-text search index up front.
+
+        Returns:
+            RoamGraph: The snapshot (graph.frozen is True).
+        """
+        from roam_man import snapshot_utils as snu
+
+        return snu.freeze_graph(self, search=search)
+
+    def to_shared_memory(self, name=None):
+        # Snapshot into a shared memory block for worker processes, see
+        #   snapshot_utils.SharedGraph (the caller owns and unlinks it)
+        from roam_man import snapshot_utils as snu
+
+        return snu.SharedGraph.create(self, name=name)
+
+    @classmethod
+    def from_shared_memory(cls, name):
+        # The frozen graph in a block made by to_shared_memory, zero copy
+        from roam_man import snapshot_utils as snu
+
+        return snu.SharedGraph.attach(name).graph
+
+    # ---- Page updates ---- #
+
+    def replace_page(self, raw_page):
+        # Re-parse a single page (matched by uid, else title) and patch the
+        #   indexes in place, or add it if the graph doesn't have it yet.
+        #   Renaming it to another page's title is refused, not a replace
+        if self.frozen:
+            raise ValueError("graph snapshots are read-only")
+        if self.storage != "nodes":
+            raise ValueError("replace_page requires storage='nodes'")
+
+        old_title = self.uid_to_title.get(raw_page["uid"], raw_page["title"])
+        holder = self.roam_pages.get(raw_page["title"])
+        if raw_page["title"] != old_title and holder is not None:
+            raise ValueError(
+                f"can't rename page {raw_page['uid']!r} to {raw_page['title']!r},"
+                f" page {holder.uid!r} already has that title"
+            )
+        node = self.swap_page(self.roam_pages.get(old_title), raw_page)
+
+        if old_title in self.page_titles:
+            idx = self.page_titles.index(old_title)
+            self.page_titles[idx] = raw_page["title"]
+            self.raw_data[idx] = raw_page
+        else:
+            self.page_titles.append(raw_page["title"])
+            if isinstance(self.raw_data, list):
+                self.raw_data.append(raw_page)
+            else:
+                self.raw_data.append_elem(raw_page)
+        return node
+
+    def update_from(self, new_input_path):
+        """
+        Patch the graph to match a newer export of the same Roam graph.
+
+        Pages are matched by uid and compared by fingerprint (uids, create and
+        edit times and child counts of all their blocks).  Only added and
+        changed pages are re-parsed and only their entries in uid_to_title,
+        the block index and the backlinks are touched, the new export still
+        has to be read once.
+
+        Args:
+            new_input_path (str): Path to the newer export.
+
+        Returns:
+            GraphChangeset: The added, removed and changed pages and blocks.
+        """
+        if self.frozen:
+            raise ValueError("graph snapshots are read-only")
+        if self.storage != "nodes":
+            raise ValueError("update_from requires storage='nodes'")
+        from roam_man import diff_utils as du
+
+        fingerprints = self.page_fingerprints
+        old_nodes = {node.uid: node for node in self.roam_pages.values()}
+        changeset = du.GraphChangeset()
+        new_titles = []
+        seen_uids = set()
+        new_pages = []
+        for raw_page in self.iter_raw_pages(new_input_path):
+            uid = raw_page["uid"]
+            new_titles.append(raw_page["title"])
+            seen_uids.add(uid)
+            old_node = old_nodes.get(uid)
+            if old_node is None:
+                changeset.record_added_page(raw_page)
+            elif (
+                du.raw_page_fingerprint(raw_page) != fingerprints.get(uid)
+                or old_node.title != raw_page["title"]
+            ):
+                changeset.record_changed_page(old_node, raw_page)
+            else:
+                continue
+            new_pages.append(raw_page)
+
+        # Every replaced or removed page goes before any new one goes in, so
+        #   pages trading titles don't overwrite each other
+        for raw_page in new_pages:
+            if raw_page["uid"] in old_nodes:
+                self.swap_page(old_nodes[raw_page["uid"]], None)
+        for uid in [uid for uid in old_nodes if uid not in seen_uids]:
+            changeset.record_removed_page(old_nodes[uid])
+            self.swap_page(old_nodes[uid], None)
+        for raw_page in new_pages:
+            self.swap_page(None, raw_page)
+        changeset.diff_blocks()
+
+        self.input_path = new_input_path
+        self.page_titles = new_titles
+        return changeset
+
+    @property
+    def page_fingerprints(self):
+        # {page uid: fingerprint}, computed on first use then kept up to date
+        if self._page_fingerprints is None:
+            from roam_man import diff_utils as du
+
+            self._page_fingerprints = {
+                node.uid: du.page_node_fingerprint(node)
+                for node in self.roam_pages.values()
+            }
+        return self._page_fingerprints
+
+    @property
+    def page_sizes(self):
+        # {page uid: number of blocks incl. the page}, kept up to date like
+        #   page_fingerprints
+        if self._page_sizes is None:
+            self._page_sizes = {
+                node.uid: sum(1 for _ in tu.iter_subtree(node))
+                for node in self.roam_pages.values()
+            }
+        return self._page_sizes
+
+    def swap_page(self, old_node, raw_page):
+        # Replace old_node's page with raw_page in roam_pages and every index,
+        #   either may be None to only add or only remove
+        self._daily_pages = None
+        self._search_index = None
+        self._time_index = None
+        self._block_docs = None
+        self._page_graph = None
+        if old_node is not None:
+            self.remove_page_indexes(old_node)
+            if self.roam_pages.get(old_node.title) is old_node:
+                del self.roam_pages[old_node.title]
+            if self._page_fingerprints is not None:
+                self._page_fingerprints.pop(old_node.uid, None)
+            if self._page_sizes is not None:
+                self._page_sizes.pop(old_node.uid, None)
+        if raw_page is None:
+            return None
+
+        # Uids of removed pages stay in self.symbols, ids are never reused
+        node = RoamNode(
+            raw_page,
+            keep_raw=self.keep_raw,
+            block_index=self.block_index,
+            symbols=self.symbols,
+        )
+        self.roam_pages[raw_page["title"]] = node
+        self.uid_to_title[node.uid] = raw_page["title"]
+        self.backlinks.add_page(node)
+        if self._page_fingerprints is not None:
+            from roam_man import diff_utils as du
+
+            self._page_fingerprints[node.uid] = du.page_node_fingerprint(node)
+        if self._page_sizes is not None:
+            self._page_sizes[node.uid] = sum(1 for _ in tu.iter_subtree(node))
+        return node
+
+    def remove_page_indexes(self, page_node):
+        for node in tu.iter_subtree(page_node):
+            if self.block_index.get(node.uid) is node:
+                del self.block_index[node.uid]
+        if self.uid_to_title.get(page_node.uid) == page_node.title:
+            del self.uid_to_title[page_node.uid]
+        self.backlinks.remove_page(page_node.uid)
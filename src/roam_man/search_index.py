@@ -0,0 +1,289 @@
+import bisect
+import json
+import re
+from array import array
+from pathlib import Path
+
+import numpy as np
+
+from roam_man import compact_graph as cg
+
+# Bump when the on-disk layout changes, old indexes are then rebuilt
+SEARCH_INDEX_VERSION = 1
+SEARCH_INDEX_FORMAT = "roam_man.search_index"
+HEADER_FILE = "header.json"
+COLUMNS = ["term_offsets", "occ_docs", "occ_positions", "doc_lengths"]
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+TOKEN_RE = re.compile(r"\w+")
+QUERY_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+
+# ---------------- Inverted Index ---------------- #
+
+
+class SearchIndex:
+    """
+    Positional inverted index over block texts with BM25 ranking.  Documents
+    are numbered 0..n-1 by the caller (CompactGraph block idx, or pre-order
+    position for node storage).
+
+    Layout (CSR over the sorted vocabulary, so prefix queries are a range):
+        terms           StringTable of the sorted distinct terms
+        term_offsets    int64 (num_terms + 1), term i's occurrences are
+                          occ_*[term_offsets[i]:term_offsets[i + 1]]
+        occ_docs        int32 doc of each occurrence, sorted within a term
+        occ_positions   int32 token position of each occurrence in its doc
+        doc_lengths     int32 tokens per doc
+    """
+
+    def __init__(self, terms, term_offsets, occ_docs, occ_positions, doc_lengths):
+        self.terms = terms
+        self.term_offsets = term_offsets
+        self.occ_docs = occ_docs
+        self.occ_positions = occ_positions
+        self.doc_lengths = doc_lengths
+        self.avg_doc_length = (
+            max(float(np.mean(doc_lengths)), 1.0) if len(doc_lengths) else 1.0
+        )
+
+    @classmethod
+    def from_texts(cls, texts):
+        # texts: iterable of strings (or None), one per doc in doc order
+        term_ids = {}
+        occ_terms, occ_docs, occ_positions = array("i"), array("i"), array("i")
+        doc_lengths = array("i")
+        for doc, text in enumerate(texts):
+            tokens = tokenize(text)
+            for pos, token in enumerate(tokens):
+                occ_terms.append(term_ids.setdefault(token, len(term_ids)))
+            occ_docs.extend([doc] * len(tokens))
+            occ_positions.extend(range(len(tokens)))
+            doc_lengths.append(len(tokens))
+
+        # Renumber terms in sorted order, then group occurrences by term
+        terms = sorted(term_ids)
+        rank = np.empty(len(terms), dtype=np.int32)
+        rank[[term_ids[t] for t in terms]] = np.arange(len(terms), dtype=np.int32)
+        occ_terms = rank[np.frombuffer(occ_terms, dtype=np.int32)]
+        occ_docs = np.frombuffer(occ_docs, dtype=np.int32)
+        occ_positions = np.frombuffer(occ_positions, dtype=np.int32)
+        order = np.lexsort((occ_positions, occ_docs, occ_terms))
+        term_offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(occ_terms, minlength=len(terms)), out=term_offsets[1:])
+        return cls(
+            cg.StringTable.from_strings(terms),
+            term_offsets,
+            occ_docs[order],
+            occ_positions[order],
+            np.frombuffer(doc_lengths, dtype=np.int32).copy(),
+        )
+
+    @classmethod
+    def from_compact_graph(cls, store):
+        # Docs are block idxs, pages are indexed by title
+        texts = list(store.strings)
+        return cls.from_texts(
+            texts[text_id] if text_id != cg.MISSING else store.get_text(title_id)
+            for text_id, title_id in zip(
+                store.string_id.tolist(), store.title_id.tolist()
+            )
+        )
+
+    @property
+    def num_docs(self):
+        return len(self.doc_lengths)
+
+    @property
+    def num_terms(self):
+        return len(self.terms)
+
+    # ---- Postings ---- #
+
+    def term_range(self, term):
+        # Index of term in the sorted vocabulary, or None
+        i = bisect.bisect_left(self.terms, term)
+        return i if i < self.num_terms and self.terms[i] == term else None
+
+    def prefix_range(self, prefix):
+        # [lo, hi) of the terms starting with prefix
+        lo = bisect.bisect_left(self.terms, prefix)
+        hi = bisect.bisect_left(self.terms, prefix + "\U0010ffff", lo=lo)
+        return lo, hi
+
+    def occurrences(self, term_idx):
+        start, end = self.term_offsets[term_idx], self.term_offsets[term_idx + 1]
+        return self.occ_docs[start:end], self.occ_positions[start:end]
+
+    def term_docs(self, term):
+        # (docs, term frequencies) of a single term
+        term_idx = self.term_range(term)
+        if term_idx is None:
+            return _empty_hits()
+        docs, _ = self.occurrences(term_idx)
+        return np.unique(docs, return_counts=True)
+
+    def phrase_docs(self, tokens):
+        # (docs, phrase frequencies) of consecutive tokens, by intersecting
+        #   (doc, start position) keys of each token shifted back by its
+        #   offset.  Keys come out sorted, so each step is a searchsorted
+        #   against the rarest-so-far candidates, no re-sorting.
+        term_idxs = [self.term_range(token) for token in tokens]
+        if any(term_idx is None for term_idx in term_idxs):
+            return _empty_hits()
+        by_rarity = sorted(
+            enumerate(term_idxs),
+            key=lambda p: self.term_offsets[p[1] + 1] - self.term_offsets[p[1]],
+        )
+        keys = None
+        for offset, term_idx in by_rarity:
+            docs, positions = self.occurrences(term_idx)
+            starts = positions.astype(np.int64) - offset
+            keep = starts >= 0
+            token_keys = (docs[keep].astype(np.int64) << 32) | starts[keep]
+            if keys is None or len(token_keys) == 0:
+                keys = token_keys
+            else:
+                found = np.searchsorted(token_keys, keys)
+                found = np.minimum(found, len(token_keys) - 1)
+                keys = keys[token_keys[found] == keys]
+            if len(keys) == 0:
+                return _empty_hits()
+        return np.unique(keys >> 32, return_counts=True)
+
+    # ---- Ranking ---- #
+
+    def bm25(self, docs, freqs, doc_freqs=None):
+        # doc_freqs: per-hit document frequency, defaults to len(docs)
+        if len(docs) == 0:
+            return np.zeros(0)
+        df = len(docs) if doc_freqs is None else doc_freqs
+        idf = np.log1p((self.num_docs - df + 0.5) / (df + 0.5))
+        norm = K1 * (1 - B + B * self.doc_lengths[docs] / self.avg_doc_length)
+        return idf * freqs * (K1 + 1) / (freqs + norm)
+
+    def clause_scores(self, clause):
+        # (docs, scores) for one parsed query clause
+        kind, value = clause
+        if kind == "phrase":
+            docs, freqs = self.phrase_docs(value)
+            return docs, self.bm25(docs, freqs)
+        if kind == "term":
+            docs, freqs = self.term_docs(value)
+            return docs, self.bm25(docs, freqs)
+
+        # prefix: every matching term contributes its own BM25 score, the
+        #   terms' occurrences are one contiguous slice of the CSR arrays
+        lo, hi = self.prefix_range(value)
+        start, end = self.term_offsets[lo], self.term_offsets[hi]
+        if start == end:
+            return _empty_hits()
+        occ_terms = np.repeat(
+            np.arange(hi - lo, dtype=np.int64), np.diff(self.term_offsets[lo : hi + 1])
+        )
+        pairs, freqs = np.unique(
+            (occ_terms << 32) | self.occ_docs[start:end], return_counts=True
+        )
+        pair_terms, pair_docs = pairs >> 32, pairs & 0xFFFFFFFF
+        doc_freqs = np.bincount(pair_terms)[pair_terms]
+        scores = self.bm25(pair_docs, freqs, doc_freqs)
+        docs, inverse = np.unique(pair_docs, return_inverse=True)
+        return docs, np.bincount(inverse, weights=scores)
+
+    def search(self, query, limit=10):
+        """
+        Rank docs matching every clause of query by BM25.
+
+        Clauses are whitespace separated: plain terms, "quoted phrases" and
+        prefix* terms, all matched case-insensitively.
+
+        Args:
+            query (str): The query.
+            limit (int): Max hits to return, None for all.
+
+        Returns:
+            list: (doc, score) pairs, best first.
+        """
+        clauses = parse_query(query)
+        if not clauses:
+            return []
+        docs, scores = self.clause_scores(clauses[0])
+        for clause in clauses[1:]:
+            clause_docs, clause_scores = self.clause_scores(clause)
+            docs, idx, clause_idx = np.intersect1d(
+                docs, clause_docs, assume_unique=True, return_indices=True
+            )
+            scores = scores[idx] + clause_scores[clause_idx]
+        order = np.lexsort((docs, -scores))[:limit]
+        return [
+            (int(doc), float(score)) for doc, score in zip(docs[order], scores[order])
+        ]
+
+    # ---- Persistence ---- #
+
+    def save(self, path):
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        for name in COLUMNS:
+            np.save(path / f"{name}.npy", np.ascontiguousarray(getattr(self, name)))
+        (path / "terms.blob").write_bytes(bytes(self.terms.blob))
+        np.save(path / "terms.npy", np.asarray(self.terms.offsets))
+        header = {
+            "format": SEARCH_INDEX_FORMAT,
+            "version": SEARCH_INDEX_VERSION,
+            "num_docs": self.num_docs,
+            "num_terms": self.num_terms,
+        }
+        (path / HEADER_FILE).write_text(json.dumps(header, indent=2))
+
+    @classmethod
+    def load(cls, path, mmap_mode="r"):
+        # Returns None when path has no index or one from another version
+        path = Path(path)
+        header_path = path / HEADER_FILE
+        if not header_path.exists():
+            return None
+        header = json.loads(header_path.read_text())
+        if (
+            header.get("format") != SEARCH_INDEX_FORMAT
+            or header.get("version") != SEARCH_INDEX_VERSION
+        ):
+            return None
+        columns = {
+            name: np.load(path / f"{name}.npy", mmap_mode=mmap_mode) for name in COLUMNS
+        }
+        terms = cg.StringTable(
+            (path / "terms.blob").read_bytes(),
+            np.load(path / "terms.npy", mmap_mode=mmap_mode),
+        )
+        return cls(terms, **columns)
+
+
+def parse_query(query):
+    # [(kind, value)] with kind in "term", "phrase", "prefix"
+    clauses = []
+    for phrase, word in QUERY_RE.findall(query):
+        if phrase:
+            tokens = tokenize(phrase)
+            if len(tokens) == 1:
+                clauses.append(("term", tokens[0]))
+            elif tokens:
+                clauses.append(("phrase", tokens))
+        else:
+            tokens = tokenize(word)
+            prefix = tokens.pop() if word.endswith("*") and tokens else None
+            clauses.extend(("term", token) for token in tokens)
+            if prefix is not None:
+                clauses.append(("prefix", prefix))
+    return clauses
+
+
+def _empty_hits():
+    return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int64)
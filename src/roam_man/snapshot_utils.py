@@ -0,0 +1,329 @@
+import json
+import pickle
+import struct
+from multiprocessing import shared_memory
+from types import MappingProxyType
+
+import numpy as np
+
+from roam_man import backlink_index as bi
+from roam_man import compact_graph as cg
+from roam_man import graph_analytics as ga
+from roam_man import roam_graph as gu
+from roam_man import search_index as si
+from roam_man import time_index as ti
+
+SHARED_FORMAT = "roam_man.shared_graph"
+SHARED_VERSION = 1
+ALIGN = 64  # bytes, every array starts on a cache line
+HEADER_SIZE = struct.Struct("<Q")
+
+# ---------------- Frozen Snapshots ---------------- #
+
+# A snapshot is a RoamGraph with compact storage whose columns are
+#   read-only arrays, whose dicts are MappingProxyType views and whose lazy
+#   indexes (uid lookup, backlinks, time index, page graph) are all built up
+#   front, so readers in any number of threads never write shared state.
+#   Indexes left to build on first use (search unless asked for, daily
+#   pages) are published with a single attribute assignment, so concurrent
+#   first use can at worst build them twice.
+
+
+def read_only(array):
+    view = np.asarray(array).view()
+    view.setflags(write=False)
+    return view
+
+
+def freeze_graph(graph, search=False):
+    """
+    Frozen copy of graph, see RoamGraph.snapshot.  Block data is shared with
+    graph when it already has compact storage, the indexes are reused when
+    graph has built them (their doc and page numbering is the same for
+    every storage type).
+
+    Args:
+        graph (RoamGraph): Any storage type.
+        search (bool): Also build the full-text search index up front.
+
+    Returns:
+        RoamGraph: The frozen snapshot.
+    """
+    store = graph.to_compact_graph()
+    frozen_store = cg.CompactGraph(
+        uids=store.uids,
+        strings=store.strings,
+        uid_index=store.uid_index,
+        symbol_blocks=read_only(store.symbol_blocks),
+        page_order=read_only(store.page_order),
+        **{name: read_only(getattr(store, name)) for name in store.COLUMNS},
+    )
+    indexes = {
+        "backlinks": bi.CsrBacklinkIndex.from_compact_graph(frozen_store),
+        "time_index": graph._time_index,
+        "page_graph": graph._page_graph,
+        "search_index": graph._search_index,
+    }
+    snapshot = from_store(frozen_store, graph.input_path, graph.extra_data, indexes)
+    if search:
+        snapshot.search_index
+    return snapshot
+
+
+def from_store(store, input_path, extra_data, indexes):
+    # Frozen RoamGraph around store, indexes missing from indexes are built
+    graph = gu.RoamGraph.__new__(gu.RoamGraph)
+    graph.init_state(
+        input_path=input_path,
+        checkpoint_path=None,
+        stream=False,
+        keep_raw=False,
+        storage="compact",
+    )
+    graph.load_store(store)
+    graph.raw_data = cg.RawPageView(store)
+    graph._backlinks = indexes["backlinks"]
+    graph._time_index = indexes["time_index"]
+    graph._page_graph = indexes["page_graph"]
+    graph._search_index = indexes["search_index"]
+    graph.time_index
+    graph.page_graph.transpose
+
+    graph.roam_pages = MappingProxyType(graph.roam_pages)
+    graph.uid_to_title = MappingProxyType(graph.uid_to_title)
+    graph.page_titles = tuple(graph.page_titles)
+    graph.extra_data = MappingProxyType(dict(extra_data))
+    graph.frozen = True
+    return graph
+
+
+# ---------------- Shared Memory ---------------- #
+
+# Block layout:
+#   8 bytes     little-endian length of the json header
+#   header      format, version, {name: [offset, dtype, shape]} and metadata
+#   arrays      from the first ALIGN boundary after the header, each aligned
+#                 to ALIGN bytes, in header order
+
+
+def graph_arrays(graph):
+    # {name: array} holding everything a frozen graph needs, block level
+    #   data only (per-page dicts are cheap to rebuild in each process)
+    store = graph.store
+    arrays = {f"store.{name}": getattr(store, name) for name in store.COLUMNS}
+    arrays["store.symbol_blocks"] = store.symbol_blocks
+    for name, table in [("uids", store.uids), ("strings", store.strings)]:
+        arrays[f"{name}.blob"] = np.frombuffer(bytes(table.blob), dtype=np.uint8)
+        arrays[f"{name}.offsets"] = table.offsets
+    uid_order = getattr(store.uid_index, "order", None)
+    if uid_order is None:
+        uid_order = cg.sort_strings(store.uids)
+    arrays["uids.order"] = uid_order
+    arrays["pages.order"] = store.page_order
+
+    backlinks = graph.backlinks
+    arrays["backlinks.target_offsets"] = backlinks.target_offsets
+    arrays["backlinks.sources"] = backlinks.sources
+
+    time_index = graph.time_index
+    for field in ti.FIELDS:
+        arrays[f"time.{field}.times"] = time_index.times[field]
+        arrays[f"time.{field}.docs"] = time_index.docs[field]
+    arrays["time.page_starts"] = time_index.page_starts
+
+    arrays["pages.indptr"] = graph.page_graph.indptr
+    arrays["pages.indices"] = graph.page_graph.indices
+
+    if graph._search_index is not None:
+        index = graph._search_index
+        for name in si.COLUMNS:
+            arrays[f"search.{name}"] = getattr(index, name)
+        arrays["terms.blob"] = np.frombuffer(bytes(index.terms.blob), dtype=np.uint8)
+        arrays["terms.offsets"] = index.terms.offsets
+
+    arrays["extra_data"] = np.frombuffer(
+        pickle.dumps(dict(graph.extra_data)), dtype=np.uint8
+    )
+    return arrays
+
+
+def align(n):
+    return -(-n // ALIGN) * ALIGN
+
+
+def pack_layout(arrays, metadata):
+    # (header bytes, data start, total size), array offsets in the header
+    #   are relative to the data start, right after the header
+    layout, offset = {}, 0
+    for name, array in arrays.items():
+        offset = align(offset)
+        layout[name] = [offset, array.dtype.str, list(array.shape)]
+        offset += array.nbytes
+    header = {
+        "format": SHARED_FORMAT,
+        "version": SHARED_VERSION,
+        "layout": layout,
+        "metadata": metadata,
+    }
+    header = json.dumps(header).encode("utf-8")
+    start = align(HEADER_SIZE.size + len(header))
+    return header, start, start + offset
+
+
+def open_shared_memory(name):
+    # Python < 3.13 can't opt out of the resource tracker, which then also
+    #   tracks (and may warn about) blocks this process only attached to
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+class SharedGraph:
+    """
+    A frozen graph's block-level arrays in one multiprocessing shared memory
+    block, so N worker processes answer lookups and queries from a single
+    copy.  The process that creates it owns the block and must unlink it
+    when done; workers attach by name (forked workers can also just use the
+    inherited .graph).  Per-page dicts are rebuilt in each process.
+
+        with rg.to_shared_memory() as shared:
+            pool.map(work, [shared.name] * n)
+        # in a worker: graph = RoamGraph.from_shared_memory(name)
+
+    Arrays handed out by .graph are views into the block, so close() only
+    works once they are all gone; unlink() always does.  A graph from
+    RoamGraph.from_shared_memory keeps its block mapped for as long as it
+    lives.
+    """
+
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+        self.graph = None
+
+    @classmethod
+    def create(cls, graph, name=None):
+        if not graph.frozen:
+            graph = freeze_graph(graph)
+        arrays = graph_arrays(graph)
+        input_path = None if graph.input_path is None else str(graph.input_path)
+        header, start, size = pack_layout(arrays, {"input_path": input_path})
+        shm = shared_memory.SharedMemory(name=name, create=True, size=max(size, 1))
+        try:
+            HEADER_SIZE.pack_into(shm.buf, 0, len(header))
+            shm.buf[HEADER_SIZE.size : HEADER_SIZE.size + len(header)] = header
+            layout = json.loads(header)["layout"]
+            for name, array in arrays.items():
+                offset = start + layout[name][0]
+                flat = np.ascontiguousarray(array).reshape(-1).view(np.uint8)
+                shm.buf[offset : offset + len(flat)] = flat
+        except BaseException:
+            shm.close()
+            shm.unlink()
+            raise
+        shared = cls(shm, owner=True)
+        shared.graph = shared.load_graph()
+        return shared
+
+    @classmethod
+    def attach(cls, name):
+        shared = cls(open_shared_memory(name), owner=False)
+        shared.graph = shared.load_graph()
+        return shared
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def read_header(self):
+        (length,) = HEADER_SIZE.unpack_from(self.shm.buf, 0)
+        header = json.loads(
+            bytes(self.shm.buf[HEADER_SIZE.size : HEADER_SIZE.size + length])
+        )
+        if header.get("format") != SHARED_FORMAT:
+            raise ValueError(f"Not a roam_man shared graph: {self.name}")
+        if header.get("version") != SHARED_VERSION:
+            raise ValueError(
+                f"Shared graph version {header.get('version')} != {SHARED_VERSION}"
+            )
+        return header, align(HEADER_SIZE.size + length)
+
+    def load_arrays(self):
+        header, start = self.read_header()
+        arrays = {}
+        for name, (offset, dtype, shape) in header["layout"].items():
+            dtype = np.dtype(dtype)
+            count = int(np.prod(shape, dtype=np.int64))
+            array = np.frombuffer(self.shm.buf, dtype, count, start + offset)
+            array = array.reshape(shape)
+            array.setflags(write=False)
+            arrays[name] = array
+        return arrays, header["metadata"]
+
+    def load_graph(self):
+        arrays, metadata = self.load_arrays()
+        uids = cg.StringTable(arrays["uids.blob"], arrays["uids.offsets"])
+        store = cg.CompactGraph(
+            uids=uids,
+            strings=cg.StringTable(arrays["strings.blob"], arrays["strings.offsets"]),
+            uid_index=cg.StringIndex(uids, arrays["uids.order"]),
+            symbol_blocks=arrays["store.symbol_blocks"],
+            page_order=arrays["pages.order"],
+            **{name: arrays[f"store.{name}"] for name in cg.CompactGraph.COLUMNS},
+        )
+        search_index = None
+        if "terms.blob" in arrays:
+            search_index = si.SearchIndex(
+                cg.StringTable(arrays["terms.blob"], arrays["terms.offsets"]),
+                **{name: arrays[f"search.{name}"] for name in si.COLUMNS},
+            )
+        page_titles = store.page_titles()
+        indexes = {
+            "backlinks": bi.CsrBacklinkIndex(
+                store,
+                arrays["backlinks.target_offsets"],
+                arrays["backlinks.sources"],
+            ),
+            "time_index": ti.TimeIndex(
+                {f: arrays[f"time.{f}.times"] for f in ti.FIELDS},
+                {f: arrays[f"time.{f}.docs"] for f in ti.FIELDS},
+                arrays["time.page_starts"],
+                store.num_blocks,
+            ),
+            "page_graph": ga.PageGraph(
+                page_titles, arrays["pages.indptr"], arrays["pages.indices"]
+            ),
+            "search_index": search_index,
+        }
+        extra_data = pickle.loads(arrays["extra_data"].tobytes())
+        graph = from_store(store, metadata["input_path"], extra_data, indexes)
+        graph.shared = self
+        return graph
+
+    @property
+    def nbytes(self):
+        return self.shm.size
+
+    def close(self):
+        # Detach this process.  Drops .graph first, any other reference to
+        #   it (or its nodes) keeps views into the block alive: BufferError
+        graph, self.graph = self.graph, None
+        if graph is not None:
+            graph.shared = None
+        del graph
+        self.shm.close()
+
+    def unlink(self):
+        # Owner only: free the block once every process has closed it
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            self.close()
+        finally:
+            self.unlink()
@@ -0,0 +1,480 @@
+import sqlite3
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from itertools import chain
+from pathlib import Path
+
+import numpy as np
+
+from roam_man import roam_graph as gu
+
+# Bump when the tables change, older databases then fail to open
+SQLITE_SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE pages (
+    idx INTEGER PRIMARY KEY,
+    uid TEXT,
+    title TEXT,
+    block_id INTEGER NOT NULL,
+    num_blocks INTEGER NOT NULL
+);
+CREATE TABLE blocks (
+    id INTEGER PRIMARY KEY,
+    uid TEXT,
+    parent INTEGER,
+    page_idx INTEGER NOT NULL,
+    depth INTEGER NOT NULL,
+    title TEXT,
+    string TEXT,
+    create_time INTEGER,
+    edit_time INTEGER
+);
+CREATE TABLE refs (
+    block_id INTEGER NOT NULL,
+    pos INTEGER NOT NULL,
+    target TEXT NOT NULL,
+    PRIMARY KEY (block_id, pos)
+) WITHOUT ROWID;
+CREATE INDEX pages_uid ON pages (uid);
+CREATE INDEX pages_title ON pages (title);
+CREATE INDEX blocks_uid ON blocks (uid);
+CREATE INDEX blocks_parent ON blocks (parent);
+CREATE INDEX blocks_edit_time ON blocks (edit_time);
+CREATE INDEX refs_target ON refs (target);
+"""
+
+BLOCK_COLUMNS = "id, uid, parent, depth, title, string, create_time, edit_time"
+
+# ---------------- SQLite Graph Store ---------------- #
+
+
+def is_store_file(db_path):
+    # Whether db_path is a SQLite database written by SqliteStore, of any
+    #   schema version, opened read-only so nothing is created or changed
+    try:
+        conn = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+    except sqlite3.Error:
+        return False
+    try:
+        row = conn.execute(
+            "SELECT value FROM meta WHERE key = 'schema_version'"
+        ).fetchone()
+    except sqlite3.DatabaseError:
+        return False  # no meta table, or not a database at all
+    finally:
+        conn.close()
+    return row is not None
+
+
+# Blocks are numbered in pre-order across the whole graph, so a page is the
+#   id range [pages.block_id, pages.block_id + pages.num_blocks) and can be
+#   read back with one range scan on the primary key.
+
+
+class SqliteStore:
+    """
+    Roam graph kept in a SQLite database, with pages rebuilt into RoamNode
+    trees on access and held in a bounded LRU (max_pages), so memory use
+    doesn't grow with the graph.
+    """
+
+    def __init__(self, db_path, max_pages=256):
+        self.db_path = Path(db_path)
+        self.max_pages = max_pages
+        self.conn = sqlite3.connect(self.db_path)
+        self.page_cache = OrderedDict()  # page idx -> RoamNode
+
+    @classmethod
+    def create(cls, db_path, raw_pages, batch_size=10_000, metadata=None, **kwargs):
+        # Ingest raw_pages into a new database at db_path, replacing an older
+        #   roam_man database but refusing to delete any other file there
+        db_path = Path(db_path)
+        if db_path.exists():
+            if db_path.stat().st_size > 0 and not is_store_file(db_path):
+                raise ValueError(
+                    f"{db_path} exists and isn't a roam_man database, not replacing it"
+                )
+            db_path.unlink()
+        store = cls(db_path, **kwargs)
+        store.conn.executescript(SCHEMA)
+        store.ingest(raw_pages, batch_size)
+        meta = {"schema_version": SQLITE_SCHEMA_VERSION, **(metadata or {})}
+        with store.conn:
+            store.conn.executemany(
+                "INSERT INTO meta VALUES (?, ?)",
+                [(k, None if v is None else str(v)) for k, v in meta.items()],
+            )
+        return store
+
+    @classmethod
+    def open(cls, db_path, **kwargs):
+        if not Path(db_path).exists():
+            raise FileNotFoundError(f"No database found at {db_path}")
+        store = cls(db_path, **kwargs)
+        version = store.get_meta("schema_version")
+        if version != str(SQLITE_SCHEMA_VERSION):
+            store.close()
+            raise ValueError(f"Database schema {version} != {SQLITE_SCHEMA_VERSION}")
+        return store
+
+    def close(self):
+        self.conn.close()
+
+    def get_meta(self, key):
+        try:
+            row = self.conn.execute(
+                "SELECT value FROM meta WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.OperationalError:
+            return None  # not a roam_man database
+        return None if row is None else row[0]
+
+    # ---- Ingest ---- #
+
+    def ingest(self, raw_pages, batch_size=10_000):
+        # Streams raw_pages in, flushing rows every batch_size blocks, all in
+        #   one transaction
+        block_rows, ref_rows, page_rows = [], [], []
+        next_id = 0
+        with self.conn:
+            for page_idx, page in enumerate(raw_pages):
+                root_id = next_id
+                stack = [(page, None, 0)]
+                while stack:
+                    block, parent_id, depth = stack.pop()
+                    if not isinstance(block, dict):
+                        raise Exception("RoamNode expects a non-null dict as input")
+                    block_id = next_id
+                    next_id += 1
+                    block_rows.append(
+                        (
+                            block_id,
+                            block.get("uid"),
+                            parent_id,
+                            page_idx,
+                            depth,
+                            block.get("title"),
+                            block.get("string"),
+                            block.get("create-time"),
+                            block.get("edit-time"),
+                        )
+                    )
+                    refs = [
+                        r["uid"]
+                        for r in block.get("refs", [])
+                        if r["uid"] not in gu.UID_BLACKLIST
+                    ]
+                    ref_rows.extend(
+                        (block_id, pos, ref) for pos, ref in enumerate(refs)
+                    )
+                    stack.extend(
+                        (ch, block_id, depth + 1)
+                        for ch in reversed(block.get("children", []))
+                    )
+                page_rows.append(
+                    (
+                        page_idx,
+                        page.get("uid"),
+                        page.get("title"),
+                        root_id,
+                        next_id - root_id,
+                    )
+                )
+                if len(block_rows) >= batch_size:
+                    self.flush(block_rows, ref_rows, page_rows)
+            self.flush(block_rows, ref_rows, page_rows)
+
+    def flush(self, block_rows, ref_rows, page_rows):
+        self.conn.executemany(
+            "INSERT INTO blocks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", block_rows
+        )
+        self.conn.executemany("INSERT INTO refs VALUES (?, ?, ?)", ref_rows)
+        self.conn.executemany("INSERT INTO pages VALUES (?, ?, ?, ?, ?)", page_rows)
+        for rows in [block_rows, ref_rows, page_rows]:
+            rows.clear()
+
+    # ---- Pages ---- #
+
+    @property
+    def num_pages(self):
+        return self.conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    @property
+    def num_blocks(self):
+        return self.conn.execute("SELECT COUNT(*) FROM blocks").fetchone()[0]
+
+    def page_range(self, page_idx):
+        row = self.conn.execute(
+            "SELECT block_id, num_blocks FROM pages WHERE idx = ?", (page_idx,)
+        ).fetchone()
+        if row is None:
+            raise IndexError(page_idx)
+        return row[0], row[0] + row[1]
+
+    def get_raw_page(self, page_idx):
+        # Rebuild an export-style dict for the page from its id range
+        start, end = self.page_range(page_idx)
+        refs = {}
+        for block_id, target in self.conn.execute(
+            "SELECT block_id, target FROM refs WHERE block_id >= ? AND block_id < ?"
+            " ORDER BY block_id, pos",
+            (start, end),
+        ):
+            refs.setdefault(block_id, []).append({"uid": target})
+
+        blocks = {}
+        for row in self.conn.execute(
+            f"SELECT {BLOCK_COLUMNS} FROM blocks WHERE id >= ? AND id < ? ORDER BY id",
+            (start, end),
+        ):
+            block_id, uid, parent, _, title, string, create_time, edit_time = row
+            block = {}
+            for key, value in [
+                ("title", title),
+                ("string", string),
+                ("uid", uid),
+                ("create-time", create_time),
+                ("edit-time", edit_time),
+            ]:
+                if value is not None:
+                    block[key] = value
+            if block_id in refs:
+                block["refs"] = refs[block_id]
+            blocks[block_id] = block
+            if parent is not None:
+                blocks[parent].setdefault("children", []).append(block)
+        return blocks[start]
+
+    def page_node(self, page_idx):
+        node = self.page_cache.get(page_idx)
+        if node is not None:
+            self.page_cache.move_to_end(page_idx)
+            return node
+        node = gu.RoamNode(self.get_raw_page(page_idx), keep_raw=False)
+        self.page_cache[page_idx] = node
+        while len(self.page_cache) > self.max_pages:
+            self.page_cache.popitem(last=False)
+        return node
+
+    def page_title(self, page_idx):
+        row = self.conn.execute(
+            "SELECT title FROM pages WHERE idx = ?", (page_idx,)
+        ).fetchone()
+        if row is None:
+            raise IndexError(page_idx)
+        return row[0]
+
+    def page_idx_of_title(self, title):
+        # Last page with the title wins, like building a {title: node} dict
+        row = self.conn.execute(
+            "SELECT idx FROM pages WHERE title = ? ORDER BY idx DESC LIMIT 1", (title,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(title)
+        return row[0]
+
+    # ---- Blocks ---- #
+
+    def block_location(self, uid):
+        # (block id, page idx) of the last block with uid
+        row = self.conn.execute(
+            "SELECT id, page_idx FROM blocks WHERE uid = ? ORDER BY id DESC LIMIT 1",
+            (uid,),
+        ).fetchone()
+        if row is None:
+            raise KeyError(uid)
+        return row
+
+    def block_node(self, block_id):
+        # The node for block_id inside its (cached) page tree
+        page_idx = self.conn.execute(
+            "SELECT page_idx FROM blocks WHERE id = ?", (block_id,)
+        ).fetchone()[0]
+        start, _ = self.page_range(page_idx)
+        page_node = self.page_node(page_idx)
+        return page_node._subtree[block_id - start]
+
+    def iter_block_texts(self):
+        # Block text (or page title) in id order, for the search index
+        for (text,) in self.conn.execute(
+            "SELECT COALESCE(string, title) FROM blocks ORDER BY id"
+        ):
+            yield text
+
+    def block_time_columns(self):
+        # (create_time, edit_time, page_starts) int64 arrays in id order for
+        #   the time index, -1 for blocks without a time
+        rows = self.conn.execute(
+            "SELECT COALESCE(create_time, -1), COALESCE(edit_time, -1)"
+            " FROM blocks ORDER BY id"
+        )
+        n = self.num_blocks
+        times = np.fromiter(chain.from_iterable(rows), np.int64, count=2 * n)
+        page_starts = np.fromiter(
+            chain.from_iterable(
+                self.conn.execute("SELECT block_id FROM pages ORDER BY idx")
+            ),
+            np.int64,
+        )
+        return times[0::2], times[1::2], page_starts
+
+    def page_ref_edges(self):
+        # (source page idxs, target page idxs) int64 arrays, one per distinct
+        #   pair of pages where a block on the first references the second
+        #   or a block on it
+        rows = self.conn.execute(
+            "SELECT DISTINCT b.page_idx, t.page_idx FROM refs r"
+            " JOIN blocks b ON b.id = r.block_id JOIN blocks t ON t.uid = r.target"
+        )
+        edges = np.fromiter(chain.from_iterable(rows), np.int64)
+        return edges[0::2], edges[1::2]
+
+    def iter_page_uids_and_titles(self):
+        yield from self.conn.execute("SELECT uid, title FROM pages ORDER BY idx")
+
+
+# ---------------- RoamGraph Views ---------------- #
+
+# Read-only stand-ins for the RoamGraph dicts and lists, answered with
+#   indexed queries so nothing is loaded up front.
+
+
+class SqlitePages(Mapping):
+    # title -> page node
+    def __init__(self, store):
+        self.store = store
+
+    def __getitem__(self, title):
+        return self.store.page_node(self.store.page_idx_of_title(title))
+
+    def __iter__(self):
+        for (title,) in self.store.conn.execute("SELECT title FROM pages ORDER BY idx"):
+            yield title
+
+    def __len__(self):
+        return self.store.num_pages
+
+
+class SqliteUidToTitle(Mapping):
+    # page uid -> title
+    def __init__(self, store):
+        self.store = store
+
+    def __getitem__(self, uid):
+        row = self.store.conn.execute(
+            "SELECT title FROM pages WHERE uid = ? ORDER BY idx DESC LIMIT 1", (uid,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(uid)
+        return row[0]
+
+    def __iter__(self):
+        for uid, _ in self.store.iter_page_uids_and_titles():
+            yield uid
+
+    def __len__(self):
+        return self.store.num_pages
+
+
+class SqlitePageSizes(Mapping):
+    # page uid -> number of blocks incl. the page
+    def __init__(self, store):
+        self.store = store
+
+    def __getitem__(self, uid):
+        row = self.store.conn.execute(
+            "SELECT num_blocks FROM pages WHERE uid = ? ORDER BY idx DESC LIMIT 1",
+            (uid,),
+        ).fetchone()
+        if row is None:
+            raise KeyError(uid)
+        return row[0]
+
+    def __iter__(self):
+        return iter(SqliteUidToTitle(self.store))
+
+    def __len__(self):
+        return self.store.num_pages
+
+
+class SqliteBlockIndex(Mapping):
+    # uid -> node, for blocks at any depth
+    def __init__(self, store):
+        self.store = store
+
+    def __getitem__(self, uid):
+        block_id, _ = self.store.block_location(uid)
+        return self.store.block_node(block_id)
+
+    def __iter__(self):
+        for (uid,) in self.store.conn.execute(
+            "SELECT uid FROM blocks WHERE uid IS NOT NULL ORDER BY id"
+        ):
+            yield uid
+
+    def __len__(self):
+        return self.store.num_blocks
+
+
+class SqlitePageList(Sequence):
+    # page idx -> get(page idx), e.g. titles or raw pages
+    def __init__(self, store, get):
+        self.store = store
+        self.get = get
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(idx)
+        return self.get(idx)
+
+    def __len__(self):
+        return self.store.num_pages
+
+    def __eq__(self, other):
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return list(self) == list(other)
+
+
+class SqliteBacklinks:
+    # BacklinkIndex-compatible reads answered from the refs target index
+    def __init__(self, store):
+        self.store = store
+
+    def get_backlinks(self, uid):
+        return [
+            source
+            for (source,) in self.store.conn.execute(
+                "SELECT b.uid FROM refs r JOIN blocks b ON b.id = r.block_id"
+                " WHERE r.target = ? ORDER BY r.block_id, r.pos",
+                (uid,),
+            )
+        ]
+
+    def get_linking_pages(self, uid):
+        return [
+            page_uid
+            for (page_uid,) in self.store.conn.execute(
+                "SELECT p.uid FROM refs r JOIN blocks b ON b.id = r.block_id"
+                " JOIN pages p ON p.idx = b.page_idx WHERE r.target = ?"
+                " GROUP BY p.idx ORDER BY p.idx",
+                (uid,),
+            )
+        ]
+
+    def __contains__(self, uid):
+        row = self.store.conn.execute(
+            "SELECT 1 FROM refs WHERE target = ? LIMIT 1", (uid,)
+        ).fetchone()
+        return row is not None
+
+    def __len__(self):
+        return self.store.conn.execute(
+            "SELECT COUNT(DISTINCT target) FROM refs"
+        ).fetchone()[0]
@@ -0,0 +1,174 @@
+import json
+from array import array
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+# ---------------- Incremental JSON Array Reading ---------------- #
+
+
+class _ArrayReader:
+    # Holds a sliding text window over the file and tracks the byte offset
+    #   of buf[pos] so that elements can be located on disk later.
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.counted_to = 0  # chars of buf already added to pos_byte_offset
+        self.pos_byte_offset = 0
+        self.eof = False
+
+    def read_more(self, min_size=None):
+        if self.eof:
+            return False
+        # Drop the consumed prefix before growing the window
+        self.advance_bytes()
+        self.buf = self.buf[self.pos :]
+        self.counted_to = 0
+        self.pos = 0
+
+        chunk = self.f.read(max(self.chunk_size, min_size or 0))
+        if chunk == "":
+            self.eof = True
+            return False
+        self.buf += chunk
+        return True
+
+    def advance_bytes(self):
+        seg = self.buf[self.counted_to : self.pos]
+        self.pos_byte_offset += len(seg.encode("utf-8"))
+        self.counted_to = self.pos
+
+    def peek(self):
+        # Return the next non-whitespace char without consuming it
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.read_more():
+                return None
+
+    def expect(self, chars):
+        c = self.peek()
+        if c is None or c not in chars:
+            raise ValueError(
+                f"Expected one of {chars!r} at byte {self.current_byte_offset()},"
+                f" found {c!r}"
+            )
+        self.pos += 1
+        return c
+
+    def current_byte_offset(self):
+        self.advance_bytes()
+        return self.pos_byte_offset
+
+    def decode_elem(self):
+        self.peek()  # raw_decode does not skip leading whitespace
+        start_byte = self.current_byte_offset()
+        grow = self.chunk_size
+        while True:
+            try:
+                elem, end = _DECODER.raw_decode(self.buf, self.pos)
+                # An elem ending exactly at the window edge may be truncated
+                if end < len(self.buf) or self.eof:
+                    break
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            # Grow geometrically so huge pages don't cost quadratic retries
+            self.read_more(min_size=grow)
+            grow *= 2
+        self.pos = end
+        length = self.current_byte_offset() - start_byte
+        return start_byte, length, elem
+
+
+def iter_json_array(path, chunk_size=1 << 20):
+    """
+    Incrementally decode a file holding a single top-level JSON array.
+
+    Only one element (plus a read window of roughly chunk_size chars) is held in
+    memory at a time, which keeps peak memory flat for multi-GB Roam exports.
+
+    Args:
+        path (str): Path to the JSON file.
+        chunk_size (int): Number of chars to read from the file at a time.
+
+    Yields:
+        tuple: (byte_offset, byte_length, elem) for each array element, where
+            the offsets locate the raw element bytes in the file.
+    """
+    # newline="" keeps \r\n intact so char counts map back to bytes
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        reader = _ArrayReader(f, chunk_size)
+        reader.expect("[")
+        if reader.peek() == "]":
+            return
+        while True:
+            yield reader.decode_elem()
+            if reader.expect(",]") == "]":
+                return
+
+
+# ---------------- Lazy Element Access ---------------- #
+
+
+class JsonArrayIndex:
+    """
+    Read-only sequence over the elements of a JSON array file, backed by the
+    byte offsets collected by iter_json_array.  Elements are re-read and
+    decoded from disk on access instead of being held in memory.
+
+    Elements that are set or appended after the file was indexed (e.g. a
+    re-parsed page) are kept in memory as overrides.
+    """
+
+    def __init__(self, path, offsets=(), lengths=()):
+        self.path = path
+        self.offsets = array("q", offsets)
+        self.lengths = array("q", lengths)
+        self.overrides = {}
+
+    @classmethod
+    def from_file(cls, path):
+        index = cls(path)
+        for offset, length, _ in iter_json_array(path):
+            index.append(offset, length)
+        return index
+
+    def append(self, offset, length):
+        self.offsets.append(offset)
+        self.lengths.append(length)
+
+    def append_elem(self, elem):
+        self.append(-1, -1)
+        self.overrides[len(self) - 1] = elem
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __setitem__(self, idx, elem):
+        self.overrides[range(len(self))[idx]] = elem
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        idx = range(len(self))[idx]
+        if idx in self.overrides:
+            return self.overrides[idx]
+        with open(self.path, "rb") as f:
+            return self.read_elem(f, idx)
+
+    def __iter__(self):
+        with open(self.path, "rb") as f:
+            for idx in range(len(self)):
+                if idx in self.overrides:
+                    yield self.overrides[idx]
+                else:
+                    yield self.read_elem(f, idx)
+
+    def read_elem(self, f, idx):
+        f.seek(self.offsets[idx])
+        return json.loads(f.read(self.lengths[idx]))
@@ -0,0 +1,175 @@
+import datetime
+import json
+import random
+
+from faker import Faker
+
+DAILY_START = datetime.date(2020, 1, 1)
+TIME_START = 1577836800000  # 2020-01-01 in epoch ms
+BLOCK_REF_FRACTION = 0.1  # share of refs pointing at blocks, not pages
+
+# ---------------- Names ---------------- #
+
+
+def ordinal(n):
+    if 11 <= n % 100 <= 13:
+        return f"{n}th"
+    return f"{n}" + {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+
+
+def daily_title(date):
+    # Roam's daily page title, e.g. "September 10th, 2023"
+    return f"{date.strftime('%B')} {ordinal(date.day)}, {date.year}"
+
+
+def daily_uid(date):
+    # DD-MM-YYYY, see validation_utils.is_valid_date
+    return date.strftime("%d-%m-%Y")
+
+
+def block_uid(i):
+    return f"b{i:08x}"
+
+
+# ---------------- Generator ---------------- #
+
+
+class SyntheticGraph:
+    """
+    Seeded generator of Roam-export-shaped pages, the same arguments always
+    give the same export.
+
+    Pages are "topic" pages followed by daily pages (daily_fraction of
+    num_pages, one per day from DAILY_START).  Each page gets a random number
+    of blocks averaging blocks_per_page, attached to uniformly random parents
+    with at most fanout children and max_depth levels below the page, so
+    pages can end up smaller when those limits fill up.  Blocks carry on
+    average ref_density refs, mostly to pages (log-uniformly picked, so a
+    few pages are very popular) written as [[Title]] in the string, the
+    rest to earlier blocks as ((uid)).
+    """
+
+    def __init__(
+        self,
+        num_pages,
+        blocks_per_page=50,
+        max_depth=5,
+        fanout=10,
+        ref_density=0.3,
+        daily_fraction=0.2,
+        seed=0,
+    ):
+        self.num_pages = num_pages
+        self.blocks_per_page = blocks_per_page
+        self.max_depth = max_depth
+        self.fanout = fanout
+        self.ref_density = ref_density
+        self.num_daily = int(num_pages * daily_fraction)
+        self.num_topics = num_pages - self.num_daily
+        self.seed = seed
+
+        fake = Faker()
+        fake.seed_instance(seed)
+        self.vocab = fake.words(nb=500, unique=True)
+
+    @classmethod
+    def for_num_blocks(cls, num_blocks, blocks_per_page=50, **kwargs):
+        # Sized to roughly num_blocks blocks including the pages
+        num_pages = max(1, round(num_blocks / (blocks_per_page + 1)))
+        return cls(num_pages, blocks_per_page=blocks_per_page, **kwargs)
+
+    def page_title(self, j):
+        if j >= self.num_topics:
+            return daily_title(DAILY_START + datetime.timedelta(j - self.num_topics))
+        words = self.vocab
+        return f"{words[j % len(words)].title()} {words[(j * 7 + 3) % len(words)]} {j}"
+
+    def page_uid(self, j):
+        if j >= self.num_topics:
+            return daily_uid(DAILY_START + datetime.timedelta(j - self.num_topics))
+        return f"p{j:08x}"
+
+    def iter_pages(self):
+        rng = random.Random(self.seed)
+        next_block = 0
+        time = TIME_START
+        for j in range(self.num_pages):
+            time += rng.randrange(1, 3_600_000)
+            page = {
+                "title": self.page_title(j),
+                "uid": self.page_uid(j),
+                "create-time": time,
+                "edit-time": time,
+            }
+            open_parents = [(page, 0)]
+            for _ in range(rng.randint(0, 2 * self.blocks_per_page)):
+                if not open_parents:
+                    break
+                k = rng.randrange(len(open_parents))
+                parent, depth = open_parents[k]
+                time += rng.randrange(1, 60_000)
+                block = self.make_block(rng, next_block, time)
+                next_block += 1
+
+                children = parent.setdefault("children", [])
+                children.append(block)
+                if len(children) >= self.fanout:
+                    open_parents[k] = open_parents[-1]
+                    open_parents.pop()
+                if depth + 1 < self.max_depth:
+                    open_parents.append((block, depth + 1))
+            yield page
+
+    def make_block(self, rng, i, time):
+        words = rng.choices(self.vocab, k=rng.randint(2, 15))
+        refs = []
+        num_refs = int(self.ref_density) + (rng.random() < self.ref_density % 1)
+        for _ in range(num_refs):
+            if i > 0 and rng.random() < BLOCK_REF_FRACTION:
+                uid = block_uid(rng.randrange(i))
+                words.insert(rng.randint(0, len(words)), f"(({uid}))")
+            else:
+                j = int(self.num_pages ** rng.random()) - 1
+                uid = self.page_uid(j)
+                words.insert(rng.randint(0, len(words)), f"[[{self.page_title(j)}]]")
+            refs.append({"uid": uid})
+
+        block = {
+            "uid": block_uid(i),
+            "string": " ".join(words),
+            "create-time": time,
+            "edit-time": time + rng.randrange(0, 86_400_000),
+        }
+        if refs:
+            block["refs"] = refs
+        return block
+
+    def write_export(self, path):
+        """
+        Stream the pages to a JSON array file, one page at a time.
+
+        Args:
+            path (str): Output path.
+
+        Returns:
+            int: Number of blocks written, pages included.
+        """
+        num_blocks = 0
+        with open(path, "w") as f:
+            f.write("[")
+            for j, page in enumerate(self.iter_pages()):
+                if j > 0:
+                    f.write(",\n")
+                f.write(json.dumps(page))
+                num_blocks += count_blocks(page)
+            f.write("]")
+        return num_blocks
+
+
+def count_blocks(page):
+    count, stack = 0, [page]
+    while stack:
+        block = stack.pop()
+        count += 1
+        stack.extend(block.get("children", []))
+    return count
@@ -0,0 +1,156 @@
+from array import array
+
+import numpy as np
+
+from roam_man import tree_utils as tu
+
+# Sentinel for blocks without a time, as in the compact columns
+MISSING = -1
+DAY_MS = 24 * 3600 * 1000
+FIELDS = ["create_time", "edit_time"]
+FREQS = {"day": 1, "week": 7}
+COARSE_UNITS = {"Y", "M", "W", "D", "h", "m", "s"}
+
+
+def to_epoch_ms(value, end=False):
+    # Roam times are epoch ms, also accept dates, datetimes and ISO strings.
+    #   With end, a coarser value means its last ms, so end="2024-09-30"
+    #   covers the whole day like get_daily_pages does.
+    if value is None or isinstance(value, (int, np.integer)):
+        return value
+    value = np.datetime64(value)
+    unit = np.datetime_data(value.dtype)[0]
+    if end and unit in COARSE_UNITS:
+        value += np.timedelta64(1, unit)
+        return int(value.astype("datetime64[ms]").astype(np.int64)) - 1
+    return int(value.astype("datetime64[ms]").astype(np.int64))
+
+
+# ---------------- Time Index ---------------- #
+
+
+class TimeIndex:
+    """
+    Block create / edit times sorted for binary-search range queries.
+    Documents are numbered 0..n-1 like SearchIndex's, page by page in
+    pre-order, so page p's blocks are docs page_starts[p] up to
+    page_starts[p + 1].
+
+    Layout, per field ("create_time", "edit_time"):
+        times[field]    int64 epoch ms, ascending, blocks without one left out
+        docs[field]     int32 doc of each time
+    page_starts         int64 doc of each page (its root block)
+
+    Bounds (start, end) are inclusive and optional, epoch ms or anything
+    to_epoch_ms accepts, a date-only end includes that whole day.
+    """
+
+    def __init__(self, times, docs, page_starts, num_docs):
+        self.times = times
+        self.docs = docs
+        self.page_starts = page_starts
+        self.num_docs = num_docs
+
+    @classmethod
+    def from_columns(cls, create_time, edit_time, page_starts):
+        # Columns hold one time per doc, MISSING for none
+        times, docs = {}, {}
+        for field, column in zip(FIELDS, [create_time, edit_time]):
+            column = np.asarray(column, dtype=np.int64)
+            has_time = np.flatnonzero(column != MISSING)
+            order = np.argsort(column[has_time], kind="stable")
+            docs[field] = has_time[order].astype(np.int32)
+            times[field] = column[docs[field]]
+        page_starts = np.asarray(page_starts, dtype=np.int64)
+        return cls(times, docs, page_starts, len(create_time))
+
+    @classmethod
+    def from_compact_graph(cls, store):
+        return cls.from_columns(store.create_time, store.edit_time, store.page_roots)
+
+    @classmethod
+    def from_page_nodes(cls, page_nodes):
+        create_time, edit_time, page_starts = array("q"), array("q"), array("q")
+        for page_node in page_nodes:
+            page_starts.append(len(create_time))
+            for node in tu.iter_subtree(page_node):
+                create_time.append(
+                    MISSING if node.create_time is None else node.create_time
+                )
+                edit_time.append(MISSING if node.edit_time is None else node.edit_time)
+        return cls.from_columns(
+            np.frombuffer(create_time, dtype=np.int64),
+            np.frombuffer(edit_time, dtype=np.int64),
+            np.frombuffer(page_starts, dtype=np.int64),
+        )
+
+    @property
+    def nbytes(self):
+        arrays = [*self.times.values(), *self.docs.values(), self.page_starts]
+        return sum(a.nbytes for a in arrays)
+
+    def bounds(self, field, start=None, end=None):
+        # [lo, hi) positions in times[field] of the times within the bounds
+        times = self.times[field]
+        start, end = to_epoch_ms(start), to_epoch_ms(end, end=True)
+        lo = 0 if start is None else int(np.searchsorted(times, start, "left"))
+        hi = len(times) if end is None else int(np.searchsorted(times, end, "right"))
+        return lo, max(lo, hi)
+
+    def count(self, field, start=None, end=None):
+        lo, hi = self.bounds(field, start, end)
+        return hi - lo
+
+    def docs_between(self, field, start=None, end=None):
+        # Docs timed within the bounds, oldest first (a view, no copy)
+        lo, hi = self.bounds(field, start, end)
+        return self.docs[field][lo:hi]
+
+    def page_of(self, docs):
+        return np.searchsorted(self.page_starts, docs, side="right") - 1
+
+    def histogram(self, field, freq="day", start=None, end=None):
+        """
+        Number of blocks per day or week (weeks start on Monday, UTC).
+
+        Returns:
+            (np.ndarray, np.ndarray): datetime64[D] start of each bin and the
+                int64 counts, every bin from the first time to the last
+                included, empty ones as 0.
+        """
+        if freq not in FREQS:
+            raise ValueError(f"freq must be one of {list(FREQS)}: {freq}")
+        lo, hi = self.bounds(field, start, end)
+        if lo == hi:
+            return np.zeros(0, dtype="datetime64[D]"), np.zeros(0, dtype=np.int64)
+
+        days = self.times[field][lo:hi] // DAY_MS
+        if freq == "week":
+            # Day 0 (1970-01-01) was a Thursday
+            days -= (days + 3) % 7
+        step = FREQS[freq]
+        first = days[0]
+        counts = np.bincount((days - first) // step).astype(np.int64)
+        bins = first + step * np.arange(len(counts), dtype=np.int64)
+        return bins.astype("datetime64[D]"), counts
+
+    def recent_pages(self, field, start=None, end=None, limit=10):
+        # [(page, latest time)] of the pages with a block timed within the
+        #   bounds, most recent first.  Scans back from the latest time in
+        #   doubling chunks, so it only reads as far as limit pages need.
+        lo, hi = self.bounds(field, start, end)
+        docs, times = self.docs[field], self.times[field]
+        result, seen = [], set()
+        chunk = 256
+        while hi > lo and (limit is None or len(result) < limit):
+            begin = max(lo, hi - chunk)
+            pages = self.page_of(docs[begin:hi])[::-1].tolist()
+            for page, t in zip(pages, times[begin:hi][::-1].tolist()):
+                if page not in seen:
+                    seen.add(page)
+                    result.append((page, t))
+                    if limit is not None and len(result) == limit:
+                        break
+            hi = begin
+            chunk *= 2
+        return result
@@ -0,0 +1,21 @@
+# ---------------- Traversal Utils ---------------- #
+
+# Work for RoamNode and anything RoamNode-like (children/parent attributes),
+#   with explicit stacks so that deep outlines don't hit the recursion limit
+
+
+def iter_subtree(node):
+    # Pre-order: node first, then each child subtree in order
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(reversed(node.children))
+
+
+def iter_ancestors(node):
+    # Nearest first, ending with the page
+    node = node.parent
+    while node is not None:
+        yield node
+        node = node.parent
@@ -1,6 +1,8 @@
 import re
 from datetime import datetime
 
+import numpy as np
+
 
 def is_valid_date(date_string: str) -> bool:
     # Define the regex pattern for "DD-MM-YYYY" date format
@@ -15,3 +17,52 @@ def is_valid_date(date_string: str) -> bool:
         except ValueError:
             return False
     return False
+
+
+# Days per month for non-leap years, indexed by month - 1
+_DAYS_IN_MONTH = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+_DIGIT_POSITIONS = [0, 1, 3, 4, 6, 7, 8, 9]
+_DASH_POSITIONS = [2, 5]
+
+
+def classify_dates(date_strings, day_first=True):
+    """
+    Vectorized is_valid_date over many strings at once, also returning the
+    parsed dates.  Strings are compared as fixed-width code point arrays, so
+    there is no per-string regex or strptime call.
+
+    Args:
+        date_strings (iterable): Strings to check (e.g. page uids), None is
+            treated as invalid.
+        day_first (bool): "DD-MM-YYYY" like is_valid_date, or "MM-DD-YYYY"
+            when False.
+
+    Returns:
+        tuple: (boolean mask of valid dates, datetime64[D] array of the parsed
+            dates with NaT where invalid)
+    """
+    strs = np.asarray(list(date_strings), dtype=str).reshape(-1)
+    valid = np.char.str_len(strs) == 10
+
+    # (n, 10) array of code points, shorter strings are zero padded
+    codes = strs.astype("U10").view(np.uint32).reshape(-1, 10).astype(np.int64)
+    digits = codes[:, _DIGIT_POSITIONS] - ord("0")
+    valid &= ((digits >= 0) & (digits <= 9)).all(axis=1)
+    valid &= (codes[:, _DASH_POSITIONS] == ord("-")).all(axis=1)
+
+    first = digits[:, 0] * 10 + digits[:, 1]
+    second = digits[:, 2] * 10 + digits[:, 3]
+    day, month = (first, second) if day_first else (second, first)
+    year = digits[:, 4] * 1000 + digits[:, 5] * 100 + digits[:, 6] * 10 + digits[:, 7]
+
+    valid &= (month >= 1) & (month <= 12) & (year >= 1)
+    is_leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    month_days = _DAYS_IN_MONTH[np.clip(month - 1, 0, 11)] + (is_leap & (month == 2))
+    valid &= (day >= 1) & (day <= month_days)
+
+    dates = np.full(len(strs), np.datetime64("NaT", "D"))
+    months = (year[valid] - 1970) * 12 + (month[valid] - 1)
+    dates[valid] = months.astype("datetime64[M]").astype("datetime64[D]") + (
+        day[valid] - 1
+    )
+    return valid, dates
@@ -0,0 +1,15 @@
+import json
+
+import pytest
+
+from roam_man import roam_graph as gu
+
+
+@pytest.fixture(params=gu.STORAGE_TYPES)
+def graph(request, pages, tmp_path):
+    # The test module's pages loaded with each storage, pages is per module
+    input_path = tmp_path / "export.json"
+    input_path.write_text(json.dumps(pages))
+    return gu.RoamGraph(
+        input_path, storage=request.param, db_path=tmp_path / "graph.sqlite"
+    )
@@ -0,0 +1,93 @@
+import pytest
+
+from roam_man import backlink_index as bi
+from roam_man import roam_graph as gu
+from roam_man import tree_utils as tu
+
+
+@pytest.fixture
+def pages():
+    return [
+        {
+            "title": "Page 1",
+            "uid": "page1",
+            "refs": [{"uid": "tag"}],
+            "children": [
+                {"uid": "b1", "string": "a", "refs": [{"uid": "page2"}]},
+                {
+                    "uid": "b2",
+                    "string": "b",
+                    "children": [
+                        {"uid": "b3", "string": "c", "refs": [{"uid": "page2"}]}
+                    ],
+                },
+            ],
+        },
+        {
+            "title": "Page 2",
+            "uid": "page2",
+            "children": [{"uid": "b4", "string": "d", "refs": [{"uid": "tag"}]}],
+        },
+    ]
+
+
+def test_iter_subtree_and_ancestors(pages):
+    node = gu.RoamNode(pages[0])
+    assert [n.uid for n in tu.iter_subtree(node)] == ["page1", "b1", "b2", "b3"]
+    b3 = node.children[1].children[0]
+    assert [n.uid for n in tu.iter_ancestors(b3)] == ["b2", "page1"]
+
+
+def test_backlink_index(pages):
+    index = bi.BacklinkIndex.from_page_nodes(gu.RoamNode(p) for p in pages)
+    assert sorted(index.get_backlinks("page2")) == ["b1", "b3"]
+    assert sorted(index.get_backlinks("tag")) == ["b4", "page1"]
+    assert sorted(index.get_linking_pages("tag")) == ["page1", "page2"]
+    assert index.get_linking_pages("page2") == ["page1"]
+    assert index.get_backlinks("missing") == []
+    assert "tag" in index and "b1" not in index
+    assert len(index) == 2
+
+
+def test_backlink_index_remove_and_replace(pages):
+    index = bi.BacklinkIndex.from_page_nodes(gu.RoamNode(p) for p in pages)
+
+    index.remove_page("page1")
+    assert "page2" not in index
+    assert index.get_backlinks("tag") == ["b4"]
+    assert "page1" not in index.page_targets
+
+    pages[0]["children"] = [{"uid": "b5", "string": "e", "refs": [{"uid": "new"}]}]
+    index.replace_page(gu.RoamNode(pages[0]))
+    assert index.get_backlinks("new") == ["b5"]
+    assert sorted(index.get_backlinks("tag")) == ["b4", "page1"]
+
+    # Re-adding a page replaces its old entries instead of duplicating them
+    index.add_page(gu.RoamNode(pages[0]))
+    assert index.get_backlinks("new") == ["b5"]
+
+
+def test_backlink_index_matches_full_rebuild(pages):
+    index = bi.BacklinkIndex.from_page_nodes(gu.RoamNode(p) for p in pages)
+    pages[1]["children"].append({"uid": "b6", "string": "f", "refs": [{"uid": "b1"}]})
+    index.replace_page(gu.RoamNode(pages[1]))
+
+    rebuilt = bi.BacklinkIndex.from_page_nodes(gu.RoamNode(p) for p in pages)
+    for target in rebuilt.by_target:
+        assert sorted(index.get_backlinks(target)) == sorted(
+            rebuilt.get_backlinks(target)
+        )
+    assert set(index.by_target) == set(rebuilt.by_target)
+
+
+def test_csr_backlink_index_matches(pages):
+    from roam_man import compact_graph as cg
+
+    index = bi.BacklinkIndex.from_page_nodes(gu.RoamNode(p) for p in pages)
+    store = cg.CompactGraph.from_pages(pages)
+    csr = bi.CsrBacklinkIndex.from_compact_graph(store)
+    for uid in ["page1", "page2", "tag", "b1", "missing"]:
+        assert csr.get_backlinks(uid) == index.get_backlinks(uid)
+        assert csr.get_linking_pages(uid) == index.get_linking_pages(uid)
+        assert (uid in csr) == (uid in index)
+    assert len(csr) == len(index)
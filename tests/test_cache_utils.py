@@ -0,0 +1,110 @@
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+from roam_man import cache_utils as cu
+from roam_man import compact_graph as cg
+from roam_man import stream_utils as su
+
+
+@pytest.fixture
+def pages():
+    return [
+        {"title": "Page 1", "uid": "page1", "children": [{"uid": "b1", "string": "x"}]},
+        {"title": "Page 2", "uid": "page2", "refs": [{"uid": "page1"}]},
+    ]
+
+
+def write_export(path, pages):
+    path.write_text(json.dumps(pages))
+    return path
+
+
+def put(cache, export, pages):
+    raw_index = su.JsonArrayIndex.from_file(export)
+    return cache.put(export, cg.CompactGraph.from_pages(pages), raw_index)
+
+
+def test_cache_put_get(tmp_path, pages):
+    export = write_export(tmp_path / "export.json", pages)
+    cache = cu.GraphCache(tmp_path / "cache")
+    assert cache.get(export) is None
+
+    put(cache, export, pages)
+    checkpoint_path = cache.get(export)
+    assert checkpoint_path is not None
+
+    # A fresh cache object reads the index from disk
+    assert cu.GraphCache(tmp_path / "cache").get(export) == checkpoint_path
+    raw_pages = cache.load_raw_index(checkpoint_path, export)
+    assert list(raw_pages) == pages
+
+
+def test_cache_fast_path_and_hash_fallback(tmp_path, pages):
+    export = write_export(tmp_path / "export.json", pages)
+    cache = cu.GraphCache(tmp_path / "cache")
+    put(cache, export, pages)
+
+    with patch("roam_man.cache_utils.content_hash") as mock_hash:
+        assert cache.get(export) is not None
+        mock_hash.assert_not_called()
+
+    # Same content under a new mtime / path still hits, via the content hash
+    st = os.stat(export)
+    os.utime(export, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    copy = write_export(tmp_path / "copy.json", pages)
+    assert cache.get(export) is not None
+    assert cache.get(copy) == cache.get(export)
+
+    # Changed content misses
+    write_export(export, pages[:1])
+    assert cache.get(export) is None
+
+
+def test_cache_lru_eviction(tmp_path, pages):
+    cache = cu.GraphCache(tmp_path / "cache", max_entries=2)
+    exports = []
+    for i in range(3):
+        extra_page = {"title": f"Page {i}", "uid": f"extra{i}"}
+        exports.append(write_export(tmp_path / f"e{i}.json", pages + [extra_page]))
+        put(cache, exports[-1], pages)
+        # Touch the first export so it's the most recently used
+        assert cache.get(exports[0]) is not None
+
+    assert len(cache.entries) == 2
+    assert cache.get(exports[0]) is not None
+    assert cache.get(exports[1]) is None
+    assert cache.get(exports[2]) is not None
+    assert len([p for p in cache.cache_dir.iterdir() if p.is_dir()]) == 2
+
+
+def test_cache_schema_invalidation(tmp_path, pages):
+    export = write_export(tmp_path / "export.json", pages)
+    put(cu.GraphCache(tmp_path / "cache"), export, pages)
+
+    with patch("roam_man.cache_utils.SCHEMA_VERSION", "new"):
+        cache = cu.GraphCache(tmp_path / "cache")
+        assert cache.entries == {}
+        assert cache.get(export) is None
+    assert list(cache.cache_dir.iterdir()) == [cache.cache_dir / "index.json"]
+
+
+def test_cache_keeps_other_dirs(tmp_path, pages):
+    export = write_export(tmp_path / "export.json", pages)
+    # The user's own files, in the dir passed as cache_dir and in the
+    #   cache's own subdirectory
+    for path in [tmp_path / "project", tmp_path / "roam_man" / "notes"]:
+        path.mkdir(parents=True)
+        (path / "keep.txt").write_text("keep")
+
+    cache = cu.GraphCache(tmp_path)
+    checkpoint_path = put(cache, export, pages)
+    assert checkpoint_path.parent == tmp_path / "roam_man"
+    cache.clear()
+    cu.GraphCache(tmp_path, max_entries=0)
+
+    assert not checkpoint_path.exists()
+    assert (tmp_path / "project" / "keep.txt").read_text() == "keep"
+    assert (tmp_path / "roam_man" / "notes" / "keep.txt").read_text() == "keep"
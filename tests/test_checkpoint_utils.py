@@ -0,0 +1,117 @@
+import json
+
+import numpy as np
+import pytest
+from hypothesis import given, settings, HealthCheck
+from hypothesis import strategies as st
+
+from roam_man import checkpoint_utils as ck
+from roam_man import compact_graph as cg
+from tests.test_roam_graph import nested_roam_dict_st
+
+
+@pytest.fixture
+def store():
+    return cg.CompactGraph.from_pages(
+        [
+            {
+                "title": "Page 1",
+                "uid": "page1",
+                "create-time": 1694303705806,
+                "children": [
+                    {"uid": "b1", "string": "é中", "refs": [{"uid": "page2"}]},
+                ],
+            },
+            {"title": "Page 2", "uid": "page2"},
+        ]
+    )
+
+
+def check_same_store(loaded, store):
+    for name in cg.CompactGraph.COLUMNS:
+        assert np.array_equal(getattr(loaded, name), getattr(store, name)), name
+    assert list(loaded.uids) == list(store.uids)
+    assert list(loaded.strings) == list(store.strings)
+
+
+@pytest.mark.parametrize("mmap_mode", ["r", None])
+def test_checkpoint_round_trip(tmp_path, store, mmap_mode):
+    path = tmp_path / "ckpt"
+    ck.save_checkpoint(store, path, metadata={"input_path": "export.json"})
+    loaded, header = ck.load_checkpoint(path, mmap_mode=mmap_mode)
+
+    check_same_store(loaded, store)
+    assert header["metadata"] == {"input_path": "export.json"}
+    assert header["num_blocks"] == 3
+    assert loaded.page_node(0).children[0].string == "é中"
+    assert loaded.get_raw_block(0) == store.get_raw_block(0)
+
+
+def test_checkpoint_lookup_indexes(tmp_path, store):
+    path = tmp_path / "ckpt"
+    ck.save_checkpoint(store, path)
+    loaded, _ = ck.load_checkpoint(path)
+    # Lookups are answered from the saved arrays, no per-uid dict
+    assert isinstance(loaded.uid_index, cg.StringIndex)
+    assert loaded.get_block_idx("b1") == 1
+    assert loaded.page_idx_of_title("Page 2") == 1
+
+    # Older checkpoints without them rebuild them in memory
+    for name in ck.LOOKUP_INDEXES:
+        (path / f"{name}.npy").unlink()
+    loaded, _ = ck.load_checkpoint(path)
+    assert loaded.get_block_idx("b1") == 1
+    assert loaded.page_idx_of_title("Page 2") == 1
+
+
+def test_checkpoint_overwrite_and_empty(tmp_path, store):
+    path = tmp_path / "ckpt"
+    ck.save_checkpoint(store, path)
+    empty = cg.CompactGraph.from_pages([])
+    ck.save_checkpoint(empty, path)
+    loaded, _ = ck.load_checkpoint(path)
+    assert loaded.num_blocks == 0
+    assert [p.name for p in tmp_path.iterdir()] == ["ckpt"]
+
+
+def test_checkpoint_keeps_other_files(tmp_path, store):
+    # An old pickled checkpoint, and a directory that isn't a checkpoint
+    pickled = tmp_path / "graph.pkl"
+    pickled.write_bytes(b"pickle")
+    other = tmp_path / "project"
+    other.mkdir()
+    (other / "notes.txt").write_text("keep")
+    for path in [pickled, other]:
+        with pytest.raises(ValueError, match="isn't a roam_man checkpoint"):
+            ck.save_checkpoint(store, path)
+    assert pickled.read_bytes() == b"pickle"
+    assert (other / "notes.txt").read_text() == "keep"
+
+    # A failed save leaves no tmp dir behind
+    with pytest.raises(AttributeError):
+        ck.save_checkpoint(object(), tmp_path / "ckpt")
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["graph.pkl", "project"]
+
+
+def test_checkpoint_version_mismatch(tmp_path, store):
+    path = tmp_path / "ckpt"
+    ck.save_checkpoint(store, path)
+    header = json.loads((path / ck.HEADER_FILE).read_text())
+    header["version"] = ck.CHECKPOINT_VERSION + 1
+    (path / ck.HEADER_FILE).write_text(json.dumps(header))
+
+    with pytest.raises(ValueError, match="version"):
+        ck.load_checkpoint(path)
+    with pytest.raises(FileNotFoundError):
+        ck.load_checkpoint(tmp_path / "missing")
+
+
+@settings(suppress_health_check=[HealthCheck.function_scoped_fixture])
+@given(data=st.lists(nested_roam_dict_st(), min_size=1, max_size=5))
+def test_checkpoint_round_trip_hypothesis(tmp_path, data):
+    store = cg.CompactGraph.from_pages(data)
+    ck.save_checkpoint(store, tmp_path / "ckpt")
+    loaded, _ = ck.load_checkpoint(tmp_path / "ckpt")
+    check_same_store(loaded, store)
+    for idx in range(store.num_pages):
+        assert cg.RawPageView(loaded)[idx] == cg.RawPageView(store)[idx]
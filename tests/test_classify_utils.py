@@ -0,0 +1,140 @@
+import numpy as np
+import pytest
+from hypothesis import given
+from hypothesis import strategies as st
+
+from roam_man import classify_utils as clu
+from roam_man import roam_graph as gu
+from roam_man import validation_utils as vu
+
+
+@pytest.fixture
+def page_nodes():
+    pages = [
+        {"title": "September 10th, 2023", "uid": "10-09-2023"},
+        {"title": "Paper | notes", "uid": "p1", "refs": [{"uid": "t1"}]},
+        {"title": "Paper | more", "uid": "p2", "refs": [{"uid": "t1"}]},
+        {"title": "Bare | bar", "uid": "p3"},
+        {"title": "a/b", "uid": "p4", "children": [{"uid": "c1", "string": "x"}]},
+        {"title": "Topic", "uid": "t1"},
+    ]
+    return {p["title"]: gu.RoamNode(p) for p in pages}
+
+
+@pytest.fixture
+def uid_to_title(page_nodes):
+    return {node.uid: title for title, node in page_nodes.items()}
+
+
+def legacy_title_sets(page_nodes, uid_to_title):
+    # The original per-page if/elif classification
+    title_sets = {
+        "daily_pages": set(),
+        "bars": set(),
+        "backslashes": set(),
+        "with_ref": {},
+        "other": set(),
+    }
+    for title, node in page_nodes.items():
+        if vu.is_valid_date(node.uid):
+            title_sets["daily_pages"].add(title)
+        elif "|" in title:
+            title_sets["bars"].add(title)
+            if len(node.refs) > 0:
+                first_ref_title = uid_to_title[node.refs[0]]
+                title_sets["with_ref"].setdefault(first_ref_title, set()).add(title)
+        elif "/" in title:
+            title_sets["backslashes"].add(title)
+        else:
+            title_sets["other"].add(title)
+    return title_sets
+
+
+def test_default_classifier(page_nodes, uid_to_title):
+    title_sets = clu.default_title_classifier().classify(page_nodes, uid_to_title)
+    assert title_sets == legacy_title_sets(page_nodes, uid_to_title)
+    assert title_sets["with_ref"] == {"Topic": {"Paper | notes", "Paper | more"}}
+
+
+@pytest.mark.parametrize("batch_size,workers", [(1, 1), (2, 1), (4, 2)])
+def test_batched_and_parallel(page_nodes, uid_to_title, batch_size, workers):
+    classifier = clu.default_title_classifier()
+    assert classifier.classify(
+        page_nodes, uid_to_title, batch_size=batch_size, workers=workers
+    ) == classifier.classify(page_nodes, uid_to_title)
+
+
+def test_custom_rules(page_nodes, uid_to_title):
+    classifier = clu.TitleClassifier()
+    classifier.add_rule("daily", mask=lambda f: f.is_daily)
+    classifier.add_rule(
+        "by_year",
+        key=lambda p: (
+            int(p.date.astype("datetime64[Y]").astype(int) + 1970)
+            if p.is_daily
+            else None
+        ),
+    )
+    classifier.add_rule("has_children", predicate=lambda p: p.num_children > 0)
+
+    @classifier.rule("short", group="length")
+    def short(page):
+        return len(page.title) < 5
+
+    classifier.add_rule("long", group="length")
+    classifier.add_rule("long_with_ref", requires="long", predicate=lambda p: p.refs)
+
+    results = classifier.classify(page_nodes, uid_to_title)
+    assert results["daily"] == {"September 10th, 2023"}
+    assert results["by_year"] == {2023: {"September 10th, 2023"}}
+    assert results["has_children"] == {"a/b"}
+    assert results["short"] == {"a/b"}
+    assert results["long"] == set(page_nodes) - {"a/b"}
+    assert results["long_with_ref"] == {"Paper | notes", "Paper | more"}
+
+
+def test_rule_errors():
+    classifier = clu.TitleClassifier().add_rule("a")
+    with pytest.raises(ValueError):
+        classifier.add_rule("a")
+    with pytest.raises(ValueError):
+        classifier.add_rule("b", predicate=bool, mask=np.ones)
+    with pytest.raises(ValueError):
+        classifier.add_rule("c", requires="missing")
+
+
+def test_features_are_shared(page_nodes, uid_to_title, monkeypatch):
+    calls = []
+    classify_dates = vu.classify_dates
+    monkeypatch.setattr(
+        vu, "classify_dates", lambda uids: calls.append(1) or classify_dates(uids)
+    )
+    classifier = clu.TitleClassifier()
+    for i in range(10):
+        classifier.add_rule(f"daily_{i}", predicate=lambda p: p.is_daily)
+    results = classifier.classify(page_nodes, uid_to_title)
+    assert len(calls) == 1
+    assert all(titles == {"September 10th, 2023"} for titles in results.values())
+
+
+@given(
+    st.lists(
+        st.tuples(
+            st.sampled_from(["a|b", "a/b", "x", "01-01-2020", "31-02-2020", "p|/"]),
+            st.booleans(),
+        ),
+        max_size=20,
+    )
+)
+def test_default_matches_legacy(specs):
+    page_nodes = {}
+    for i, (title_part, has_ref) in enumerate(specs):
+        uid = title_part if "-" in title_part else f"uid{i}"
+        raw = {"title": f"{title_part} {i}", "uid": uid}
+        if has_ref and page_nodes:
+            raw["refs"] = [{"uid": next(iter(page_nodes.values())).uid}]
+        page_nodes[raw["title"]] = gu.RoamNode(raw)
+    uid_to_title = {node.uid: title for title, node in page_nodes.items()}
+    assert clu.default_title_classifier().classify(
+        page_nodes, uid_to_title, batch_size=3
+    ) == legacy_title_sets(page_nodes, uid_to_title)
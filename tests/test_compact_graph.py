@@ -0,0 +1,172 @@
+import numpy as np
+import pytest
+from hypothesis import given
+from hypothesis import strategies as st
+
+from roam_man import compact_graph as cg
+from roam_man import roam_graph as gu
+from roam_man import tree_utils as tu
+from roam_man import process_utils as pu
+from tests.test_roam_graph import nested_roam_dict_st
+
+
+@pytest.fixture
+def pages():
+    return [
+        {
+            "title": "Page 1",
+            "uid": "page1",
+            "create-time": 1694303705806,
+            "refs": [{"uid": "page2"}, {"uid": "KVGudD7AP"}],
+            "children": [
+                {
+                    "uid": "b1",
+                    "string": "first",
+                    "edit-time": 1694303705807,
+                    "refs": [{"uid": "ref1"}],
+                    "children": [
+                        {"uid": "b2", "string": "nested", "refs": [{"uid": "ref2"}]}
+                    ],
+                },
+                {"uid": "b3", "string": "second"},
+            ],
+        },
+        {"title": "Page 2 | bar", "uid": "page2", "refs": [{"uid": "page1"}]},
+        {"title": "Päge ✓", "uid": "page3", "string": "unicode é中"},
+    ]
+
+
+def check_view_matches_node(view, node):
+    stack = [(view, node)]
+    while stack:
+        view, node = stack.pop()
+        for attr in ["uid", "title", "string", "create_time", "edit_time", "depth"]:
+            assert getattr(view, attr) == getattr(node, attr), attr
+        assert view.refs == node.refs
+        assert view.recursive_refs == node.recursive_refs
+        assert len(view.children) == len(node.children)
+        for ch_view, ch_node in zip(view.children, node.children):
+            assert ch_view.parent == view
+            stack.append((ch_view, ch_node))
+
+
+def test_string_table():
+    strings = ["a", "", "é中✓", "longer string"]
+    table = cg.StringTable.from_strings(strings)
+    assert len(table) == len(strings)
+    assert list(table) == strings
+    assert len(cg.StringTable.from_strings([])) == 0
+
+
+utf8_text = st.text(st.characters(blacklist_categories=["Cs"]))
+
+
+@given(st.lists(utf8_text, unique=True), utf8_text)
+def test_string_index(strings, probe):
+    table = cg.StringTable.from_strings(strings)
+    index = cg.StringIndex.from_table(table)
+    assert len(index) == len(strings)
+    for i, s in enumerate(strings):
+        assert index[s] == i and s in index
+    assert index.get(probe, -1) == (strings.index(probe) if probe in strings else -1)
+    if probe not in strings:
+        with pytest.raises(KeyError):
+            index[probe]
+
+
+@given(st.lists(utf8_text, min_size=1), utf8_text)
+def test_page_title_lookup(titles, probe):
+    graph = cg.CompactGraph.from_pages(
+        [{"title": t, "uid": f"u{i}"} for i, t in enumerate(titles)]
+    )
+    expected = {t: i for i, t in enumerate(titles)}  # duplicates: last wins
+    pages = cg.CompactPages(graph)
+    for title, i in expected.items():
+        assert graph.page_idx_of_title(title) == i
+        assert pages[title].uid == f"u{i}"
+    assert pages._pages is None  # lookups alone don't build the dict
+    assert (probe in pages) == (probe in expected)
+    assert list(pages) == list(expected)
+    assert cg.CompactPageTitles(graph) == titles
+    assert dict(cg.CompactUidToTitle(graph)) == {
+        f"u{i}": t for i, t in enumerate(titles)
+    }
+
+
+def test_compact_graph_layout(pages):
+    graph = cg.CompactGraph.from_pages(pages)
+    assert graph.num_pages == 3
+    assert graph.num_blocks == 6
+    # Pre-order: page1, b1, b2, b3, page2, page3
+    assert [graph.get_uid(i) for i in range(6)] == [
+        "page1",
+        "b1",
+        "b2",
+        "b3",
+        "page2",
+        "page3",
+    ]
+    assert graph.parent.tolist() == [-1, 0, 1, 0, -1, -1]
+    assert graph.subtree_end.tolist() == [4, 3, 3, 4, 5, 6]
+    assert graph.page_roots.tolist() == [0, 4, 5]
+    assert graph.get_children(0) == [1, 3]
+    assert graph.page_titles() == ["Page 1", "Page 2 | bar", "Päge ✓"]
+    # Ref targets share the uid id space with blocks
+    assert graph.uid_id[4] in graph.ref_targets
+    assert graph.create_time.dtype == np.int64
+
+
+def test_compact_views_match_nodes(pages):
+    graph = cg.CompactGraph.from_pages(pages)
+    for i, page in enumerate(pages):
+        view = graph.page_node(i)
+        node = gu.RoamNode(page)
+        check_view_matches_node(view, node)
+        assert repr(view) == repr(node)
+        assert gu.roam_data_to_full_str(view) == gu.roam_data_to_full_str(node)
+    assert graph.page_node(0).raw_data is None
+
+
+def test_compact_from_page_nodes(pages):
+    from_nodes = cg.CompactGraph.from_page_nodes(gu.RoamNode(p) for p in pages)
+    from_pages = cg.CompactGraph.from_pages(pages)
+    for name in cg.CompactGraph.COLUMNS:
+        assert np.array_equal(getattr(from_nodes, name), getattr(from_pages, name))
+
+
+def test_compact_title_sets(pages):
+    graph = cg.CompactGraph.from_pages(pages)
+    page_views = {view.title: view for view in map(graph.page_node, range(3))}
+    page_nodes = {p["title"]: gu.RoamNode(p) for p in pages}
+    uid_to_title = {p["uid"]: p["title"] for p in pages}
+    assert pu.page_node_list_to_title_sets(
+        page_views, uid_to_title
+    ) == pu.page_node_list_to_title_sets(page_nodes, uid_to_title)
+
+
+def test_compact_node_invalid_json():
+    with pytest.raises(Exception, match="RoamNode expects a non-null dict as input"):
+        cg.CompactGraph.from_pages([None])
+
+
+@given(
+    data=st.lists(
+        nested_roam_dict_st(), min_size=1, max_size=10, unique_by=lambda x: x["title"]
+    )
+)
+def test_compact_views_match_nodes_hypothesis(data):
+    graph = cg.CompactGraph.from_pages(data)
+    raw_pages = list(graph.iter_raw_pages())
+    assert raw_pages == [graph.get_raw_block(root) for root in graph.page_roots]
+
+    # Nodes built straight from the columns, raw data read from data lazily
+    built = list(gu.RoamNode.iter_from_store(graph, raw_pages=data))
+    for built_node, page in zip(built, data):
+        check_view_matches_node(built_node, gu.RoamNode(page))
+        for node in tu.iter_subtree(built_node):
+            assert node.raw_data["uid"] == node.uid
+    assert [node.raw_data for node in built] == data
+    for i, page in enumerate(data):
+        view, node = graph.page_node(i), gu.RoamNode(page)
+        check_view_matches_node(view, node)
+        assert repr(view) == repr(node)
@@ -0,0 +1,77 @@
+import copy
+
+import pytest
+
+from roam_man import diff_utils as du
+from roam_man import roam_graph as gu
+
+
+@pytest.fixture
+def page():
+    return {
+        "title": "Page 1",
+        "uid": "page1",
+        "edit-time": 1,
+        "children": [
+            {"uid": "b1", "string": "a", "edit-time": 1},
+            {
+                "uid": "b2",
+                "string": "b",
+                "edit-time": 1,
+                "children": [{"uid": "b3", "string": "c", "edit-time": 1}],
+            },
+        ],
+    }
+
+
+def test_iter_raw_blocks(page):
+    assert [(b["uid"], parent) for b, parent in du.iter_raw_blocks(page)] == [
+        ("page1", None),
+        ("b1", "page1"),
+        ("b2", "page1"),
+        ("b3", "b2"),
+    ]
+
+
+def test_fingerprints(page):
+    fingerprint = du.raw_page_fingerprint(page)
+    assert du.page_node_fingerprint(gu.RoamNode(page)) == fingerprint
+
+    edited = copy.deepcopy(page)
+    edited["children"][1]["children"][0]["edit-time"] = 2
+    assert du.raw_page_fingerprint(edited) != fingerprint
+
+    moved = copy.deepcopy(page)
+    moved["children"][1]["children"].append(moved["children"].pop(0))
+    assert du.raw_page_fingerprint(moved) != fingerprint
+
+
+def test_changeset_block_diff(page):
+    old_node = gu.RoamNode(page)
+    new_page = copy.deepcopy(page)
+    new_page["children"][0]["edit-time"] = 2  # b1 edited
+    new_page["children"][1]["children"] = [{"uid": "b4", "string": "d"}]  # b3 -> b4
+
+    changeset = du.GraphChangeset()
+    assert not changeset
+    changeset.record_changed_page(old_node, new_page)
+    changeset.diff_blocks()
+    assert changeset.changed_pages == ["Page 1"]
+    assert changeset.added_blocks == ["b4"]
+    assert changeset.removed_blocks == ["b3"]
+    assert changeset.changed_blocks == ["b1"]
+    assert changeset
+
+
+def test_changeset_block_moved_between_pages(page):
+    other = {"title": "Page 2", "uid": "page2", "children": []}
+    new_page, new_other = copy.deepcopy(page), copy.deepcopy(other)
+    new_other["children"].append(new_page["children"].pop(0))  # b1 -> Page 2
+
+    changeset = du.GraphChangeset()
+    changeset.record_changed_page(gu.RoamNode(page), new_page)
+    changeset.record_changed_page(gu.RoamNode(other), new_other)
+    changeset.diff_blocks()
+    assert changeset.added_blocks == []
+    assert changeset.removed_blocks == []
+    assert changeset.changed_blocks == ["b1"]
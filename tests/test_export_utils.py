@@ -0,0 +1,148 @@
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from roam_man import compact_graph as cg
+from roam_man import export_utils as eu
+from roam_man import roam_graph as gu
+from roam_man import tree_utils as tu
+from tests.test_roam_graph import nested_roam_dict_st
+
+
+@pytest.fixture
+def pages():
+    return [
+        {
+            "title": "Page 1",
+            "uid": "p1",
+            "create-time": 5,
+            "children": [
+                {
+                    "uid": "b1",
+                    "string": "héllo",
+                    "edit-time": 7,
+                    "refs": [{"uid": "p2"}, {"uid": "elsewhere"}],
+                    "children": [{"uid": "b2", "string": "deep"}],
+                },
+                {"string": "no uid"},
+            ],
+        },
+        {"title": "Page 2", "uid": "p2", "refs": [{"uid": "b1"}]},
+        {"title": "Empty", "uid": "e"},
+    ]
+
+
+def expected_rows(pages):
+    # Export tables built the slow way, from RoamNode trees
+    blocks, refs = [], []
+    for page in pages:
+        page_node = gu.RoamNode(page)
+        for node in tu.iter_subtree(page_node):
+            blocks.append(
+                {
+                    "uid": node.uid,
+                    "parent_uid": None if node.parent is None else node.parent.uid,
+                    "page_uid": page_node.uid,
+                    "depth": node.depth,
+                    "title": node.title,
+                    "string": node.string,
+                    "create_time": -1 if node.create_time is None else node.create_time,
+                    "edit_time": -1 if node.edit_time is None else node.edit_time,
+                }
+            )
+            refs.extend((node.uid, ref, len(blocks) - 1) for ref in node.refs)
+    return blocks, refs
+
+
+def npy_column(table, name):
+    values = table[name]
+    if isinstance(values, cg.StringTable):
+        nulls = table[f"{name}.null"]
+        return [None if null else s for s, null in zip(values, nulls)]
+    return values.tolist()
+
+
+def check_npy_export(pages, out_dir, chunk_size):
+    eu.export_graph(
+        cg.CompactGraph.from_pages(pages), out_dir, format="npy", chunk_size=chunk_size
+    )
+    blocks, refs = expected_rows(pages)
+
+    table = eu.load_npy_table(out_dir / "blocks")
+    for name in eu.TABLES["blocks"]:
+        assert npy_column(table, name) == [row[name] for row in blocks], name
+
+    table = eu.load_npy_table(out_dir / "refs")
+    assert (
+        list(
+            zip(
+                *(
+                    npy_column(table, n)
+                    for n in ["source_uid", "target_uid", "source_idx"]
+                )
+            )
+        )
+        == refs
+    )
+
+    table = eu.load_npy_table(out_dir / "pages")
+    assert npy_column(table, "uid") == [p.get("uid") for p in pages]
+    assert npy_column(table, "title") == [p["title"] for p in pages]
+    assert sum(npy_column(table, "num_blocks")) == len(blocks)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 1000])
+def test_export_npy(tmp_path, pages, chunk_size):
+    check_npy_export(pages, tmp_path, chunk_size)
+    table = eu.load_npy_table(tmp_path / "blocks")
+    assert isinstance(table["depth"], np.memmap)
+
+
+def test_export_empty_graph(tmp_path):
+    check_npy_export([], tmp_path, 10)
+
+
+@settings(deadline=None, max_examples=25)
+@given(st.lists(nested_roam_dict_st(), max_size=5, unique_by=lambda p: p["title"]))
+def test_export_npy_hypothesis(tmp_path_factory, data):
+    check_npy_export(data, tmp_path_factory.mktemp("export"), 3)
+
+
+def test_export_format_errors(tmp_path, pages, monkeypatch):
+    store = cg.CompactGraph.from_pages(pages)
+    with pytest.raises(ValueError):
+        eu.export_graph(store, tmp_path, format="csv")
+    monkeypatch.setattr(eu, "pa", None)
+    with pytest.raises(ImportError):
+        eu.export_graph(store, tmp_path, format="parquet")
+    # auto falls back to npy without pyarrow
+    paths = eu.export_graph(store, tmp_path, format="auto")
+    assert paths["blocks"] == tmp_path / "blocks"
+
+
+def test_export_parquet(tmp_path, pages):
+    pq = pytest.importorskip("pyarrow.parquet")
+    eu.export_graph(cg.CompactGraph.from_pages(pages), tmp_path, chunk_size=2)
+    blocks, refs = expected_rows(pages)
+
+    table = pq.read_table(tmp_path / "blocks.parquet").to_pydict()
+    for name in eu.TABLES["blocks"]:
+        # Missing times are nulls in parquet
+        expected = [None if row[name] == -1 else row[name] for row in blocks]
+        assert table[name] == expected, name
+    table = pq.read_table(tmp_path / "refs.parquet").to_pydict()
+    assert list(zip(table["source_uid"], table["target_uid"], table["source_idx"])) == (
+        refs
+    )
+
+
+def test_roam_graph_export_tables(tmp_path, pages):
+    with patch("dr_util.file_utils.load_file", return_value=pages):
+        graph = gu.RoamGraph("fake_path")
+    paths = graph.export_tables(tmp_path, format="npy")
+    assert set(paths) == set(eu.TABLES)
+    table = eu.load_npy_table(paths["blocks"])
+    assert npy_column(table, "uid") == [row["uid"] for row in expected_rows(pages)[0]]
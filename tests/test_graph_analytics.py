@@ -0,0 +1,166 @@
+import math
+
+import numpy as np
+import pytest
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from roam_man import graph_analytics as ga
+
+
+@pytest.fixture
+def pages():
+    return [
+        {
+            "title": "A",
+            "uid": "a",
+            "children": [
+                {"uid": "a1", "refs": [{"uid": "b"}, {"uid": "c1"}]},
+                {"uid": "a2", "refs": [{"uid": "a1"}, {"uid": "b"}]},
+            ],
+        },
+        {"title": "B", "uid": "b", "refs": [{"uid": "c"}]},
+        {
+            "title": "C",
+            "uid": "c",
+            "children": [{"uid": "c1", "refs": [{"uid": "b"}, {"uid": "gone"}]}],
+        },
+        {"title": "D", "uid": "d", "refs": [{"uid": "e"}]},
+        {"title": "E", "uid": "e"},
+        {"title": "F", "uid": "f"},
+    ]
+
+
+edges_st = st.integers(1, 12).flatmap(
+    lambda n: st.tuples(
+        st.just(n),
+        st.lists(st.tuples(st.integers(0, n - 1), st.integers(0, n - 1))),
+    )
+)
+
+
+def make_page_graph(n, edges):
+    return ga.PageGraph.from_edges(
+        [str(i) for i in range(n)], [s for s, _ in edges], [t for _, t in edges]
+    )
+
+
+def naive_pagerank(n, links, damping=0.85, iters=200):
+    rank = [1 / n] * n
+    for _ in range(iters):
+        new = [(1 - damping) / n] * n
+        for p in range(n):
+            targets = links.get(p) or range(n)
+            for q in targets:
+                new[q] += damping * rank[p] / len(targets)
+        rank = new
+    return rank
+
+
+def naive_components(n, edges):
+    neighbors = {p: set() for p in range(n)}
+    for s, t in edges:
+        neighbors[s].add(t)
+        neighbors[t].add(s)
+    seen, groups = set(), []
+    for p in range(n):
+        if p not in seen:
+            stack, group = [p], set()
+            while stack:
+                q = stack.pop()
+                if q not in group:
+                    group.add(q)
+                    stack.extend(neighbors[q])
+            seen |= group
+            groups.append(frozenset(group))
+    return set(groups)
+
+
+def test_page_graph_from_edges():
+    pages = make_page_graph(4, [(0, 2), (0, 1), (0, 2), (1, 1), (3, 0)])
+    assert pages.indptr.tolist() == [0, 2, 2, 2, 3]
+    assert pages.indices.tolist() == [1, 2, 0]
+    assert pages.backlinks(0).tolist() == [3]
+    assert pages.out_degree().tolist() == [2, 0, 0, 1]
+    assert pages.in_degree().tolist() == [1, 1, 1, 0]
+    assert pages.page_idx("3") == 3
+    stats = pages.degree_stats()
+    assert stats["edges"] == 3 and stats["isolated"] == 0
+    assert stats["out"]["max"] == 2 and stats["in"]["zero"] == 1
+
+
+@settings(deadline=None)
+@given(edges_st)
+def test_page_graph_matches_naive(n_edges):
+    n, edges = n_edges
+    pages = make_page_graph(n, edges)
+    links = {}
+    for s, t in edges:
+        if s != t:
+            links.setdefault(s, set()).add(t)
+
+    rank = pages.pagerank()
+    assert rank.sum() == pytest.approx(1.0)
+    assert rank.tolist() == pytest.approx(naive_pagerank(n, links), abs=1e-6)
+
+    num, labels = pages.connected_components()
+    groups = {frozenset(np.flatnonzero(labels == c).tolist()) for c in range(num)}
+    assert groups == naive_components(n, edges)
+    assert list(np.bincount(labels)) == sorted(np.bincount(labels), reverse=True)
+
+    out_sets = {p: links.get(p, set()) for p in range(n)}
+    for p, score in pages.similar_pages(0, k=n, mode="out"):
+        shared = len(out_sets[0] & out_sets[p])
+        norm = math.sqrt(len(out_sets[0]) * len(out_sets[p]))
+        assert score == pytest.approx(shared / norm)
+
+
+def test_similar_pages_modes():
+    # 0 and 1 both link to 2 and 3, 4 links to 0 and 1
+    pages = make_page_graph(5, [(0, 2), (0, 3), (1, 2), (1, 3), (4, 0), (4, 1)])
+    assert pages.similar_pages(0, mode="out") == [(1, 1.0)]
+    assert pages.similar_pages(0, mode="in") == [(1, 1.0)]
+    assert pages.similar_pages(2, mode="in") == [(3, 1.0)]
+    assert pages.similar_pages(4, mode="out") == []
+    assert pages.similar_pages(0, k=0) == []
+    with pytest.raises(ValueError):
+        pages.similar_pages(0, mode="sideways")
+
+
+def test_top_k():
+    scores = np.array([0.1, 0.5, 0.5, 0.2])
+    assert ga.top_k(scores, 3).tolist() == [1, 2, 3]
+    assert ga.top_k(scores, 10).tolist() == [1, 2, 3, 0]
+    assert ga.top_k(scores, 0).tolist() == []
+
+
+# ----- RoamGraph ----- #
+
+
+def test_roam_graph_page_graph(graph):
+    pages = graph.page_graph
+    assert list(pages.titles) == ["A", "B", "C", "D", "E", "F"]
+    # Block refs count for the page they're on, refs to unknown uids drop
+    assert [pages.links(p).tolist() for p in range(6)] == [
+        [1, 2],
+        [2],
+        [1],
+        [4],
+        [],
+        [],
+    ]
+
+    top = graph.get_top_pages(k=2)
+    assert [title for title, _ in top] == ["B", "C"]
+    assert graph.get_page_clusters() == [["A", "B", "C"], ["D", "E"]]
+    assert graph.get_page_clusters(min_size=1)[-1] == ["F"]
+    assert graph.get_similar_pages("B", mode="in") == [("C", 0.5)]
+    assert graph.page_graph.degree_stats()["isolated"] == 1
+
+
+def test_roam_graph_page_graph_replace_page(graph):
+    if graph.storage != "nodes":
+        return
+    graph.page_graph
+    graph.replace_page({"title": "F", "uid": "f", "refs": [{"uid": "d"}]})
+    assert graph.get_page_clusters() == [["A", "B", "C"], ["D", "E", "F"]]
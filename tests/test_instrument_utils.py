@@ -0,0 +1,141 @@
+import io
+import json
+import time
+
+import pytest
+
+from roam_man import instrument_utils as iu
+from roam_man import roam_graph as gu
+
+
+@pytest.fixture
+def pages():
+    return [
+        {
+            "title": "Page 1",
+            "uid": "p1",
+            "refs": [{"uid": "KVGudD7AP"}],
+            "children": [
+                {
+                    "uid": "b1",
+                    "refs": [{"uid": "p2"}, {"uid": "e2rS3SVH7"}],
+                    "children": [{"uid": "b2", "refs": [{"uid": "p2"}]}],
+                },
+                {"uid": "b3"},
+            ],
+        },
+        {"title": "Page 2", "uid": "p2"},
+    ]
+
+
+class RecordingHooks(iu.LoadHooks):
+    def __init__(self):
+        self.events = []
+
+    def on_phase_start(self, name, stats):
+        self.events.append(("start", name))
+
+    def on_phase_end(self, name, seconds, stats):
+        self.events.append(("end", name))
+
+    def on_page(self, page, stats):
+        self.events.append(("page", page["uid"]))
+
+    def on_finish(self, stats):
+        self.events.append(("finish", stats.pages))
+
+
+def test_instrument_counts_pages(pages):
+    instrument = iu.LoadInstrument()
+    instrument.start()
+    assert list(instrument.iter_pages(pages)) == pages
+    stats = instrument.stats
+    assert (stats.pages, stats.blocks, stats.refs) == (2, 5, 2)
+    assert stats.blacklisted_refs == 2
+    assert stats.max_depth == 2
+    assert stats.phases["decode"] >= 0
+
+
+def test_instrument_phases_are_exclusive():
+    instrument = iu.LoadInstrument()
+    instrument.start()
+    with instrument.phase("outer"):
+        with instrument.phase("inner"):
+            time.sleep(0.05)
+        instrument.add_time("decode", 0.5)
+    instrument.finish()
+
+    phases = instrument.stats.phases
+    assert phases["inner"] >= 0.05
+    assert phases["outer"] < 0.05
+    assert phases["decode"] == 0.5
+    assert set(instrument.stats.memory) == {"outer", "inner"}
+    assert json.dumps(instrument.stats.as_dict())
+    assert "inner" in str(instrument.stats)
+
+
+def test_instrument_hooks_and_progress(pages):
+    hooks = RecordingHooks()
+    out = io.StringIO()
+    instrument = iu.LoadInstrument(hooks=[hooks, iu.ProgressReporter(out, every=0)])
+    instrument.start()
+    instrument.set_position(total_pages=2)
+    with instrument.phase("build"):
+        list(instrument.iter_pages(pages))
+    instrument.finish()
+
+    assert hooks.events == [
+        ("start", "build"),
+        ("page", "p1"),
+        ("page", "p2"),
+        ("end", "build"),
+        ("finish", 2),
+    ]
+    lines = out.getvalue().splitlines()
+    assert lines[0].startswith("loading 1 pages, 4 blocks (50%)")
+    assert lines[-1].startswith("loaded 2 pages, 5 blocks in")
+
+
+def test_null_instrument(pages):
+    assert iu.as_instrument(None) is iu.NULL_INSTRUMENT
+    assert iu.as_instrument(False) is iu.NULL_INSTRUMENT
+    assert isinstance(iu.as_instrument(True), iu.LoadInstrument)
+    assert iu.NULL_INSTRUMENT.iter_pages(pages) is pages
+    assert iu.NULL_INSTRUMENT.stats is None
+
+
+def test_instrument_track_memory(pages):
+    instrument = iu.LoadInstrument(track_memory=True)
+    instrument.start()
+    with instrument.phase("build"):
+        [gu.RoamNode(page) for page in pages]
+    instrument.finish()
+    assert instrument.stats.memory["build"]["traced_peak_mb"] > 0
+
+
+# ----- RoamGraph load stats ----- #
+
+
+@pytest.mark.parametrize("storage", gu.STORAGE_TYPES)
+@pytest.mark.parametrize("stream", [False, True])
+def test_roam_graph_load_stats(tmp_path, pages, storage, stream):
+    input_path = tmp_path / "export.json"
+    input_path.write_text(json.dumps(pages))
+    assert gu.RoamGraph(input_path, storage=storage).load_stats is None
+
+    out = io.StringIO()
+    instrument = iu.LoadInstrument(hooks=[iu.ProgressReporter(out, every=0)])
+    graph = gu.RoamGraph(
+        input_path,
+        stream=stream,
+        storage=storage,
+        checkpoint_path=tmp_path / "checkpoint",
+        instrument=instrument,
+    )
+    stats = graph.load_stats
+    assert (stats.pages, stats.blocks, stats.refs, stats.max_depth) == (2, 5, 2, 2)
+    assert {"decode", "build", "checkpoint"} <= set(stats.phases)
+    assert sum(stats.phases.values()) <= stats.total_seconds
+    # Streamed loads track bytes, the closing "]" is never reached
+    assert stats.fraction_done == pytest.approx(1.0, abs=0.05)
+    assert out.getvalue().splitlines()[-1].startswith("loaded 2 pages, 5 blocks")
@@ -0,0 +1,118 @@
+import json
+
+import numpy as np
+import pytest
+from hypothesis import given
+from hypothesis import strategies as st
+
+from roam_man import intern_utils as inu
+from roam_man import roam_graph as gu
+from roam_man import tree_utils as tu
+from tests.test_roam_graph import nested_roam_dict_st
+
+
+@pytest.fixture
+def pages():
+    return [
+        {
+            "title": "Page 1",
+            "uid": "p1",
+            "refs": [{"uid": "p2"}, {"uid": "KVGudD7AP"}],
+            "children": [
+                {
+                    "uid": "b1",
+                    "refs": [{"uid": "p2"}, {"uid": "b3"}],
+                    "children": [{"uid": "b2", "refs": [{"uid": "p2"}]}],
+                },
+                {"uid": "b3"},
+            ],
+        },
+        {"title": "Page 2", "uid": "p2", "refs": [{"uid": "p1"}]},
+    ]
+
+
+def test_symbol_table():
+    table = inu.SymbolTable()
+    assert table.add("a") == 0
+    assert table.add("b") == 1
+    assert table.add("a") == 0
+    assert table.add(None) == inu.MISSING
+    assert len(table) == 2 and "a" in table and "c" not in table
+    assert table[1] == "b"
+    assert table.get_id("c") == inu.MISSING and "c" not in table
+
+    ids = table.add_many(["b", "c", "a"])
+    assert isinstance(ids, bytes) and len(ids) == 12
+    assert table.decode(ids) == ["b", "c", "a"]
+    assert table.add_many([]) is inu.NO_IDS
+
+    # known never inserts, but hands back the table's own copy
+    copy = "".join(["c"])
+    assert table.known(copy) is table[2]
+    assert table.known("zz") == "zz" and "zz" not in table
+
+
+@given(st.lists(st.integers(0, 200)), st.lists(st.integers(0, 200)))
+def test_id_set_algebra(a, b):
+    x, y = inu.IdSet.from_ids(a), inu.IdSet.from_ids(b)
+    assert list(x) == sorted(set(a))
+    assert set(x & y) == set(a) & set(b)
+    assert set(x | y) == set(a) | set(b)
+    assert set(x - y) == set(a) - set(b)
+    assert all(i in x for i in a) and -1 not in x
+    assert inu.IdSet.from_bitset(x.to_bitset(201)) == x
+    assert (x == y) == (set(a) == set(b))
+
+
+def test_id_set_from_packed():
+    table = inu.SymbolTable()
+    ids = table.add_many(["a", "b", "a"])
+    assert inu.IdSet.from_ids(ids) == inu.IdSet.from_ids(np.array([1, 0]))
+    assert inu.IdSet.from_ids(inu.NO_IDS).nbytes == 0
+
+
+# ----- RoamNode / RoamGraph ----- #
+
+
+def test_roam_node_ref_ids(pages):
+    node = gu.RoamNode(pages[0])
+    b1 = node.children[0]
+    assert b1.refs == ["p2", "b3"]
+    assert b1.ref_ids.tolist() == [node.symbols.get_id(r) for r in b1.refs]
+    # One str per referenced uid, shared by every ref and its block
+    assert b1.refs[0] is node.refs[0] is b1.children[0].refs[0]
+    assert b1.refs[1] is node.children[1].uid
+    assert node.recursive_refs == frozenset(["p2", "b3"])
+    assert node.has_recursive_ref("b3") and not b1.has_recursive_ref("nope")
+    assert not node.children[1].has_recursive_ref("p2")
+
+
+def test_roam_graph_shares_symbols(tmp_path, pages):
+    input_path = tmp_path / "export.json"
+    input_path.write_text(json.dumps(pages))
+    graph = gu.RoamGraph(input_path)
+    page1, page2 = graph.get_page_node("Page 1"), graph.get_page_node("Page 2")
+    assert page1.symbols is page2.symbols is graph.symbols
+    assert page2.refs[0] is graph.symbols[graph.symbols.get_id("p1")]
+    assert page2.uid is page1.refs[0]
+
+
+@pytest.mark.parametrize("storage", ["compact", "sqlite"])
+def test_has_recursive_ref_matches_nodes(tmp_path, pages, storage):
+    input_path = tmp_path / "export.json"
+    input_path.write_text(json.dumps(pages))
+    nodes = gu.RoamGraph(input_path)
+    other = gu.RoamGraph(input_path, storage=storage, db_path=tmp_path / "db")
+    for title in ["Page 1", "Page 2"]:
+        node, view = nodes.get_page_node(title), other.get_page_node(title)
+        for uid in ["p1", "p2", "b3", "nope"]:
+            assert node.has_recursive_ref(uid) == view.has_recursive_ref(uid)
+        assert node.recursive_refs == set(view.recursive_refs)
+
+
+@given(nested_roam_dict_st())
+def test_recursive_refs_decode(roam_dict):
+    node = gu.RoamNode(roam_dict)
+    expected = {ref for n in tu.iter_subtree(node) for ref in n.refs}
+    assert node.recursive_refs == expected
+    assert set(node.symbols.decode(node.recursive_ref_ids)) == expected
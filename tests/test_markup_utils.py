@@ -0,0 +1,191 @@
+import copy
+import json
+
+import pytest
+from hypothesis import given
+from hypothesis import strategies as st
+
+from roam_man import markup_utils as mu
+from roam_man import roam_graph as gu
+
+
+@pytest.fixture
+def pages():
+    return [
+        {
+            "title": "Project",
+            "uid": "proj",
+            "children": [
+                {
+                    "uid": "p1",
+                    "string": "Status:: [[Active]]",
+                    "refs": [{"uid": "active"}, {"uid": "status"}],
+                },
+                {
+                    "uid": "p2",
+                    "string": "ask [[Person]] about ((p1)) #urgent",
+                    "refs": [{"uid": "person"}, {"uid": "urgent"}, {"uid": "p1"}],
+                    "children": [
+                        {"uid": "p3", "string": "`[[Person]]` is code, [[Unknown]]"}
+                    ],
+                },
+            ],
+        },
+        {
+            "title": "Journal",
+            "uid": "jour",
+            "children": [
+                {
+                    "uid": "j1",
+                    "string": "Status:: done, see #[[Person]]",
+                    "refs": [{"uid": "status"}, {"uid": "person"}],
+                }
+            ],
+        },
+        {"title": "Active", "uid": "active"},
+        {"title": "Status", "uid": "status"},
+        {"title": "Person", "uid": "person"},
+        {"title": "urgent", "uid": "urgent"},
+    ]
+
+
+def strip_refs(pages):
+    pages = copy.deepcopy(pages)
+    stack = list(pages)
+    while stack:
+        block = stack.pop()
+        block.pop("refs", None)
+        stack.extend(block.get("children", []))
+    return pages
+
+
+def make_graph(pages, tmp_path, **kwargs):
+    input_path = tmp_path / "export.json"
+    input_path.write_text(json.dumps(pages))
+    return gu.RoamGraph(input_path, db_path=tmp_path / "graph.sqlite", **kwargs)
+
+
+# ----- Parsing ----- #
+
+
+def test_parse_block():
+    markup = mu.parse_block(
+        "Tags:: [[Topic]] and #tag, #[[Long tag]] see ((abc-12)) `[[no]]`"
+        " x#y http://a.com/#frag [[Topic]]"
+    )
+    assert markup.links == ["Topic"]
+    assert markup.tags == ["tag", "Long tag"]
+    assert markup.block_refs == ["abc-12"]
+    assert markup.attribute[0] == "Tags"
+    assert markup.page_titles == ["Topic", "tag", "Long tag", "Tags"]
+
+    # Nested links, trailing punctuation, embeds, stray brackets
+    assert mu.parse_block("[[[[A]] B]] #a.") == mu.BlockMarkup(
+        links=["A", "[[A]] B"], tags=["a"]
+    )
+    assert mu.parse_block("{{embed: ((u1))}}").block_refs == ["u1"]
+    assert not mu.parse_block("]] [[x")
+    assert not mu.parse_block("```\n[[in code]]\n```")
+    assert mu.parse_block("a :: b").attribute == ("a", "b")
+    assert mu.parse_block("see:: ").attribute == ("see", "")
+    assert mu.parse_block(None) is mu.EMPTY_MARKUP
+    assert mu.parse_block("plain text") is mu.EMPTY_MARKUP
+    assert mu.parse_blocks(["[[A]]", "x", "[[A]]"]) == [
+        mu.BlockMarkup(links=["A"]),
+        mu.EMPTY_MARKUP,
+        mu.BlockMarkup(links=["A"]),
+    ]
+
+
+title_st = st.text(
+    st.characters(blacklist_characters="[]`#():\n", blacklist_categories=["Cs"]),
+    min_size=1,
+).filter(lambda t: t.strip() == t)
+filler_st = st.text(st.sampled_from("abc ,.!"), max_size=5)
+
+
+@given(
+    st.lists(st.tuples(st.sampled_from(["link", "tag", "ref"]), title_st, filler_st))
+)
+def test_parse_block_finds_generated_markup(pieces):
+    parts, expected = [" "], {"link": {}, "tag": {}, "ref": {}}
+    for kind, title, filler in pieces:
+        if kind == "ref":
+            title = "".join(c for c in title if c.isalnum()) or "u"
+            parts.append(f"(({title}))")
+        else:
+            parts.append(f"#[[{title}]]" if kind == "tag" else f"[[{title}]]")
+        parts.append(f" {filler} ")
+        expected[kind][title] = None
+    markup = mu.parse_block("".join(parts))
+    assert markup.links == list(expected["link"])
+    assert markup.tags == list(expected["tag"])
+    assert markup.block_refs == list(expected["ref"])
+
+
+# ----- Refs from strings ----- #
+
+
+def test_add_parsed_refs(pages):
+    title_uids = mu.page_title_uids(pages)
+    missing = list(mu.add_parsed_refs(strip_refs(pages), title_uids))
+    # Links to pages that aren't in the export and code spans are dropped
+    p3 = missing[0]["children"][1]["children"][0]
+    assert "refs" not in p3
+    assert missing[0]["children"][0]["refs"] == [
+        {"uid": "active"},
+        {"uid": "status"},
+    ]
+
+    # "missing" leaves exported refs alone, "merge" adds to them
+    assert list(mu.add_parsed_refs(copy.deepcopy(pages), title_uids)) == pages
+    pages[1]["children"][0]["refs"] = [{"uid": "jour"}]
+    merged = list(mu.add_parsed_refs(pages, title_uids, mode="merge"))
+    assert merged[1]["children"][0]["refs"] == [
+        {"uid": "jour"},
+        {"uid": "person"},
+        {"uid": "status"},
+    ]
+    with pytest.raises(ValueError):
+        list(mu.add_parsed_refs(pages, title_uids, mode="always"))
+
+
+@pytest.mark.parametrize("stream", [False, True])
+@pytest.mark.parametrize("storage", gu.STORAGE_TYPES)
+def test_graph_parse_refs(pages, tmp_path, storage, stream):
+    expected = make_graph(pages, tmp_path, storage=storage)
+    graph = make_graph(
+        strip_refs(pages),
+        tmp_path,
+        storage=storage,
+        stream=stream,
+        parse_refs="missing",
+    )
+    for uid in ["p1", "p2", "p3", "j1"]:
+        assert sorted(graph.get_block(uid).refs) == sorted(expected.get_block(uid).refs)
+    assert sorted(graph.get_backlinks("person")) == ["j1", "p2"]
+    assert graph.get_linking_pages("p1") == ["Project"]
+
+    unparsed = make_graph(strip_refs(pages), tmp_path, storage=storage, stream=stream)
+    assert unparsed.get_backlinks("person") == []
+
+
+def test_graph_parse_refs_options(pages, tmp_path):
+    with pytest.raises(ValueError, match="cache_dir"):
+        make_graph(pages, tmp_path, parse_refs="merge", cache_dir=tmp_path / "cache")
+    with pytest.raises(ValueError, match="mode"):
+        make_graph(pages, tmp_path, parse_refs="always")
+
+
+@pytest.mark.parametrize("storage", gu.STORAGE_TYPES)
+def test_graph_markup(pages, tmp_path, storage):
+    graph = make_graph(pages, tmp_path, storage=storage)
+    assert graph.get_block("p2").markup.tags == ["urgent"]
+    markups = {node.uid: markup for node, markup in graph.iter_markup()}
+    assert list(markups) == ["p1", "p2", "p3", "j1"]
+    assert markups["p3"].links == ["Unknown"]
+    assert graph.get_attributes("Status") == {
+        "p1": "[[Active]]",
+        "j1": "done, see #[[Person]]",
+    }
+    assert graph.get_attributes("Missing") == {}
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from roam_man import compact_graph as cg
+from roam_man import parallel_utils as par
+from tests.test_roam_graph import nested_roam_dict_st
+
+
+@pytest.fixture
+def pages():
+    return [
+        {
+            "title": f"Page {i}",
+            "uid": f"page{i}",
+            "refs": [{"uid": f"page{(i + 1) % 7}"}],
+            "children": [
+                {"uid": f"b{i}", "string": f"text {i % 3}", "refs": [{"uid": "b0"}]}
+            ],
+        }
+        for i in range(7)
+    ]
+
+
+def check_same_graph(graph, expected):
+    for idx in range(expected.num_blocks):
+        assert graph.get_uid(idx) == expected.get_uid(idx)
+        assert graph.get_refs(idx) == expected.get_refs(idx)
+        assert graph.get_raw_block(idx) == expected.get_raw_block(idx)
+    for name in ["parent", "depth", "subtree_end", "create_time", "page_roots"]:
+        assert np.array_equal(getattr(graph, name), getattr(expected, name)), name
+    for uid in expected.uid_index:
+        if expected.symbol_blocks[expected.uid_index[uid]] != cg.MISSING:
+            assert graph.get_block_idx(uid) == expected.get_block_idx(uid)
+
+
+def test_concat(pages):
+    expected = cg.CompactGraph.from_pages(pages)
+    shards = [cg.CompactGraph.from_pages(pages[i : i + 3]) for i in range(0, 7, 3)]
+    merged = cg.CompactGraph.concat(shards)
+    check_same_graph(merged, expected)
+    # Symbols are re-interned, so a uid shared by shards gets one id
+    assert len(merged.uids) == len(expected.uids)
+    assert cg.CompactGraph.concat([]).num_blocks == 0
+
+
+@pytest.mark.parametrize("as_list", [True, False])
+def test_build_compact_graph_parallel(pages, as_list):
+    expected = cg.CompactGraph.from_pages(pages)
+    source = pages if as_list else iter(pages)
+    graph = par.build_compact_graph(source, workers=2, shard_size=2)
+    check_same_graph(graph, expected)
+
+
+@settings(max_examples=10, deadline=None)
+@given(data=st.lists(nested_roam_dict_st(), min_size=1, max_size=6))
+def test_concat_hypothesis(data):
+    expected = cg.CompactGraph.from_pages(data)
+    shards = [
+        cg.CompactGraph.from_pages(data[i : i + 2]) for i in range(0, len(data), 2)
+    ]
+    check_same_graph(cg.CompactGraph.concat(shards), expected)
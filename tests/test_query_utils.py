@@ -0,0 +1,214 @@
+from unittest.mock import patch
+
+import pytest
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from roam_man import query_utils as qu
+from roam_man import roam_graph as gu
+from roam_man import time_index as ti
+from roam_man import tree_utils as tu
+
+DAY_MS = 24 * 3600 * 1000
+T0 = 1704067200000  # 2024-01-01
+
+
+def make_raw_data():
+    return [
+        {
+            "title": "Project",
+            "uid": "proj",
+            "children": [
+                {"uid": "tags", "string": "Tags:: [[Topic]]", "refs": [{"uid": "t"}]},
+                {
+                    "uid": "p1",
+                    "string": "meeting notes",
+                    "edit-time": T0 + 5 * DAY_MS,
+                    "children": [
+                        {
+                            "uid": "p2",
+                            "string": "ask [[Person]]",
+                            "edit-time": T0 + 10 * DAY_MS,
+                            "refs": [{"uid": "person"}],
+                        },
+                        {
+                            "uid": "p3",
+                            "string": "ask [[Person]] again",
+                            "edit-time": T0 - DAY_MS,
+                            "refs": [{"uid": "person"}],
+                        },
+                    ],
+                },
+            ],
+        },
+        {
+            "title": "Journal",
+            "uid": "jour",
+            "children": [
+                {
+                    "uid": "j1",
+                    "string": "met [[Person]]",
+                    "edit-time": T0 + 20 * DAY_MS,
+                    "refs": [{"uid": "person"}],
+                }
+            ],
+        },
+        {"title": "Topic", "uid": "t"},
+        {"title": "Person", "uid": "person"},
+    ]
+
+
+@pytest.fixture
+def pages():
+    return make_raw_data()
+
+
+def test_to_epoch_ms():
+    assert ti.to_epoch_ms(None) is None
+    assert ti.to_epoch_ms(5) == 5
+    assert ti.to_epoch_ms("2024-01-01") == T0
+
+
+def test_query_filters(graph):
+    assert graph.query().references("Person").uids() == ["p2", "p3", "j1"]
+    assert sorted(graph.query().references("person", recursive=True).uids()) == [
+        "j1",
+        "jour",
+        "p1",
+        "p2",
+        "p3",
+        "proj",
+    ]
+    assert graph.query().under("p1").uids() == ["p2", "p3"]
+    assert graph.query().ancestors_of("p2").uids() == ["proj", "p1"]
+    assert graph.query().on_pages_referencing("Topic").uids() == [
+        "proj",
+        "tags",
+        "p1",
+        "p2",
+        "p3",
+    ]
+    assert graph.query().edited_between("2024-01-08", "2024-01-15").uids() == ["p2"]
+    assert qu.TimeRange("edit_time", end="2024-01-11").end == T0 + 11 * DAY_MS - 1
+    assert graph.query().text("again").uids() == ["p3"]
+    assert graph.query().where(lambda n: n.depth == 2).uids() == ["p2", "p3"]
+
+
+def test_query_filter_base(graph):
+    with pytest.raises(TypeError):
+        qu.QueryFilter()
+    assert qu.Where(lambda n: True).candidates(graph) is None
+
+    # Estimated but without candidates, the planner falls back to a scan
+    class DepthTwo(qu.QueryFilter):
+        def estimate(self, graph):
+            return 1
+
+        def matches(self, node):
+            return node.depth == 2
+
+    query = graph.query().filter(DepthTwo())
+    assert query.plan().source is not None
+    assert query.uids() == ["p2", "p3"]
+
+
+def test_query_filters_after_eviction(graph):
+    text = qu.TextMatch("ask")
+    text.prepare(graph)
+    if graph.db is not None:
+        # Every page is rebuilt as new nodes once it has left the LRU
+        graph.db.max_pages = 1
+        old_p2 = graph.get_block("p2")
+        graph.get_page_node_by_index(1)
+        assert graph.get_block("p2") is not old_p2
+    assert text.matches(graph.get_block("p2"))
+    assert not text.matches(graph.get_block("p1"))
+    assert graph.query().under("p1").text("ask").uids() == ["p2", "p3"]
+    assert graph.query().under("proj").on_pages_referencing("t").uids() == [
+        "tags",
+        "p1",
+        "p2",
+        "p3",
+    ]
+
+
+def test_page_sizes_estimates(graph):
+    assert graph.query().under("Project").plan().estimate == 4
+    assert graph.query().on_pages_referencing("t").plan().estimate == 5
+    if graph.storage == "nodes":
+        assert graph.page_sizes["jour"] == 2
+        graph.replace_page({"title": "Journal", "uid": "jour"})
+        assert graph.page_sizes["jour"] == 1
+
+
+def test_query_combined(graph):
+    query = (
+        graph.query()
+        .on_pages_referencing("Topic")
+        .references("Person")
+        .edited_between(start="2024-01-01")
+    )
+    assert query.uids() == ["p2"]
+
+
+def test_query_plan(graph):
+    # The smallest index drives the query, other filters are checked per block
+    plan = graph.query().on_pages_referencing("Topic").references("Person").plan()
+    assert isinstance(plan.source, qu.References)
+    assert plan.estimate == 3
+    assert [type(f) for f in plan.filters] == [qu.OnPagesReferencing]
+
+    explain = graph.query().references("Person").ancestors_of("p2").explain()
+    assert explain.splitlines()[0] == "index: ancestor of 'p2' (est. 2 blocks)"
+    assert "filter: refs contain 'person'" in explain
+
+    # Time ranges are answered from the sorted times
+    plan = graph.query().edited_between(start=T0).where(lambda n: True).plan()
+    assert isinstance(plan.source, qu.TimeRange)
+    assert plan.estimate == 3
+    assert [type(f) for f in plan.filters] == [qu.Where]
+
+    plan = graph.query().where(lambda n: n.depth == 2).plan()
+    assert plan.source is None
+    assert plan.estimate == plan.total_blocks
+    assert graph.query().where(lambda n: True).explain().startswith("full scan")
+
+
+@settings(deadline=None, max_examples=30)
+@given(
+    st.lists(
+        st.sampled_from(
+            [
+                ("references", "person"),
+                ("references_rec", "person"),
+                ("under", "proj"),
+                ("under", "p1"),
+                ("ancestors_of", "p3"),
+                ("on_pages_referencing", "t"),
+                ("edited_between", T0),
+                ("text", "ask"),
+            ]
+        ),
+        min_size=1,
+        max_size=3,
+    )
+)
+def test_query_matches_scan(specs):
+    with patch("dr_util.file_utils.load_file", return_value=make_raw_data()):
+        graph = gu.RoamGraph("fake_path")
+
+    query = graph.query()
+    for name, arg in specs:
+        if name == "references_rec":
+            query.references(arg, recursive=True)
+        else:
+            getattr(query, name)(arg)
+
+    # Indexed plan and a forced full scan agree
+    scan = {
+        node.uid
+        for page in graph.roam_pages.values()
+        for node in tu.iter_subtree(page)
+        if all(f.prepare(graph) or f.matches(node) for f in query.filters)
+    }
+    assert set(query.uids()) == scan
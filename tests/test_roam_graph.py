@@ -1,11 +1,24 @@
+import gc
+import io
+import json
+import pickle
+import threading
+
 import pytest
 from unittest.mock import patch
 from hypothesis import given
 from hypothesis import strategies as st
 
+from roam_man import process_utils as pu
 from roam_man import roam_graph as gu
 
 
+@pytest.fixture(autouse=True)
+def in_tmp_dir(tmp_path, monkeypatch):
+    # sqlite storage writes its database next to the (fake) input path
+    monkeypatch.chdir(tmp_path)
+
+
 # ----- Hand crafted data examples ----- #
 
 
@@ -248,6 +261,61 @@ def test_raw_roam_data_to_str_dynamic(data):
     )
 
 
+def test_roam_data_to_full_str_depth_first():
+    page = {
+        "title": "Page",
+        "uid": "p",
+        "children": [
+            {
+                "uid": "a",
+                "string": "A",
+                "children": [{"uid": "a1", "string": "A1", "refs": [{"uid": "p"}]}],
+            },
+            {"uid": "b", "string": "B"},
+        ],
+    }
+    expected = (
+        "Page\n  uid='p' refs=[]\n"
+        "\n   - A"
+        "\n     - A1\n     ==> uid='a1' refs=['p']\n"
+        "\n   - B"
+    )
+    assert gu.roam_data_to_full_str(page) == expected
+    assert gu.roam_data_to_full_str(gu.RoamNode(page)) == expected
+
+    assert gu.roam_data_to_full_str(page, max_depth=1) == (
+        "Page\n  uid='p' refs=[]\n\n   - A\n   - B"
+    )
+    assert gu.roam_data_to_full_str(page, max_blocks=2) == (
+        "Page\n  uid='p' refs=[]\n\n   - A"
+    )
+    assert gu.roam_data_to_full_str(page, max_depth=0, max_blocks=0) == ""
+
+    # Subtrees render relative to their own root
+    assert gu.roam_data_to_full_str(page["children"][0]) == (
+        " - A\n   - A1\n   ==> uid='a1' refs=['p']\n"
+    )
+
+
+def test_write_roam_str_deep(tmp_path):
+    n_levels = 5000
+    page = {"uid": "page", "title": "Deep Page"}
+    json = page
+    for i in range(1, n_levels):
+        json["children"] = [{"uid": f"b{i}", "string": f"level {i}"}]
+        json = json["children"][0]
+
+    out_path = tmp_path / "deep.txt"
+    with open(out_path, "w") as f:
+        gu.write_roam_str(page, f)
+    lines = out_path.read_text().splitlines()
+    assert lines[-1] == "  " * (n_levels - 1) + f" - level {n_levels - 1}"
+    assert len(lines) == n_levels + 2  # title, uid line, blank separator
+
+    chunks = gu.iter_roam_str_chunks(page, max_blocks=3)
+    assert len(list(chunks)) == 3
+
+
 # ----- Test RoamNode ----- #
 
 
@@ -282,6 +350,73 @@ def test_roam_node_recursive_refs(valid_json):
     assert "ref1" in node.recursive_refs  # Child refs added to parent
 
 
+def test_subtree_refs_cache_is_bounded():
+    page = {"title": "P", "uid": "p", "children": []}
+    for i in range(5):
+        page["children"].append(
+            {
+                "uid": f"b{i}",
+                "string": "x",
+                "refs": [{"uid": f"r{i}"}],
+                "children": [{"uid": f"c{i}", "string": "y", "refs": [{"uid": "z"}]}],
+            }
+        )
+    node = gu.RoamNode(page)
+    cache = gu.SubtreeRefsCache(max_refs=4)
+    with patch.object(gu, "RECURSIVE_REFS_CACHE", cache):
+        for i, child in enumerate(node.children):
+            assert child.recursive_refs == {f"r{i}", "z"}
+        # Two refs each, only the two most recent fit
+        assert cache.num_refs == 4
+        assert [child._recursive_refs is not None for child in node.children] == [
+            False,
+            False,
+            False,
+            True,
+            True,
+        ]
+        # Too big to cache, still computed
+        assert node.recursive_refs == {"r0", "r1", "r2", "r3", "r4", "z"}
+        assert node._recursive_refs is None
+
+        # Entries go away with their nodes
+        del node, child
+        gc.collect()
+        assert cache.num_refs == 0 and not cache.entries
+
+
+def test_subtree_refs_cache_threads():
+    page = {"title": "P", "uid": "p", "children": []}
+    for i in range(50):
+        page["children"].append(
+            {
+                "uid": f"b{i}",
+                "refs": [{"uid": f"r{i}"}],
+                "children": [{"uid": f"c{i}", "refs": [{"uid": f"s{i % 7}"}]}],
+            }
+        )
+    node = gu.RoamNode(page)
+    cache = gu.SubtreeRefsCache(max_refs=50)
+    errors = []
+
+    def read_refs():
+        try:
+            for _ in range(200):
+                for i, child in enumerate(node.children):
+                    assert child.recursive_refs == {f"r{i}", f"s{i % 7}"}
+        except Exception as e:
+            errors.append(e)
+
+    with patch.object(gu, "RECURSIVE_REFS_CACHE", cache):
+        threads = [threading.Thread(target=read_refs) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert errors == []
+    assert cache.num_refs == sum(n for _, n in cache.entries.values()) <= 50
+
+
 def test_roam_node_repr(valid_json):
     node = gu.RoamNode(valid_json)
     repr_str = repr(node)
@@ -308,7 +443,7 @@ def test_roam_node_initialization_hypothesis(data):
 )
 def test_roam_node_recursive_refs_hypothesis(data):
     node = gu.RoamNode(data[0])
-    assert isinstance(node.recursive_refs, set)
+    assert isinstance(node.recursive_refs, frozenset)
     assert all(isinstance(ref, str) for ref in node.recursive_refs)
 
 
@@ -328,6 +463,56 @@ def test_roam_node_repr_hypothesis(data):
     assert isinstance(repr_str, str)
 
 
+def check_node_tree(node, json, parent=None, depth=0):
+    # Iterative check against the raw json so deep trees can be verified too
+    stack = [(node, json, parent, depth)]
+    while stack:
+        node, json, parent, depth = stack.pop()
+        assert node.uid == json["uid"]
+        assert node.parent is parent
+        assert node.depth == depth
+        expected_refs = set(node.refs)
+        for ch in node.children:
+            expected_refs.update(ch.recursive_refs)
+        assert node.recursive_refs == expected_refs
+        ch_jsons = json.get("children", [])
+        assert len(node.children) == len(ch_jsons)
+        stack.extend(
+            (ch, ch_json, node, depth + 1)
+            for ch, ch_json in zip(node.children, ch_jsons)
+        )
+
+
+@given(
+    data=st.lists(
+        nested_roam_dict_st(), min_size=1, max_size=10, unique_by=lambda x: x["title"]
+    )
+)
+def test_roam_node_tree_structure_hypothesis(data):
+    check_node_tree(gu.RoamNode(data[0]), data[0])
+
+
+def test_roam_node_deep_tree():
+    # Deeper than the default recursion limit
+    n_levels = 5000
+    page = {"uid": "page", "title": "Deep Page", "refs": [{"uid": "r0"}]}
+    json = page
+    for i in range(1, n_levels):
+        child = {"uid": f"b{i}", "string": f"level {i}", "refs": [{"uid": f"r{i}"}]}
+        json["children"] = [child]
+        json = child
+
+    node = gu.RoamNode(page)
+    check_node_tree(node, page)
+    assert node.recursive_refs == {f"r{i}" for i in range(n_levels)}
+
+    leaf = node
+    while leaf.children:
+        leaf = leaf.children[0]
+    assert leaf.depth == n_levels - 1
+    assert leaf.recursive_refs == {f"r{n_levels - 1}"}
+
+
 # ----- Test gu.RoamGraph ----- #
 
 
@@ -345,14 +530,14 @@ def test_roam_graph_initialization(mock_load_file, raw_data):
 
 
 @patch("dr_util.file_utils.load_file")
-@patch("dr_util.file_utils.dump_file")
-def test_roam_graph_checkpoint(mock_dump_file, mock_load_file, raw_data):
+@patch("roam_man.checkpoint_utils.save_checkpoint")
+def test_roam_graph_checkpoint(mock_save_checkpoint, mock_load_file, raw_data):
     # Mock file loading and checkpoint saving
     mock_load_file.return_value = raw_data
     graph = gu.RoamGraph("fake_path", checkpoint_path="fake_checkpoint")  # noqa: F841
 
-    # Check that dump_file was called to save a checkpoint
-    mock_dump_file.assert_called_once()
+    # Check that save_checkpoint was called to save a checkpoint
+    mock_save_checkpoint.assert_called_once()
 
 
 def test_roam_graph_get_page_node_by_index(raw_data):
@@ -390,15 +575,15 @@ def test_roam_graph_initialization_hypothesis(mock_load_file, data):
     )
 )
 @patch("dr_util.file_utils.load_file")
-@patch("dr_util.file_utils.dump_file")
-def test_roam_graph_checkpoint_hypothesis(mock_dump_file, mock_load_file, data):
+@patch("roam_man.checkpoint_utils.save_checkpoint")
+def test_roam_graph_checkpoint_hypothesis(mock_save_checkpoint, mock_load_file, data):
     # Mock file loading and checkpoint saving
     mock_load_file.return_value = data
 
     graph = gu.RoamGraph("fake_path", checkpoint_path="fake_checkpoint")  # noqa: F841
 
-    # Check that dump_file was called to save a checkpoint
-    mock_dump_file.assert_called_once()
+    # Check that save_checkpoint was called to save a checkpoint
+    mock_save_checkpoint.assert_called_once()
 
 
 @given(
@@ -415,3 +600,445 @@ def test_roam_graph_get_page_node_by_index_hypothesis(mock_load_file, data):
         page_node = graph.get_page_node_by_index(idx)
         assert page_node.uid == page["uid"]
         assert page_node.title == page["title"]
+
+
+# ----- Test streaming load ----- #
+
+
+@pytest.mark.parametrize("keep_raw", [True, False])
+def test_roam_graph_stream(tmp_path, static_test_data, keep_raw):
+    input_path = tmp_path / "export.json"
+    input_path.write_text(json.dumps(static_test_data))
+    graph = gu.RoamGraph(input_path, stream=True, keep_raw=keep_raw)
+
+    assert list(graph.roam_pages) == [rd["title"] for rd in static_test_data]
+    assert graph.uid_to_title["DNqgQM5vZ"] == static_test_data[2]["title"]
+    for idx, rd in enumerate(static_test_data):
+        assert graph.get_raw_elem(idx) == rd
+        assert graph.get_page_node_by_index(idx).uid == rd["uid"]
+
+    page_node = graph.get_page_node_by_index(2)
+    assert page_node.children[0].refs == ["pUoYhPB6m"]
+    assert (page_node.raw_data is not None) == keep_raw
+    assert (page_node.children[0].raw_data is not None) == keep_raw
+
+
+def test_roam_graph_stream_matches_load(tmp_path, static_test_data):
+    input_path = tmp_path / "export.json"
+    input_path.write_text(json.dumps(static_test_data, indent=2))
+    streamed = gu.RoamGraph(input_path, stream=True, keep_raw=False)
+    with patch("dr_util.file_utils.load_file", return_value=static_test_data):
+        loaded = gu.RoamGraph("fake_path")
+
+    assert streamed.uid_to_title == loaded.uid_to_title
+    for title, node in loaded.roam_pages.items():
+        assert gu.roam_data_to_full_str(node.raw_data) == gu.roam_data_to_full_str(
+            streamed.get_raw_elem(streamed.page_titles.index(title))
+        )
+        assert repr(streamed.get_page_node(title)) == repr(node)
+
+
+def test_roam_graph_compact_storage(static_test_data):
+    with patch("dr_util.file_utils.load_file", return_value=static_test_data):
+        nodes_graph = gu.RoamGraph("fake_path")
+        compact_graph = gu.RoamGraph("fake_path", storage="compact")
+
+    assert compact_graph.store.num_pages == len(static_test_data)
+    assert compact_graph.uid_to_title == nodes_graph.uid_to_title
+    for idx in range(len(static_test_data)):
+        assert repr(compact_graph.get_page_node_by_index(idx)) == repr(
+            nodes_graph.get_page_node_by_index(idx)
+        )
+
+    with pytest.raises(ValueError):
+        gu.RoamGraph("fake_path", storage="not_a_storage")
+
+
+# ----- Test block lookup ----- #
+
+
+@pytest.fixture
+def nested_raw_data():
+    return [
+        {
+            "title": "Page 1",
+            "uid": "page1",
+            "children": [
+                {
+                    "uid": "b1",
+                    "string": "first",
+                    "children": [
+                        {"uid": "b2", "string": "nested", "refs": [{"uid": "page2"}]}
+                    ],
+                },
+                {"uid": "b3", "string": "second"},
+            ],
+        },
+        {"title": "Page 2 | bar", "uid": "page2", "refs": [{"uid": "b2"}]},
+    ]
+
+
+@pytest.mark.parametrize("storage", gu.STORAGE_TYPES)
+def test_roam_graph_block_lookup(nested_raw_data, storage):
+    with patch("dr_util.file_utils.load_file", return_value=nested_raw_data):
+        graph = gu.RoamGraph("fake_path", storage=storage)
+
+    for uid in ["page1", "b1", "b2", "b3", "page2"]:
+        assert graph.get_block(uid).uid == uid
+    assert graph.get_block("b2").string == "nested"
+    assert [n.uid for n in graph.get_parent_chain("b2")] == ["page1", "b1"]
+    assert graph.get_parent_chain("page1") == []
+    assert graph.get_page_of("b2").title == "Page 1"
+    assert graph.get_page_of("page2").title == "Page 2 | bar"
+
+    with pytest.raises(KeyError):
+        graph.get_block("missing")
+
+    # Ref to a nested block resolves to its page
+    title_sets = pu.page_node_list_to_title_sets(
+        graph.roam_pages, graph.uid_to_title, get_page_of=graph.get_page_of
+    )
+    assert title_sets["with_ref"] == {"Page 1": {"Page 2 | bar"}}
+
+
+# ----- Test backlinks ----- #
+
+
+@pytest.mark.parametrize("storage", gu.STORAGE_TYPES)
+def test_roam_graph_backlinks(nested_raw_data, storage):
+    with patch("dr_util.file_utils.load_file", return_value=nested_raw_data):
+        graph = gu.RoamGraph("fake_path", storage=storage)
+
+    assert graph.get_backlinks("page2") == ["b2"]
+    assert graph.get_linking_pages("page2") == ["Page 1"]
+    assert graph.get_backlinks("b2") == ["page2"]
+    assert graph.get_linking_pages("b2") == ["Page 2 | bar"]
+    assert graph.get_backlinks("b1") == []
+
+
+@pytest.mark.parametrize("keep_raw", [True, False])
+def test_roam_graph_replace_page(tmp_path, nested_raw_data, keep_raw):
+    input_path = tmp_path / "export.json"
+    input_path.write_text(json.dumps(nested_raw_data))
+    graph = gu.RoamGraph(input_path, stream=True, keep_raw=keep_raw)
+
+    new_page = {
+        "title": "Page 1 renamed",
+        "uid": "page1",
+        "children": [{"uid": "b4", "string": "new", "refs": [{"uid": "b2"}]}],
+    }
+    graph.replace_page(new_page)
+
+    assert "Page 1" not in graph.roam_pages
+    assert graph.uid_to_title["page1"] == "Page 1 renamed"
+    assert graph.get_page_node_by_index(0).title == "Page 1 renamed"
+    assert graph.get_raw_elem(0) == new_page
+    assert graph.get_page_of("b4").title == "Page 1 renamed"
+    with pytest.raises(KeyError):
+        graph.get_block("b1")
+    assert graph.get_backlinks("page2") == []
+    assert graph.get_backlinks("b2") == ["page2", "b4"]
+
+    added_page = {"title": "Page 3", "uid": "page3", "refs": [{"uid": "page1"}]}
+    graph.replace_page(added_page)
+    assert graph.get_page_node_by_index(2).uid == "page3"
+    assert graph.get_raw_elem(2) == added_page
+    assert graph.get_linking_pages("page1") == ["Page 3"]
+
+
+def test_roam_graph_replace_page_title_taken(nested_raw_data):
+    with patch("dr_util.file_utils.load_file", return_value=nested_raw_data):
+        graph = gu.RoamGraph("fake_path")
+    renamed = {"title": "Page 2 | bar", "uid": "page1"}
+    with pytest.raises(ValueError, match="already has that title"):
+        graph.replace_page(renamed)
+
+    # Nothing was touched
+    assert graph.page_titles == ["Page 1", "Page 2 | bar"]
+    assert graph.uid_to_title == {"page1": "Page 1", "page2": "Page 2 | bar"}
+    assert graph.get_page_of("b2").title == "Page 1"
+    assert graph.get_backlinks("page2") == ["b2"]
+
+
+def test_roam_graph_replace_page_compact(nested_raw_data):
+    with patch("dr_util.file_utils.load_file", return_value=nested_raw_data):
+        graph = gu.RoamGraph("fake_path", storage="compact")
+    with pytest.raises(ValueError):
+        graph.replace_page(nested_raw_data[0])
+
+
+# ----- Test binary checkpoints ----- #
+
+
+@pytest.mark.parametrize("storage", gu.STORAGE_TYPES)
+def test_roam_graph_from_checkpoint(tmp_path, nested_raw_data, storage):
+    checkpoint_path = tmp_path / "checkpoint"
+    with patch("dr_util.file_utils.load_file", return_value=nested_raw_data):
+        graph = gu.RoamGraph(
+            "fake_path", checkpoint_path=checkpoint_path, storage=storage
+        )
+    loaded = gu.RoamGraph.from_checkpoint(checkpoint_path)
+
+    assert loaded.storage == "compact"
+    assert loaded.input_path == "fake_path"
+    assert loaded.page_titles == graph.page_titles
+    assert loaded.uid_to_title == graph.uid_to_title
+    for idx in range(len(nested_raw_data)):
+        assert gu.roam_data_to_full_str(
+            loaded.get_page_node_by_index(idx)
+        ) == gu.roam_data_to_full_str(graph.get_page_node_by_index(idx))
+        assert loaded.get_raw_elem(idx) == nested_raw_data[idx]
+    assert loaded.get_page_of("b2").title == "Page 1"
+    assert loaded.get_backlinks("page2") == ["b2"]
+
+
+# ----- Test parsed graph cache ----- #
+
+
+@pytest.mark.parametrize("storage", gu.STORAGE_TYPES)
+def test_roam_graph_cache(tmp_path, nested_raw_data, storage):
+    input_path = tmp_path / "export.json"
+    input_path.write_text(json.dumps(nested_raw_data))
+    cache_dir = tmp_path / "cache"
+
+    kwargs = dict(stream=True, keep_raw=False, storage=storage, cache_dir=cache_dir)
+    graph = gu.RoamGraph(input_path, **kwargs)
+    with patch("roam_man.stream_utils.iter_json_array") as mock_iter:
+        cached = gu.RoamGraph(input_path, **kwargs)
+        mock_iter.assert_not_called()
+
+    assert cached.uid_to_title == graph.uid_to_title
+    for idx in range(len(nested_raw_data)):
+        assert gu.roam_data_to_full_str(
+            cached.get_page_node_by_index(idx)
+        ) == gu.roam_data_to_full_str(graph.get_page_node_by_index(idx))
+        assert cached.get_raw_elem(idx) == nested_raw_data[idx]
+    assert type(cached.get_block("b2")) is type(graph.get_block("b2"))
+    assert cached.get_backlinks("page2") == ["b2"]
+
+
+@pytest.mark.parametrize("keep_raw", [True, False])
+@pytest.mark.parametrize("stream", [True, False])
+@pytest.mark.parametrize("storage", gu.STORAGE_TYPES)
+def test_roam_graph_cache_hit_matches_miss(
+    tmp_path, nested_raw_data, storage, stream, keep_raw
+):
+    # Keys the compact store doesn't keep, and a repeated title
+    raw_data = nested_raw_data + [{"title": "Page 1", "uid": "page1b", "children": []}]
+    raw_data[0][":create/user"] = {":user/uid": "me"}
+    raw_data[0]["children"][1]["heading"] = 2
+    input_path = tmp_path / "export.json"
+    input_path.write_text(json.dumps(raw_data))
+
+    def load():
+        return gu.RoamGraph(
+            input_path,
+            stream=stream,
+            keep_raw=keep_raw,
+            storage=storage,
+            cache_dir=tmp_path / "cache",
+            db_path=tmp_path / "graph.sqlite",
+        )
+
+    miss, hit = load(), load()
+    assert list(hit.page_titles) == list(miss.page_titles)
+    for idx in range(len(raw_data)):
+        assert gu.roam_data_to_full_str(
+            hit.get_page_node_by_index(idx)
+        ) == gu.roam_data_to_full_str(miss.get_page_node_by_index(idx))
+        assert hit.get_raw_elem(idx) == miss.get_raw_elem(idx)
+    if storage != "sqlite":
+        assert hit.get_raw_elem(0) == raw_data[0]
+        assert hit.get_raw_elem(2) == raw_data[2]
+
+    if storage == "nodes":
+        new_page = {"title": "Page 3", "uid": "page3"}
+        for graph in [miss, hit]:
+            graph.replace_page(dict(raw_data[1], string="edited"))
+            graph.replace_page(new_page)
+            assert graph.get_raw_elem(1)["string"] == "edited"
+            assert graph.get_raw_elem(3) == new_page
+            assert graph.page_titles[3] == "Page 3"
+
+
+def test_roam_graph_cache_hit_skips_export(tmp_path, nested_raw_data):
+    input_path = tmp_path / "export.json"
+    input_path.write_text(json.dumps(nested_raw_data))
+    graph = gu.RoamGraph(input_path, cache_dir=tmp_path / "cache")
+
+    # Default settings: nodes come from the cache, raw pages are read from
+    #   the export one at a time when asked for
+    with patch("dr_util.file_utils.load_file") as mock_load:
+        cached = gu.RoamGraph(input_path, cache_dir=tmp_path / "cache")
+        assert cached.get_raw_elem(1) == nested_raw_data[1]
+        b2 = cached.get_block("b2")
+        assert b2.raw_data == nested_raw_data[0]["children"][0]["children"][0]
+        assert cached.get_page_node("Page 1").raw_data == nested_raw_data[0]
+        mock_load.assert_not_called()
+    check_same_graph(cached, graph)
+    assert cached.symbols.strings == graph.symbols.strings
+
+    assert pickle.loads(pickle.dumps(gu.LAZY_RAW)) is gu.LAZY_RAW
+
+    no_raw = gu.RoamGraph(input_path, keep_raw=False, cache_dir=tmp_path / "cache")
+    assert no_raw.get_block("b2").raw_data is None
+
+
+# ----- Test incremental re-import ----- #
+
+
+def check_same_graph(graph, expected):
+    assert graph.uid_to_title == expected.uid_to_title
+    assert graph.page_titles == expected.page_titles
+    assert set(graph.block_index) == set(expected.block_index)
+    assert set(graph.backlinks.by_target) == set(expected.backlinks.by_target)
+    for target in expected.backlinks.by_target:
+        assert sorted(graph.get_backlinks(target)) == sorted(
+            expected.get_backlinks(target)
+        )
+    for title, node in expected.roam_pages.items():
+        assert gu.roam_data_to_full_str(graph.roam_pages[title]) == (
+            gu.roam_data_to_full_str(node)
+        )
+        assert graph.roam_pages[title].recursive_refs == node.recursive_refs
+    assert graph.page_fingerprints == expected.page_fingerprints
+
+
+@pytest.mark.parametrize("keep_raw", [True, False])
+def test_roam_graph_update_from(tmp_path, nested_raw_data, keep_raw):
+    old_path = tmp_path / "old.json"
+    old_path.write_text(json.dumps(nested_raw_data))
+    graph = gu.RoamGraph(old_path, stream=True, keep_raw=keep_raw)
+    unchanged_node = graph.get_page_node("Page 2 | bar")
+
+    new_raw_data = json.loads(json.dumps(nested_raw_data))
+    page1_children = new_raw_data[0]["children"]
+    page1_children[0]["edit-time"] = 5  # b1 edited
+    page1_children[1] = {"uid": "b5", "string": "new", "refs": [{"uid": "page3"}]}
+    new_raw_data.append({"title": "Page 3", "uid": "page3"})
+    new_path = tmp_path / "new.json"
+    new_path.write_text(json.dumps(new_raw_data))
+
+    changeset = graph.update_from(new_path)
+    assert changeset.added_pages == ["Page 3"]
+    assert changeset.changed_pages == ["Page 1"]
+    assert changeset.removed_pages == []
+    assert sorted(changeset.added_blocks) == ["b5", "page3"]
+    assert changeset.removed_blocks == ["b3"]
+    assert changeset.changed_blocks == ["b1"]
+
+    # Unchanged pages are kept as is, the rest matches a fresh parse
+    assert graph.get_page_node("Page 2 | bar") is unchanged_node
+    assert graph.get_raw_elem(2) == new_raw_data[2]
+    check_same_graph(graph, gu.RoamGraph(new_path, stream=True))
+
+    # Removing a page and re-importing an unchanged export
+    del new_raw_data[1]
+    new_path.write_text(json.dumps(new_raw_data))
+    changeset = graph.update_from(new_path)
+    assert changeset.removed_pages == ["Page 2 | bar"]
+    assert changeset.removed_blocks == ["page2"]
+    check_same_graph(graph, gu.RoamGraph(new_path, stream=True))
+    assert not graph.update_from(new_path)
+
+
+def test_roam_graph_update_from_title_swap(tmp_path, nested_raw_data):
+    old_path = tmp_path / "old.json"
+    old_path.write_text(json.dumps(nested_raw_data))
+    graph = gu.RoamGraph(old_path, stream=True)
+
+    new_raw_data = json.loads(json.dumps(nested_raw_data))
+    new_raw_data[0]["title"], new_raw_data[1]["title"] = "Page 2 | bar", "Page 1"
+    new_path = tmp_path / "new.json"
+    new_path.write_text(json.dumps(new_raw_data))
+
+    changeset = graph.update_from(new_path)
+    assert sorted(changeset.changed_pages) == ["Page 1", "Page 2 | bar"]
+    assert graph.uid_to_title == {"page1": "Page 2 | bar", "page2": "Page 1"}
+    assert graph.get_page_of("b2").title == "Page 2 | bar"
+    check_same_graph(graph, gu.RoamGraph(new_path, stream=True))
+
+
+# ----- Test parallel parsing ----- #
+
+
+def test_roam_graph_workers(nested_raw_data):
+    with patch("dr_util.file_utils.load_file", return_value=nested_raw_data):
+        graph = gu.RoamGraph("fake_path", storage="compact")
+        parallel_graph = gu.RoamGraph("fake_path", storage="compact", workers=2)
+        with pytest.raises(ValueError):
+            gu.RoamGraph("fake_path", workers=2)
+
+    assert parallel_graph.uid_to_title == graph.uid_to_title
+    assert parallel_graph.get_page_of("b2").title == "Page 1"
+    assert parallel_graph.get_backlinks("page2") == ["b2"]
+
+
+# ----- Test daily pages ----- #
+
+
+def test_roam_graph_daily_pages(raw_data):
+    daily = [
+        {"title": "September 10th, 2023", "uid": "10-09-2023"},
+        {"title": "January 2nd, 2022", "uid": "02-01-2022"},
+        {"title": "Not a date", "uid": "31-02-2022"},
+    ]
+    with patch("dr_util.file_utils.load_file", return_value=raw_data + daily):
+        graph = gu.RoamGraph("fake_path")
+
+    assert graph.get_daily_pages() == ["January 2nd, 2022", "September 10th, 2023"]
+    assert graph.get_daily_pages(start="2023-01-01") == ["September 10th, 2023"]
+    assert graph.get_daily_pages(end="2023-09-09") == ["January 2nd, 2022"]
+    assert graph.get_daily_pages(start="2022-01-02", end="2023-09-10") == [
+        "January 2nd, 2022",
+        "September 10th, 2023",
+    ]
+
+    graph.replace_page({"title": "December 1st, 2024", "uid": "01-12-2024"})
+    assert graph.get_daily_pages(start="2024-01-01") == ["December 1st, 2024"]
+
+
+# ----- Test full-text search ----- #
+
+
+@pytest.mark.parametrize("storage", gu.STORAGE_TYPES)
+def test_roam_graph_search(tmp_path, nested_raw_data, storage):
+    checkpoint_path = tmp_path / "checkpoint"
+    with patch("dr_util.file_utils.load_file", return_value=nested_raw_data):
+        graph = gu.RoamGraph("fake_path", storage=storage)
+
+    assert [node.uid for node, _ in graph.search("nested")] == ["b2"]
+    assert [node.uid for node, _ in graph.search("page*")] == ["page1", "page2"]
+    assert graph.search('"first nested"') == []
+
+    # A built index is saved with the checkpoint and reloaded with it
+    graph.save_checkpoint(checkpoint_path)
+    with patch("roam_man.search_index.SearchIndex.from_compact_graph") as mock_build:
+        loaded = gu.RoamGraph.from_checkpoint(checkpoint_path)
+        assert [node.uid for node, _ in loaded.search("second")] == ["b3"]
+    mock_build.assert_not_called()
+
+    if storage == "nodes":
+        graph.replace_page(
+            {"title": "Page 3", "uid": "page3", "string": "brand new nested"}
+        )
+        assert [node.uid for node, _ in graph.search("nested")] == ["b2", "page3"]
+
+
+@pytest.mark.parametrize("storage", gu.STORAGE_TYPES)
+def test_roam_graph_write_pages(nested_raw_data, storage, capsys):
+    with patch("dr_util.file_utils.load_file", return_value=nested_raw_data):
+        graph = gu.RoamGraph("fake_path", storage=storage)
+
+    out = io.StringIO()
+    graph.write_pages(out)
+    assert out.getvalue() == "\n\n".join(
+        gu.roam_data_to_full_str(page) for page in nested_raw_data
+    )
+
+    out = io.StringIO()
+    graph.write_pages(out, titles=["Page 1"], max_depth=1)
+    assert "nested" not in out.getvalue() and "second" in out.getvalue()
+
+    graph.get_page_node_by_index(0).print_full(max_blocks=1)
+    assert capsys.readouterr().out == "Page 1\n  uid='page1' refs=[]\n\n"
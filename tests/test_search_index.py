@@ -0,0 +1,121 @@
+import numpy as np
+import pytest
+from hypothesis import given
+from hypothesis import strategies as st
+
+from roam_man import compact_graph as cg
+from roam_man import search_index as si
+
+
+@pytest.fixture
+def texts():
+    return [
+        "Hello world",
+        "hello there, world world",
+        None,
+        "worldly Hello",
+        "say hello world",
+        "[[Page Title]] with a #tag",
+    ]
+
+
+@pytest.fixture
+def index(texts):
+    return si.SearchIndex.from_texts(texts)
+
+
+def test_tokenize_and_parse_query():
+    assert si.tokenize("Hello, [[World]]!") == ["hello", "world"]
+    assert si.tokenize(None) == []
+    assert si.parse_query('a "b c" d* "e" f-g*') == [
+        ("term", "a"),
+        ("phrase", ["b", "c"]),
+        ("prefix", "d"),
+        ("term", "e"),
+        ("term", "f"),
+        ("prefix", "g"),
+    ]
+
+
+def test_term_query(index):
+    docs = [doc for doc, _ in index.search("HELLO", limit=None)]
+    assert sorted(docs) == [0, 1, 3, 4]
+    assert index.search("missing") == []
+    assert index.search("") == []
+    assert [doc for doc, _ in index.search("tag")] == [5]
+
+
+def test_phrase_query(index):
+    assert [doc for doc, _ in index.search('"hello world"')] == [0, 4]
+    assert [doc for doc, _ in index.search('"there world"')] == [1]
+    assert index.search('"world hello"') == []
+
+
+def test_prefix_query(index):
+    assert sorted(doc for doc, _ in index.search("world*")) == [0, 1, 3, 4]
+    assert [doc for doc, _ in index.search("worldl*")] == [3]
+    assert index.search("zz*") == []
+
+
+def test_clauses_are_anded_and_ranked(index):
+    hits = index.search("hello world")
+    assert sorted(doc for doc, _ in hits) == [0, 1, 4]
+    scores = [score for _, score in hits]
+    assert scores == sorted(scores, reverse=True)
+    # Shortest doc first, then the repeated term beats the longer doc
+    assert [doc for doc, _ in hits] == [0, 1, 4]
+    assert len(index.search("hello", limit=2)) == 2
+
+
+def test_from_compact_graph():
+    pages = [
+        {
+            "title": "Page One",
+            "uid": "p1",
+            "children": [{"uid": "b1", "string": "alpha beta"}],
+        },
+        {"title": "Other", "uid": "p2", "string": "gamma"},
+    ]
+    store = cg.CompactGraph.from_pages(pages)
+    index = si.SearchIndex.from_compact_graph(store)
+    assert index.num_docs == store.num_blocks
+    assert [store.get_uid(doc) for doc, _ in index.search("alpha")] == ["b1"]
+    assert [store.get_uid(doc) for doc, _ in index.search("one")] == ["p1"]
+    assert [store.get_uid(doc) for doc, _ in index.search("gamma")] == ["p2"]
+
+
+def test_save_load(tmp_path, index):
+    index.save(tmp_path / "search")
+    loaded = si.SearchIndex.load(tmp_path / "search")
+    assert loaded.num_terms == index.num_terms
+    for query in ["hello", '"hello world"', "wor*", "hello world"]:
+        assert loaded.search(query) == index.search(query)
+    assert si.SearchIndex.load(tmp_path / "missing") is None
+
+
+def naive_search(texts, words):
+    # Docs containing every word as a token
+    return {
+        doc
+        for doc, text in enumerate(texts)
+        if all(word in si.tokenize(text) for word in words)
+    }
+
+
+@given(
+    st.lists(
+        st.lists(st.sampled_from(["a", "b", "ab", "c"]), max_size=6).map(" ".join),
+        max_size=15,
+    ),
+    st.lists(st.sampled_from(["a", "b", "ab", "c"]), min_size=1, max_size=3),
+)
+def test_search_matches_naive(texts, words):
+    index = si.SearchIndex.from_texts(texts)
+    hits = index.search(" ".join(words), limit=None)
+    assert {doc for doc, _ in hits} == naive_search(texts, words)
+
+    phrase_docs = {doc for doc, _ in index.search(f'"{" ".join(words)}"', limit=None)}
+    assert phrase_docs == {
+        doc for doc, text in enumerate(texts) if f" {' '.join(words)} " in f" {text} "
+    }
+    assert np.all(np.diff([score for _, score in hits]) <= 1e-12)
@@ -0,0 +1,183 @@
+import json
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from roam_man import roam_graph as gu
+from roam_man import snapshot_utils as snu
+
+T0 = 1704067200000  # 2024-01-01
+
+
+@pytest.fixture
+def pages():
+    return [
+        {
+            "title": "Project",
+            "uid": "proj",
+            "create-time": T0,
+            "children": [
+                {"uid": "tags", "string": "Tags:: [[Topic]]", "refs": [{"uid": "t"}]},
+                {
+                    "uid": "p1",
+                    "string": "meeting notes",
+                    "edit-time": T0 + 5,
+                    "children": [
+                        {
+                            "uid": "p2",
+                            "string": "ask [[Person]]",
+                            "edit-time": T0 + 10,
+                            "refs": [{"uid": "person"}],
+                        }
+                    ],
+                },
+            ],
+        },
+        {
+            "title": "Journal",
+            "uid": "jour",
+            "children": [
+                {
+                    "uid": "j1",
+                    "string": "met [[Person]] about ((p1))",
+                    "edit-time": T0 + 20,
+                    "refs": [{"uid": "person"}, {"uid": "p1"}],
+                }
+            ],
+        },
+        {"title": "Topic", "uid": "t"},
+        {"title": "Person", "uid": "person"},
+    ]
+
+
+@pytest.fixture
+def graph(graph):
+    # conftest's graph, with extra_data to carry through snapshots
+    graph.extra_data["owner"] = "me"
+    return graph
+
+
+def answers(graph):
+    # A bit of every kind of lookup, in plain python values
+    return {
+        "pages": [graph.get_page_node(t).uid for t in graph.page_titles],
+        "uid_to_title": dict(graph.uid_to_title),
+        "block": graph.get_block("p2").string,
+        "chain": [n.uid for n in graph.get_parent_chain("p2")],
+        "page_of": graph.get_page_of("j1").title,
+        "backlinks": graph.get_backlinks("person"),
+        "linking": graph.get_linking_pages("p1"),
+        "query": graph.query().references("Person").under("Project").uids(),
+        "search": [n.uid for n, _ in graph.search("notes")],
+        "edited": [n.uid for n in graph.get_blocks_between(start=T0 + 6)],
+        "top": [title for title, _ in graph.get_top_pages(k=2)],
+        "clusters": graph.get_page_clusters(),
+        "daily": graph.get_daily_pages(),
+        "render": str(graph.get_page_node("Journal")),
+    }
+
+
+def test_snapshot_matches_graph(graph):
+    expected = answers(graph)
+    snapshot = graph.snapshot(search=True)
+    assert snapshot.frozen and not graph.frozen
+    assert snapshot.storage == "compact"
+    assert answers(snapshot) == expected
+    assert snapshot.extra_data == {"owner": "me"}
+
+
+def test_snapshot_is_read_only(graph):
+    snapshot = graph.snapshot()
+    with pytest.raises(TypeError):
+        snapshot.roam_pages["New"] = None
+    with pytest.raises(TypeError):
+        snapshot.uid_to_title["new"] = "New"
+    with pytest.raises(TypeError):
+        snapshot.extra_data["owner"] = "you"
+    with pytest.raises(ValueError):
+        snapshot.store.edit_time[0] = 0
+    with pytest.raises(ValueError, match="read-only"):
+        snapshot.replace_page({"title": "Topic", "uid": "t"})
+
+    # The source graph keeps working and the snapshot doesn't follow it
+    if graph.storage == "nodes":
+        graph.replace_page({"title": "Topic", "uid": "t", "string": "notes"})
+        assert sorted(n.uid for n, _ in graph.search("notes")) == ["p1", "t"]
+        assert [n.uid for n, _ in snapshot.search("notes")] == ["p1"]
+
+
+def test_snapshot_concurrent_readers(graph):
+    snapshot = graph.snapshot()
+    expected = answers(snapshot)
+    with ThreadPoolExecutor(8) as ex:
+        results = list(ex.map(lambda _: answers(snapshot), range(32)))
+    assert all(result == expected for result in results)
+
+
+# ----- Shared memory ----- #
+
+
+def shared_answers(graph):
+    result = answers(graph)
+    # Every block-level array is a view of the shared block
+    result["shared"] = all(
+        not getattr(graph.store, column).flags.owndata for column in graph.store.COLUMNS
+    )
+    return result
+
+
+def worker_answers(name):
+    with snu.SharedGraph.attach(name) as shared:
+        return shared_answers(shared.graph)
+
+
+def test_shared_memory_graph(graph):
+    expected = answers(graph)
+    with graph.to_shared_memory() as shared:
+        assert shared.owner and shared.nbytes > 0
+        assert shared.graph.frozen
+        assert answers(shared.graph) == expected
+        assert shared.graph.extra_data == {"owner": "me"}
+
+        attached = gu.RoamGraph.from_shared_memory(shared.name)
+        assert answers(attached) == expected
+        assert not attached.shared.owner
+        with pytest.raises(ValueError):
+            attached.store.uid_id[0] = 0
+        handle = attached.shared
+        with pytest.raises(BufferError):
+            handle.close()
+        del attached
+        handle.close()
+
+        method = "fork" if "fork" in mp.get_all_start_methods() else "spawn"
+        with ProcessPoolExecutor(2, mp_context=mp.get_context(method)) as ex:
+            results = list(ex.map(worker_answers, [shared.name] * 2))
+        for result in results:
+            assert result.pop("shared")
+            assert result == expected
+
+
+def test_shared_memory_layout():
+    arrays = {"a": np.arange(3, dtype=np.int8), "b": np.zeros(0), "c": np.ones(2)}
+    header, start, size = snu.pack_layout(arrays, {})
+    layout = json.loads(header)["layout"]
+    assert start % snu.ALIGN == 0 and start >= len(header) + 8
+    assert [layout[n][0] % snu.ALIGN for n in arrays] == [0, 0, 0]
+    assert size == start + layout["c"][0] + 16
+
+
+def test_shared_memory_rejects_other_blocks():
+    from multiprocessing import shared_memory
+
+    shm = shared_memory.SharedMemory(create=True, size=64)
+    try:
+        shm.buf[:8] = (2).to_bytes(8, "little")
+        shm.buf[8:10] = b"{}"
+        with pytest.raises(ValueError, match="Not a roam_man shared graph"):
+            snu.SharedGraph.attach(shm.name)
+    finally:
+        shm.close()
+        shm.unlink()
@@ -0,0 +1,171 @@
+import json
+import sqlite3
+
+import pytest
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from roam_man import roam_graph as gu
+from roam_man import sqlite_store as sq
+from roam_man import tree_utils as tu
+from tests.test_roam_graph import nested_roam_dict_st
+
+
+@pytest.fixture
+def pages():
+    return [
+        {
+            "title": "Page 1",
+            "uid": "p1",
+            "create-time": 5,
+            "children": [
+                {
+                    "uid": "b1",
+                    "string": "first",
+                    "edit-time": 7,
+                    "refs": [{"uid": "p2"}, {"uid": "elsewhere"}],
+                    "children": [{"uid": "b2", "string": "deep nested"}],
+                },
+                {"uid": "b3", "string": "second", "refs": [{"uid": "p2"}]},
+            ],
+        },
+        {"title": "Page 2", "uid": "p2", "refs": [{"uid": "b1"}]},
+        {"title": "Empty", "uid": "e"},
+    ]
+
+
+def check_same_pages(store, pages):
+    assert store.num_pages == len(pages)
+    for i, page in enumerate(pages):
+        expected = gu.RoamNode(page)
+        node = store.page_node(i)
+        assert gu.roam_data_to_full_str(node) == gu.roam_data_to_full_str(expected)
+        for got, want in zip(tu.iter_subtree(node), tu.iter_subtree(expected)):
+            assert (got.uid, got.refs, got.depth) == (want.uid, want.refs, want.depth)
+            assert (got.create_time, got.edit_time) == (
+                want.create_time,
+                want.edit_time,
+            )
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 10_000])
+def test_sqlite_store_ingest(tmp_path, pages, batch_size):
+    store = sq.SqliteStore.create(tmp_path / "g.sqlite", pages, batch_size=batch_size)
+    check_same_pages(store, pages)
+    assert store.num_blocks == 6
+    assert store.get_raw_page(1) == pages[1]
+    assert store.page_title(2) == "Empty"
+    assert store.block_node(2).uid == "b2"
+    with pytest.raises(IndexError):
+        store.get_raw_page(3)
+
+
+@settings(deadline=None, max_examples=25)
+@given(st.lists(nested_roam_dict_st(), max_size=5))
+def test_sqlite_store_hypothesis(tmp_path_factory, data):
+    path = tmp_path_factory.mktemp("db") / "g.sqlite"
+    check_same_pages(sq.SqliteStore.create(path, data, batch_size=3), data)
+
+
+def test_sqlite_store_errors(tmp_path, pages):
+    with pytest.raises(Exception, match="non-null dict"):
+        sq.SqliteStore.create(tmp_path / "bad.sqlite", [pages[0], None])
+    with pytest.raises(FileNotFoundError):
+        sq.SqliteStore.open(tmp_path / "missing.sqlite")
+
+    store = sq.SqliteStore.create(tmp_path / "g.sqlite", pages)
+    with store.conn:
+        store.conn.execute("UPDATE meta SET value = '0' WHERE key = 'schema_version'")
+    store.close()
+    with pytest.raises(ValueError):
+        sq.SqliteStore.open(tmp_path / "g.sqlite")
+
+
+def test_sqlite_store_lru(tmp_path, pages):
+    store = sq.SqliteStore.create(tmp_path / "g.sqlite", pages, max_pages=2)
+    first = store.page_node(0)
+    assert store.page_node(0) is first
+    store.page_node(1)
+    store.page_node(2)
+    assert list(store.page_cache) == [1, 2]
+    assert store.page_node(0) is not first
+
+
+def test_sqlite_store_uses_indexes(tmp_path, pages):
+    store = sq.SqliteStore.create(tmp_path / "g.sqlite", pages)
+
+    def plan(sql, *args):
+        rows = store.conn.execute(f"EXPLAIN QUERY PLAN {sql}", args).fetchall()
+        return " ".join(row[-1] for row in rows)
+
+    assert "blocks_uid" in plan("SELECT id FROM blocks WHERE uid = ?", "b1")
+    assert "pages_title" in plan("SELECT idx FROM pages WHERE title = ?", "Page 1")
+    assert "refs_target" in plan("SELECT block_id FROM refs WHERE target = ?", "p2")
+    assert "blocks_edit_time" in plan("SELECT id FROM blocks WHERE edit_time > ?", 0)
+
+
+# ----- RoamGraph sqlite storage ----- #
+
+
+def test_roam_graph_sqlite(tmp_path, pages):
+    input_path = tmp_path / "export.json"
+    input_path.write_text(json.dumps(pages))
+    expected = gu.RoamGraph(input_path)
+    graph = gu.RoamGraph(input_path, stream=True, storage="sqlite")
+
+    assert graph.db_path == tmp_path / "export.sqlite"
+    assert graph.raw_data[1] == pages[1]
+    assert graph.page_titles == expected.page_titles
+    assert dict(graph.uid_to_title) == expected.uid_to_title
+    assert graph.get_page_node_by_index(0).title == "Page 1"
+    assert graph.get_block("b2").parent.uid == "b1"
+    assert graph.get_backlinks("p2") == ["b1", "b3"]
+    assert graph.get_linking_pages("p2") == ["Page 1"]
+    assert "p2" in graph.backlinks and "b3" not in graph.backlinks
+    assert graph.page_sizes["p1"] == 4
+    assert [node.uid for node, _ in graph.search("nested")] == ["b2"]
+    with pytest.raises(ValueError):
+        graph.replace_page(pages[1])
+
+    # Reopened without the export
+    reopened = gu.RoamGraph.from_sqlite(graph.db_path, max_pages=1)
+    assert reopened.input_path == str(input_path)
+    for title, node in expected.roam_pages.items():
+        assert gu.roam_data_to_full_str(reopened.get_page_node(title)) == (
+            gu.roam_data_to_full_str(node)
+        )
+    assert len(reopened.db.page_cache) == 1
+    assert reopened.query().references("p2").uids() == ["b1", "b3"]
+
+
+def test_roam_graph_sqlite_replaces_db(tmp_path, pages):
+    db_path = tmp_path / "g.sqlite"
+    sqlite3.connect(db_path).close()  # empty, nothing to lose
+    input_path = tmp_path / "export.json"
+    input_path.write_text(json.dumps(pages))
+    graph = gu.RoamGraph(input_path, storage="sqlite", db_path=db_path)
+    graph.db.close()
+
+    # An earlier roam_man database is replaced
+    input_path.write_text(json.dumps(pages[:1]))
+    graph = gu.RoamGraph(input_path, storage="sqlite", db_path=db_path)
+    assert len(graph.roam_pages) == 1
+
+
+@pytest.mark.parametrize("contents", [b"not a database", None])
+def test_roam_graph_sqlite_keeps_other_files(tmp_path, pages, contents):
+    db_path = tmp_path / "export.sqlite"
+    if contents is None:
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("CREATE TABLE notes (text TEXT)")
+        conn.close()
+    else:
+        db_path.write_bytes(contents)
+    before = db_path.read_bytes()
+    input_path = tmp_path / "export.json"
+    input_path.write_text(json.dumps(pages))
+
+    with pytest.raises(ValueError, match="isn't a roam_man database"):
+        gu.RoamGraph(input_path, storage="sqlite")
+    assert db_path.read_bytes() == before
+    assert not sq.is_store_file(db_path)
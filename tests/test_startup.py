@@ -0,0 +1,134 @@
+import json
+import subprocess
+import sys
+import time
+
+import pytest
+
+from roam_man import __main__ as cli
+from roam_man import roam_graph as gu
+
+# Self time of roam_man's own modules when importing roam_graph, numpy and
+#   the standard library not included.  roam_graph, intern_utils and
+#   backlink_index import numpy up front (checkpoints are numpy columns), so
+#   a real lookup also pays the interpreter and numpy, ~70 ms each here:
+#   `python -m roam_man page` takes ~200-300 ms end to end, not under 100.
+IMPORT_BUDGET_MS = 100
+# Wall clock of a CLI lookup beyond a process that only imports numpy
+#   (~70 ms measured), best of LOOKUP_RUNS
+LOOKUP_OVERHEAD_MS = 150
+LOOKUP_RUNS = 3
+
+# Only imported when used
+LAZY_MODULES = [
+    "dr_util",
+    "sqlite3",
+    "roam_man.cache_utils",
+    "roam_man.checkpoint_utils",
+    "roam_man.compact_graph",
+    "roam_man.diff_utils",
+    "roam_man.export_utils",
+    "roam_man.graph_analytics",
+    "roam_man.markup_utils",
+    "roam_man.parallel_utils",
+    "roam_man.query_utils",
+    "roam_man.search_index",
+    "roam_man.snapshot_utils",
+    "roam_man.sqlite_store",
+    "roam_man.time_index",
+    "roam_man.validation_utils",
+]
+
+
+def run_python(*args):
+    return subprocess.run(
+        [sys.executable, *args], capture_output=True, text=True, check=True
+    )
+
+
+def test_import_is_lazy():
+    result = run_python(
+        "-c",
+        "import json, sys, roam_man.roam_graph; print(json.dumps(list(sys.modules)))",
+    )
+    modules = set(json.loads(result.stdout))
+    assert "roam_man.roam_graph" in modules
+    assert [name for name in LAZY_MODULES if name in modules] == []
+
+
+def test_import_time_budget():
+    result = run_python("-X", "importtime", "-c", "import roam_man.roam_graph")
+    # import time: self [us] | cumulative | imported package
+    self_us = 0
+    for line in result.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip().startswith("roam_man"):
+            self_us += int(fields[0].split(":")[1])
+    assert 0 < self_us / 1000 < IMPORT_BUDGET_MS
+
+
+@pytest.fixture
+def checkpoint(tmp_path):
+    pages = [
+        {
+            "title": "Reading List",
+            "uid": "list",
+            "children": [
+                {
+                    "uid": "b1",
+                    "string": "read [[Dune]]",
+                    "refs": [{"uid": "dune"}],
+                    "children": [{"uid": "b2", "string": "soon"}],
+                }
+            ],
+        },
+        {"title": "Dune", "uid": "dune"},
+    ]
+    export_path = tmp_path / "export.json"
+    export_path.write_text(json.dumps(pages))
+    path = tmp_path / "graph.ckpt"
+    assert cli.main(["checkpoint", str(export_path), str(path), "--search"]) == 0
+    return path
+
+
+def test_cli_lookups(checkpoint, capsys):
+    capsys.readouterr()
+    assert cli.main(["page", str(checkpoint), "Reading List"]) == 0
+    out = capsys.readouterr().out
+    assert "read [[Dune]]" in out and "soon" in out
+
+    assert cli.main(["page", str(checkpoint), "Reading List", "--max-depth", "1"]) == 0
+    assert "soon" not in capsys.readouterr().out
+
+    assert cli.main(["block", str(checkpoint), "b2"]) == 0
+    assert capsys.readouterr().out.splitlines()[0] == "[[Reading List]]"
+
+    assert cli.main(["page", str(checkpoint), "Missing"]) == 1
+    assert cli.main(["block", str(checkpoint), "missing"]) == 1
+    assert "No block" in capsys.readouterr().err
+
+
+def test_checkpoint_lookup_stays_lazy(checkpoint):
+    graph = gu.RoamGraph.from_checkpoint(checkpoint)
+    assert graph.get_page_node("Dune").uid == "dune"
+    assert graph.get_block("b2").string == "soon"
+    # A single lookup touches neither the per-page dict nor every title
+    assert graph.roam_pages._pages is None
+    assert graph.page_titles._titles is None
+    assert graph.search("soon")[0][0].uid == "b2"
+
+
+def best_ms(*args):
+    times = []
+    for _ in range(LOOKUP_RUNS):
+        start = time.perf_counter()
+        result = run_python(*args)
+        times.append((time.perf_counter() - start) * 1e3)
+    return min(times), result
+
+
+def test_cli_subprocess(checkpoint):
+    lookup_ms, result = best_ms("-m", "roam_man", "page", str(checkpoint), "Dune")
+    assert result.stdout.strip().startswith("Dune")
+    numpy_ms, _ = best_ms("-c", "import numpy")
+    assert lookup_ms - numpy_ms < LOOKUP_OVERHEAD_MS
@@ -0,0 +1,94 @@
+import json
+
+import pytest
+from hypothesis import given, settings, HealthCheck
+from hypothesis import strategies as st
+
+from roam_man import stream_utils as su
+
+
+@pytest.fixture
+def pages():
+    return [
+        {"title": "Page 1", "uid": "page1", "children": [{"uid": "c1", "string": "x"}]},
+        {"title": "Päge 2 ✓", "uid": "page2", "string": "unicode é中"},
+        {"title": "Page 3", "uid": "page3", "children": []},
+    ]
+
+
+def write_json(path, data, **kwargs):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, **kwargs)
+    return path
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 20])
+def test_iter_json_array_matches_json_load(tmp_path, pages, indent, chunk_size):
+    path = write_json(
+        tmp_path / "export.json", pages, indent=indent, ensure_ascii=False
+    )
+    elems = [elem for _, _, elem in su.iter_json_array(path, chunk_size=chunk_size)]
+    assert elems == pages
+
+
+def test_iter_json_array_offsets_locate_elems(tmp_path, pages):
+    path = write_json(tmp_path / "export.json", pages, indent=1, ensure_ascii=False)
+    raw = path.read_bytes()
+    for offset, length, elem in su.iter_json_array(path, chunk_size=5):
+        assert json.loads(raw[offset : offset + length]) == elem
+
+
+def test_iter_json_array_empty_and_invalid(tmp_path):
+    assert list(su.iter_json_array(write_json(tmp_path / "a.json", []))) == []
+
+    bad_path = tmp_path / "b.json"
+    bad_path.write_text('{"uid": "not an array"}')
+    with pytest.raises(ValueError):
+        list(su.iter_json_array(bad_path))
+
+    truncated_path = tmp_path / "c.json"
+    truncated_path.write_text('[{"uid": "a"}, {"uid": ')
+    with pytest.raises(ValueError):
+        list(su.iter_json_array(truncated_path))
+
+
+def test_json_array_index(tmp_path, pages):
+    path = write_json(tmp_path / "export.json", pages, ensure_ascii=False)
+    index = su.JsonArrayIndex(path)
+    for offset, length, _ in su.iter_json_array(path):
+        index.append(offset, length)
+
+    assert len(index) == len(pages)
+    assert index[1] == pages[1]
+    assert index[-1] == pages[-1]
+    assert index[0:2] == pages[0:2]
+    assert list(index) == pages
+
+
+@settings(suppress_health_check=[HealthCheck.function_scoped_fixture])
+@given(
+    data=st.lists(
+        st.dictionaries(st.text(max_size=5), st.text(max_size=20), max_size=4),
+        max_size=10,
+    ),
+    chunk_size=st.integers(min_value=1, max_value=64),
+)
+def test_iter_json_array_hypothesis(tmp_path, data, chunk_size):
+    path = write_json(tmp_path / "export.json", data, ensure_ascii=False)
+    elems = [elem for _, _, elem in su.iter_json_array(path, chunk_size=chunk_size)]
+    assert elems == data
+
+
+def test_json_array_index_overrides(tmp_path, pages):
+    path = write_json(tmp_path / "export.json", pages)
+    index = su.JsonArrayIndex(path)
+    for offset, length, _ in su.iter_json_array(path):
+        index.append(offset, length)
+
+    new_elem = {"title": "New", "uid": "new"}
+    index[-1] = new_elem
+    index.append_elem(new_elem)
+    assert len(index) == len(pages) + 1
+    assert index[len(pages) - 1] == new_elem
+    assert list(index) == pages[:-1] + [new_elem, new_elem]
@@ -0,0 +1,86 @@
+import datetime
+import json
+
+import pytest
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from roam_man import roam_graph as gu
+from roam_man import synthetic_utils as sy
+from roam_man import tree_utils as tu
+from roam_man import validation_utils as vu
+
+
+def test_daily_names():
+    date = datetime.date(2023, 9, 10)
+    assert sy.daily_title(date) == "September 10th, 2023"
+    assert sy.daily_uid(date) == "10-09-2023"
+    assert vu.is_valid_date(sy.daily_uid(date))
+    assert [sy.ordinal(n) for n in [1, 2, 3, 4, 11, 12, 13, 21, 22, 111]] == [
+        "1st",
+        "2nd",
+        "3rd",
+        "4th",
+        "11th",
+        "12th",
+        "13th",
+        "21st",
+        "22nd",
+        "111th",
+    ]
+
+
+def test_synthetic_graph_is_seeded():
+    pages = list(sy.SyntheticGraph(20, seed=3).iter_pages())
+    assert pages == list(sy.SyntheticGraph(20, seed=3).iter_pages())
+    assert pages != list(sy.SyntheticGraph(20, seed=4).iter_pages())
+
+
+@settings(deadline=None, max_examples=20)
+@given(
+    num_pages=st.integers(1, 30),
+    blocks_per_page=st.integers(0, 20),
+    max_depth=st.integers(1, 4),
+    fanout=st.integers(1, 5),
+    ref_density=st.floats(0, 2.5),
+)
+def test_synthetic_graph_shape(
+    num_pages, blocks_per_page, max_depth, fanout, ref_density
+):
+    gen = sy.SyntheticGraph(
+        num_pages,
+        blocks_per_page=blocks_per_page,
+        max_depth=max_depth,
+        fanout=fanout,
+        ref_density=ref_density,
+    )
+    pages = list(gen.iter_pages())
+    assert [p["title"] for p in pages] == [gen.page_title(j) for j in range(num_pages)]
+    assert len({p["title"] for p in pages}) == num_pages
+
+    nodes = [gu.RoamNode(p) for p in pages]
+    blocks = [node for page in nodes for node in tu.iter_subtree(page)]
+    uids = {node.uid for node in blocks}
+    assert len(uids) == len(blocks)
+    for node in blocks:
+        assert node.depth <= max_depth
+        assert len(node.children) <= fanout
+        for ref in node.refs:
+            assert ref in uids
+            target = next(b for b in blocks if b.uid == ref)
+            link = f"[[{target.title}]]" if target.parent is None else f"(({ref}))"
+            assert link in node.string
+
+
+def test_synthetic_graph_export(tmp_path):
+    gen = sy.SyntheticGraph.for_num_blocks(5_000, blocks_per_page=20)
+    path = tmp_path / "export.json"
+    num_blocks = gen.write_export(path)
+    assert num_blocks == pytest.approx(5_000, rel=0.2)
+    assert len(json.loads(path.read_text())) == gen.num_pages
+
+    graph = gu.RoamGraph(path, stream=True)
+    assert len(graph.block_index) == num_blocks
+    assert len(graph.get_daily_pages()) == gen.num_daily
+    assert graph.get_daily_pages()[0] == "January 1st, 2020"
+    assert graph.get_backlinks(gen.page_uid(0))
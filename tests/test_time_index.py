@@ -0,0 +1,143 @@
+import numpy as np
+import pytest
+from hypothesis import given
+from hypothesis import strategies as st
+
+from roam_man import time_index as ti
+from roam_man import tree_utils as tu
+
+DAY_MS = ti.DAY_MS
+T0 = 1704067200000  # 2024-01-01, a Monday
+
+
+@pytest.fixture
+def pages():
+    return [
+        {
+            "title": "Old",
+            "uid": "old",
+            "create-time": T0 - 30 * DAY_MS,
+            "edit-time": T0 - 30 * DAY_MS,
+            "children": [
+                {"uid": "o1", "edit-time": T0 - 2 * DAY_MS},
+                {"uid": "o2", "create-time": T0, "edit-time": T0 + DAY_MS},
+            ],
+        },
+        {
+            "title": "New",
+            "uid": "new",
+            "create-time": T0 + DAY_MS,
+            "children": [
+                {"uid": "n1", "edit-time": T0 + 8 * DAY_MS},
+                {"uid": "n2", "edit-time": T0 + DAY_MS + 5},
+            ],
+        },
+        {"title": "Untimed", "uid": "untimed"},
+    ]
+
+
+def uids(nodes):
+    return [node.uid for node in nodes]
+
+
+def test_to_epoch_ms():
+    assert ti.to_epoch_ms(None) is None and ti.to_epoch_ms(T0) == T0
+    assert ti.to_epoch_ms("2024-01-01") == T0
+    assert ti.to_epoch_ms(np.datetime64("2024-01-01T00:00:00.005")) == T0 + 5
+    # An end bound covers the whole day / minute it names
+    assert ti.to_epoch_ms("2024-01-01", end=True) == T0 + DAY_MS - 1
+    assert ti.to_epoch_ms("2024-01-01T00:01", end=True) == T0 + 2 * 60000 - 1
+    assert ti.to_epoch_ms("2024-01-01T00:00:00.005", end=True) == T0 + 5
+
+    # The README's Q3 example keeps the blocks on Sept 30
+    t = ti.to_epoch_ms("2024-09-30T15:00")
+    index = ti.TimeIndex.from_columns([t], [t], page_starts=[0])
+    assert index.count("edit_time", start="2024-07-01", end="2024-09-30") == 1
+    assert index.count("edit_time", start="2024-10-01") == 0
+
+
+def test_time_index_columns():
+    index = ti.TimeIndex.from_columns(
+        [5, ti.MISSING, 3, 9], [ti.MISSING, 1, 2, 2], page_starts=[0, 2]
+    )
+    assert index.times["create_time"].tolist() == [3, 5, 9]
+    assert index.docs["create_time"].tolist() == [2, 0, 3]
+    assert index.docs_between("create_time", 4, 9).tolist() == [0, 3]
+    assert index.count("edit_time", 2, 2) == 2
+    assert index.count("edit_time", 3, 1) == 0
+    assert index.page_of(np.array([0, 1, 2, 3])).tolist() == [0, 0, 1, 1]
+    assert index.recent_pages("edit_time") == [(1, 2), (0, 1)]
+    assert index.recent_pages("create_time", limit=1) == [(1, 9)]
+    assert index.nbytes > 0
+
+
+def test_time_index_histogram():
+    days = [T0, T0 + 3600, T0 + 2 * DAY_MS, T0 + 13 * DAY_MS]
+    index = ti.TimeIndex.from_columns(days, days, page_starts=[0])
+    bins, counts = index.histogram("edit_time", "day")
+    assert bins[0] == np.datetime64("2024-01-01")
+    assert len(bins) == 14
+    assert counts[:3].tolist() == [2, 0, 1] and counts.sum() == 4
+
+    bins, counts = index.histogram("edit_time", "week", start=T0 + DAY_MS)
+    assert bins.tolist() == [
+        np.datetime64(d).item() for d in ["2024-01-01", "2024-01-08"]
+    ]
+    assert counts.tolist() == [1, 1]
+
+    bins, counts = index.histogram("edit_time", "week", start=T0 + 20 * DAY_MS)
+    assert len(bins) == len(counts) == 0
+    with pytest.raises(ValueError):
+        index.histogram("edit_time", "month")
+
+
+@given(
+    st.lists(st.one_of(st.just(ti.MISSING), st.integers(0, 50 * DAY_MS)), max_size=60),
+    st.integers(0, 50 * DAY_MS),
+    st.integers(0, 50 * DAY_MS),
+)
+def test_time_index_matches_scan(times, start, end):
+    index = ti.TimeIndex.from_columns(times, times, page_starts=[0])
+    expected = [i for i, t in enumerate(times) if t != ti.MISSING and start <= t <= end]
+    assert sorted(index.docs_between("edit_time", start, end).tolist()) == expected
+    _, counts = index.histogram("edit_time", "week", start, end)
+    assert counts.sum() == len(expected)
+
+
+# ----- RoamGraph ----- #
+
+
+def test_roam_graph_time_queries(graph):
+    assert uids(graph.get_blocks_between(T0, T0 + 2 * DAY_MS)) == ["o2", "n2"]
+    assert uids(graph.get_blocks_between(start="2024-01-02")) == ["o2", "n2", "n1"]
+    assert uids(graph.get_blocks_between(end=T0, field="create_time")) == ["old", "o2"]
+    assert graph.count_blocks_between(end="2024-01-01") == 2
+    assert uids(graph.get_blocks_between("2024-01-02", "2024-01-02")) == ["o2", "n2"]
+
+    assert graph.get_recent_pages() == [("New", T0 + 8 * DAY_MS), ("Old", T0 + DAY_MS)]
+    assert graph.get_recent_pages(end=T0) == [("Old", T0 - 2 * DAY_MS)]
+    assert graph.get_recent_pages(field="create_time", limit=1) == [
+        ("New", T0 + DAY_MS)
+    ]
+
+    bins, counts = graph.get_time_histogram("week", start=T0 - 7 * DAY_MS)
+    assert bins.astype(str).tolist() == ["2023-12-25", "2024-01-01", "2024-01-08"]
+    assert counts.tolist() == [1, 2, 1]
+
+
+def test_roam_graph_time_index_matches_nodes(graph):
+    blocks = [
+        node for page in graph.roam_pages.values() for node in tu.iter_subtree(page)
+    ]
+    for field in ti.FIELDS:
+        expected = {n.uid for n in blocks if getattr(n, field) is not None}
+        assert set(uids(graph.get_blocks_between(field=field))) == expected
+
+
+def test_roam_graph_time_index_replace_page(graph):
+    if graph.storage != "nodes":
+        return
+    graph.time_index
+    graph.replace_page({"title": "Old", "uid": "old", "edit-time": T0 + 9 * DAY_MS})
+    assert graph.get_recent_pages(limit=1) == [("Old", T0 + 9 * DAY_MS)]
+    assert uids(graph.get_blocks_between(T0, T0 + 2 * DAY_MS)) == ["n2"]
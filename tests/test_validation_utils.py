@@ -1,7 +1,11 @@
 import pytest
 import random
+from datetime import datetime
 
+import numpy as np
 from faker import Faker
+from hypothesis import given
+from hypothesis import strategies as st
 from roam_man import validation_utils as vu
 
 
@@ -48,3 +52,34 @@ def test_random_invalid_dates(faker_instance):
         assert not vu.is_valid_date(
             invalid_date
         ), f"Invalid date passed: {invalid_date}"
+
+
+# Test the vectorized batch version against is_valid_date
+def test_classify_dates_matches_is_valid_date(faker_instance):
+    date_strings = [generate_random_valid_date(faker_instance) for _ in range(20)]
+    date_strings += [generate_random_invalid_date(faker_instance) for _ in range(20)]
+    date_strings += ["", "1-1-2020", "01-01-20200", "aa-bb-cccc", "29-02-2024"]
+
+    is_valid, dates = vu.classify_dates(date_strings)
+    for date_string, valid, date in zip(date_strings, is_valid, dates):
+        assert valid == vu.is_valid_date(date_string), date_string
+        if valid:
+            expected = datetime.strptime(date_string, "%d-%m-%Y").date()
+            assert date == np.datetime64(expected, "D")
+        else:
+            assert np.isnat(date)
+
+
+def test_classify_dates_options():
+    is_valid, dates = vu.classify_dates(["12-25-2023", None], day_first=False)
+    assert is_valid.tolist() == [True, False]
+    assert dates[0] == np.datetime64("2023-12-25")
+
+    is_valid, dates = vu.classify_dates([])
+    assert is_valid.shape == dates.shape == (0,)
+
+
+@given(st.text(alphabet="0123456789-", min_size=8, max_size=11))
+def test_classify_dates_hypothesis(date_string):
+    is_valid, _ = vu.classify_dates([date_string])
+    assert is_valid[0] == vu.is_valid_date(date_string)